@@ -1,5 +1,4 @@
 import os
-import uuid
 from typing import Any, Dict, List, Optional, Tuple
 from datetime import datetime
 
@@ -8,6 +7,8 @@ from app.agents.structure_analysis_agent import StructureAnalysisAgent
 from app.agents.content_analysis_agent import ContentAnalysisAgent
 from app.config.settings import get_settings
 from app.utils.constants import RelationshipType, NodeType
+from app.utils.hashing import stable_id
+from app.utils.storage_lifecycle import record_access
 
 settings = get_settings()
 
@@ -18,10 +19,20 @@ class AnalysisAgent(BaseAgent):
     Responsible for detecting languages/frameworks and classifying components.
     """
     
-    async def execute(self) -> Dict[str, Any]:
+    async def execute(
+        self,
+        structure_result: Optional[Dict[str, Any]] = None,
+        file_descriptions: Optional[Dict[str, Dict[str, Any]]] = None
+    ) -> Dict[str, Any]:
         """
         Execute the analysis agent's main functionality.
         
+        Args:
+            structure_result: Result of the structure analysis already run by
+                UploadAgent; the structure is analyzed here when not provided
+            file_descriptions: File id to the LLM description written by
+                UploadAgent, reused instead of analyzing those files again
+        
         Returns:
             Dictionary containing execution results
         """
@@ -37,6 +48,8 @@ class AnalysisAgent(BaseAgent):
             
             # Get project directory
             project_dir = project.get("temp_dir")
+            if project_dir:
+                record_access(project_dir)
             
             # Update project status
             self.update_project_status(
@@ -45,9 +58,10 @@ class AnalysisAgent(BaseAgent):
                 current_step="Beginning project analysis"
             )
             
-            # Step 1: Structure Analysis
-            structure_agent = StructureAnalysisAgent(self.project_id)
-            structure_result = await structure_agent.execute(project_dir)
+            # Step 1: Structure Analysis, unless the upload already walked the tree
+            if structure_result is None:
+                structure_agent = StructureAnalysisAgent(self.project_id)
+                structure_result = await structure_agent.execute(project_dir)
             
             if not structure_result.get("success", False):
                 error_message = f"Structure analysis failed: {structure_result.get('error', 'Unknown error')}"
@@ -56,7 +70,10 @@ class AnalysisAgent(BaseAgent):
             
             # Step 2: Content Analysis
             content_agent = ContentAnalysisAgent(self.project_id)
-            content_result = await content_agent.execute(structure_result.get("file_nodes", []))
+            content_result = await content_agent.execute(
+                structure_result.get("file_nodes", []),
+                file_descriptions
+            )
             
             if not content_result.get("success", False):
                 error_message = f"Content analysis failed: {content_result.get('error', 'Unknown error')}"
@@ -109,6 +126,9 @@ class AnalysisAgent(BaseAgent):
             error_message = f"Error in AnalysisAgent: {str(e)}"
             self.log_error(error_message)
             return {"success": False, "error": error_message}
+        
+        finally:
+            self.graph_writer.close()
     
     async def _classify_components(self, file_nodes: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
@@ -129,9 +149,6 @@ class AnalysisAgent(BaseAgent):
             "documentation": []
         }
         
-        component_properties_list = []
-        component_relationships = []
-        
         for file_node in file_nodes:
             relative_path = file_node.get("relative_path", "")
             file_type = file_node.get("file_type", "unknown")
@@ -168,8 +185,12 @@ class AnalysisAgent(BaseAgent):
             # Add to appropriate component list
             components[component_type].append(file_node)
             
+            # Unchanged since the last run: its Component node already exists
+            if file_node.get("unchanged"):
+                continue
+            
             # Prepare Component node properties
-            component_id = str(uuid.uuid4())
+            component_id = stable_id("component", file_id)
             component_properties = {
                 "component_id": component_id,
                 "project_id": self.project_id,
@@ -178,10 +199,10 @@ class AnalysisAgent(BaseAgent):
                 "created_at": datetime.utcnow().isoformat()
             }
             
-            component_properties_list.append(component_properties)
+            self.graph_writer.add_node(NodeType.COMPONENT, component_properties)
             
             # Prepare relationship from File to Component
-            component_relationships.append({
+            self.graph_writer.add_relationship({
                 "from_label": NodeType.FILE,
                 "from_property": "file_id",
                 "from_value": file_id,
@@ -192,19 +213,8 @@ class AnalysisAgent(BaseAgent):
                 "properties": {}
             })
         
-        # Batch create Component nodes
-        if component_properties_list:
-            batch_size = 100
-            for i in range(0, len(component_properties_list), batch_size):
-                batch = component_properties_list[i:i+batch_size]
-                self.db.create_nodes_batch("Component", batch)
-        
-        # Batch create File->Component relationships
-        if component_relationships:
-            batch_size = 100
-            for i in range(0, len(component_relationships), batch_size):
-                batch = component_relationships[i:i+batch_size]
-                self.db.create_relationships_batch(batch)
+        # Stage boundary: make sure every component is written
+        self.graph_writer.flush()
         
         # Count components by type
         component_counts = {component_type: len(files) for component_type, files in components.items()}
@@ -6,6 +6,7 @@ from typing import Any, Dict, List, Optional, Union
 
 from app.config.dependencies import dependency_initializer
 from app.config.settings import get_settings
+from app.databases.graph_write_buffer import GraphWriteBuffer
 
 settings = get_settings()
 logger = logging.getLogger(__name__)
@@ -30,7 +31,9 @@ class BaseAgent(abc.ABC):
         if self.db is None:
             logger.error(f"Neo4j service not available for agent {self.__class__.__name__}")
             raise RuntimeError("Neo4j service not available")
-            
+        
+        # Buffered batch writer for bulk node/relationship creation
+        self.graph_writer = GraphWriteBuffer(self.db)
         self.logger = logger
     
     @abc.abstractmethod
@@ -1,33 +1,27 @@
 import os
-import uuid
-import ast
-from typing import Any, Dict, List, Optional, Set, Tuple
+import json
+import posixpath
+import multiprocessing
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
 from datetime import datetime
 from openai import AsyncOpenAI
 
-# Try to import Tree-sitter, but provide fallback
-try:
-    from tree_sitter import Language, Parser
-    TREE_SITTER_AVAILABLE = True
-except ImportError:
-    TREE_SITTER_AVAILABLE = False
-    # Create mock classes
-    class Parser:
-        def parse(self, *args, **kwargs):
-            return None
-    
-    class Language:
-        def __init__(self, *args, **kwargs):
-            pass
-
 from openai import OpenAI
 
 from app.agents.base_agent import BaseAgent
 from app.config.settings import get_settings
-from app.utils.constants import RelationshipType, NodeType
+from app.utils import python_extraction, tree_sitter_extraction
+from app.utils.constants import NODE_ID_PROPERTIES, RelationshipType, NodeType
+from app.utils.hashing import stable_id
+from app.utils.llm_cache import get_llm_cache, llm_cache_key
+from app.utils.module_index import ModuleIndex, EXTERNAL, RESOLVED, UNRESOLVED
+from app.utils.zip_fs import read_project_file
 
 settings = get_settings()
 
+# Bump when the metadata prompt changes so cached responses are not reused
+_METADATA_PROMPT_VERSION = "file-metadata-v1"
+
 
 class ContentAnalysisAgent(BaseAgent):
     """
@@ -35,6 +29,14 @@ class ContentAnalysisAgent(BaseAgent):
     Acts as a sub-agent of the Analysis Agent.
     """
     
+    # (label, metadata key, id property, File relationship) for extracted metadata nodes
+    _METADATA_NODE_TYPES = [
+        (NodeType.FUNCTION, "functions", "function_id", RelationshipType.HAS_FUNCTION),
+        (NodeType.CLASS, "classes", "class_id", RelationshipType.HAS_CLASS),
+        (NodeType.ENUM, "enums", "enum_id", RelationshipType.HAS_ENUM),
+        (NodeType.EXTENSION, "extensions", "extension_id", RelationshipType.HAS_EXTENSION),
+    ]
+    
     def __init__(self, project_id: str):
         """Initialize the content analysis agent."""
         super().__init__(project_id)
@@ -43,37 +45,25 @@ class ContentAnalysisAgent(BaseAgent):
             api_key=settings.OPENAI_API_KEY,
             timeout=settings.OPENAI_TIMEOUT
         )
-        self.parser = self._initialize_parser()
         self._processed_files: Set[str] = set()
         self._file_id_map: Dict[str, str] = {}  # Maps relative_path to file_id
+        self._module_index: Optional[ModuleIndex] = None
+        # (file node, import specs, record analyzed hash) awaiting import resolution
+        self._unlinked_files: List[Tuple[Dict[str, Any], Dict[str, Any], bool]] = []
     
-    def _initialize_parser(self) -> Parser:
-        """Initialize tree-sitter parser with supported languages."""
-        parser = Parser()
-        
-        if TREE_SITTER_AVAILABLE:
-            try:
-                # Check if language file exists
-                languages_path = os.path.join(settings.STORAGE_DIR, 'build', 'languages.so')
-                if os.path.exists(languages_path):
-                    python_language = Language(languages_path, 'python')
-                    parser.set_language(python_language)
-                    self.logger.info("Tree-sitter parser initialized with Python language")
-                else:
-                    self.logger.warning("Tree-sitter language file not found, using AST parser only")
-            except Exception as e:
-                self.logger.error(f"Error initializing tree-sitter: {str(e)}")
-        else:
-            self.logger.warning("Tree-sitter not available, using AST parser only")
-        
-        return parser
-    
-    async def execute(self, file_nodes: List[Dict[str, Any]]) -> Dict[str, Any]:
+    async def execute(
+        self,
+        file_nodes: List[Dict[str, Any]],
+        file_descriptions: Optional[Dict[str, Dict[str, Any]]] = None
+    ) -> Dict[str, Any]:
         """
         Execute the content analysis agent's main functionality.
         
         Args:
             file_nodes: List of File nodes from structure analysis
+            file_descriptions: File id to the LLM description written during
+                upload; files that are not parsed locally are built from
+                their description instead of being sent to the LLM again
             
         Returns:
             Dictionary containing execution results
@@ -95,6 +85,9 @@ class ContentAnalysisAgent(BaseAgent):
                 if relative_path and file_id:
                     self._file_id_map[relative_path] = file_id
             
+            # Resolves imports and references to project files
+            self._module_index = ModuleIndex(self._file_id_map)
+            
             # Track metadata counts
             metadata_counts = {
                 "functions": 0,
@@ -102,15 +95,19 @@ class ContentAnalysisAgent(BaseAgent):
                 "enums": 0,
                 "extensions": 0,
                 "imports": 0,
-                "references": 0
+                "references": 0,
+                "calls": 0,
+                f"imports_{RESOLVED}": 0,
+                f"imports_{UNRESOLVED}": 0,
+                f"imports_{EXTERNAL}": 0
             }
-            
-            # Prepare batches for metadata storage
-            function_batch = []
-            class_batch = []
-            enum_batch = []
-            extension_batch = []
-            relationships_batch = []
+            skipped_file_count = 0
+            described_file_count = 0
+            tagged_file_count = 0
+            tagged_bytes = 0
+            file_descriptions = file_descriptions or {}
+            # (file node, "python" or tree-sitter grammar) of files parsed locally
+            source_files = []
             
             # Process each file
             for file_node in file_nodes:
@@ -119,188 +116,81 @@ class ContentAnalysisAgent(BaseAgent):
                 file_id = file_node.get("file_id")
                 relative_path = file_node.get("relative_path")
                 
-                if not file_path or not os.path.exists(file_path):
+                # File nodes come from the project's file manifest, so the
+                # files are known to exist without touching the filesystem
+                if not file_path:
                     continue
                 
                 if file_path in self._processed_files:
                     continue
-                    
-                # Process file based on type
-                if file_type == "python":
-                    metadata = await self._analyze_python_file(file_path, file_id, relative_path)
-                else:
-                    # Use OpenAI to analyze other file types
-                    metadata = await self._analyze_with_openai(file_path, file_type, file_id, relative_path)
                 
-                # Collect metadata for batch processing
-                if metadata:
-                    # Extend batches
-                    function_batch.extend(metadata.get("functions", []))
-                    class_batch.extend(metadata.get("classes", []))
-                    enum_batch.extend(metadata.get("enums", []))
-                    extension_batch.extend(metadata.get("extensions", []))
-                    
-                    # Process imports and create relationships
-                    for import_meta in metadata.get("imports", []):
-                        target_file_id = self._file_id_map.get(import_meta.get("module_path"))
-                        if target_file_id:
-                            relationships_batch.append({
-                                "from_label": NodeType.FILE,
-                                "from_property": "file_id",
-                                "from_value": file_id,
-                                "to_label": NodeType.FILE,
-                                "to_property": "file_id",
-                                "to_value": target_file_id,
-                                "relationship_type": RelationshipType.IMPORTS,
-                                "properties": {
-                                    "created_at": datetime.utcnow().isoformat()
-                                }
-                            })
-                            metadata_counts["imports"] += 1
-                    
-                    # Process references and create relationships
-                    for ref_meta in metadata.get("references", []):
-                        target_file_id = self._file_id_map.get(ref_meta.get("target_path"))
-                        if target_file_id:
-                            relationships_batch.append({
-                                "from_label": NodeType.FILE,
-                                "from_property": "file_id",
-                                "from_value": file_id,
-                                "to_label": NodeType.FILE,
-                                "to_property": "file_id",
-                                "to_value": target_file_id,
-                                "relationship_type": RelationshipType.REFERENCES,
-                                "properties": {
-                                    "reference_type": ref_meta.get("type", "unknown"),
-                                    "created_at": datetime.utcnow().isoformat()
-                                }
-                            })
-                            metadata_counts["references"] += 1
+                # Binary, generated and minified files are neither parsed nor
+                # sent to the LLM; their bytes are never read
+                if file_node.get("content_tag"):
+                    self._processed_files.add(file_path)
+                    tagged_file_count += 1
+                    tagged_bytes += file_node.get("size") or 0
+                    continue
+                
+                # Already analyzed at this content hash: its metadata nodes are
+                # in place, only re-link files since their targets may have changed
+                content_hash = file_node.get("content_hash")
+                if content_hash and file_node.get("analyzed_hash") == content_hash:
+                    if file_node.get("import_specs"):
+                        self._unlinked_files.append((file_node, json.loads(file_node["import_specs"]), False))
+                    else:
+                        # Analyzed before import specs were stored: reuse its resolved links
+                        self._link_files(file_id, json.loads(file_node.get("links") or "[]"), metadata_counts)
+                    self._processed_files.add(file_path)
+                    skipped_file_count += 1
+                    continue
                     
-                    # Update counts
-                    metadata_counts["functions"] += len(metadata.get("functions", []))
-                    metadata_counts["classes"] += len(metadata.get("classes", []))
-                    metadata_counts["enums"] += len(metadata.get("enums", []))
-                    metadata_counts["extensions"] += len(metadata.get("extensions", []))
+                # Python files and languages with a tree-sitter grammar are
+                # parsed together in worker processes below
+                grammar = "python" if file_type == "python" else tree_sitter_extraction.grammar_for(file_type, file_path)
+                if grammar == "python" or (grammar and tree_sitter_extraction.load_language(grammar)):
+                    source_files.append((file_node, grammar))
+                    self._processed_files.add(file_path)
+                    continue
                 
+                # Other file types were described with the LLM during upload;
+                # only files without a description are analyzed with OpenAI
+                if file_id in file_descriptions:
+                    metadata = self._metadata_from_description(file_id, file_descriptions[file_id])
+                    described_file_count += 1
+                else:
+                    metadata = await self._analyze_with_openai(
+                        file_path, file_type, file_id, relative_path, file_node.get("size")
+                    )
+                self._queue_file_metadata(file_node, metadata, metadata_counts)
                 self._processed_files.add(file_path)
             
-            # Batch create nodes
-            function_relationships = []
-            if function_batch:
-                # Process in batches of 100
-                batch_size = 100
-                for i in range(0, len(function_batch), batch_size):
-                    batch = function_batch[i:i+batch_size]
-                    created_functions = self.db.create_nodes_batch("Function", batch)
-                    
-                    # Create function relationships
-                    for function in batch:
-                        file_id = function.get("file_id")
-                        function_id = function.get("function_id")
-                        function_relationships.append({
-                            "from_label": NodeType.FILE,
-                            "from_property": "file_id",
-                            "from_value": file_id,
-                            "to_label": NodeType.FUNCTION,
-                            "to_property": "function_id",
-                            "to_value": function_id,
-                            "relationship_type": RelationshipType.HAS_FUNCTION,
-                            "properties": {
-                                "created_at": datetime.utcnow().isoformat()
-                            }
-                        })
-            
-            class_relationships = []
-            if class_batch:
-                # Process in batches of 100
-                batch_size = 100
-                for i in range(0, len(class_batch), batch_size):
-                    batch = class_batch[i:i+batch_size]
-                    created_classes = self.db.create_nodes_batch("Class", batch)
-                    
-                    # Create class relationships
-                    for class_meta in batch:
-                        file_id = class_meta.get("file_id")
-                        class_id = class_meta.get("class_id")
-                        class_relationships.append({
-                            "from_label": NodeType.FILE,
-                            "from_property": "file_id",
-                            "from_value": file_id,
-                            "to_label": NodeType.CLASS,
-                            "to_property": "class_id",
-                            "to_value": class_id,
-                            "relationship_type": RelationshipType.HAS_CLASS,
-                            "properties": {
-                                "created_at": datetime.utcnow().isoformat()
-                            }
-                        })
-            
-            enum_relationships = []
-            if enum_batch:
-                # Process in batches of 100
-                batch_size = 100
-                for i in range(0, len(enum_batch), batch_size):
-                    batch = enum_batch[i:i+batch_size]
-                    created_enums = self.db.create_nodes_batch("Enum", batch)
-                    
-                    # Create enum relationships
-                    for enum in batch:
-                        file_id = enum.get("file_id")
-                        enum_id = enum.get("enum_id")
-                        enum_relationships.append({
-                            "from_label": NodeType.FILE,
-                            "from_property": "file_id",
-                            "from_value": file_id,
-                            "to_label": NodeType.ENUM,
-                            "to_property": "enum_id",
-                            "to_value": enum_id,
-                            "relationship_type": RelationshipType.HAS_ENUM,
-                            "properties": {
-                                "created_at": datetime.utcnow().isoformat()
-                            }
-                        })
-            
-            extension_relationships = []
-            if extension_batch:
-                # Process in batches of 100
-                batch_size = 100
-                for i in range(0, len(extension_batch), batch_size):
-                    batch = extension_batch[i:i+batch_size]
-                    created_extensions = self.db.create_nodes_batch("Extension", batch)
-                    
-                    # Create extension relationships
-                    for extension in batch:
-                        file_id = extension.get("file_id")
-                        extension_id = extension.get("extension_id")
-                        extension_relationships.append({
-                            "from_label": NodeType.FILE,
-                            "from_property": "file_id",
-                            "from_value": file_id,
-                            "to_label": NodeType.EXTENSION,
-                            "to_property": "extension_id",
-                            "to_value": extension_id,
-                            "relationship_type": RelationshipType.HAS_EXTENSION,
-                            "properties": {
-                                "created_at": datetime.utcnow().isoformat()
-                            }
-                        })
-            
-            # Combine all relationship batches
-            all_relationships = (
-                function_relationships + 
-                class_relationships + 
-                enum_relationships + 
-                extension_relationships + 
-                relationships_batch
-            )
+            async for file_node, metadata in self._analyze_source_files(source_files):
+                self._queue_file_metadata(file_node, metadata, metadata_counts)
             
-            # Create all relationships in batches
-            if all_relationships:
-                batch_size = 100
-                for i in range(0, len(all_relationships), batch_size):
-                    batch = all_relationships[i:i+batch_size]
-                    self.db.create_relationships_batch(batch)
+            # Every file's imports are known now, including package re-exports
+            self._link_analyzed_files(metadata_counts)
+            
+            # Stage boundary: make sure every node and relationship is written
+            self.graph_writer.flush()
+            
+            if skipped_file_count:
+                self.logger.info(f"Skipped {skipped_file_count} unchanged files for project {self.project_id}")
+            if described_file_count:
+                self.logger.info(
+                    f"Reused upload descriptions of {described_file_count} files for project {self.project_id}"
+                )
+            if tagged_file_count:
+                self.logger.info(
+                    f"Skipped {tagged_file_count} binary, generated or minified files "
+                    f"({tagged_bytes} bytes) for project {self.project_id}"
+                )
+            self.logger.info(
+                f"Imports for project {self.project_id}: "
+                f"{metadata_counts[f'imports_{RESOLVED}']} resolved, "
+                f"{metadata_counts[f'imports_{UNRESOLVED}']} unresolved, "
+                f"{metadata_counts[f'imports_{EXTERNAL}']} external"
+            )
             
             # Update project status
             self.update_project_status(
@@ -319,6 +209,10 @@ class ContentAnalysisAgent(BaseAgent):
             return {
                 "success": True,
                 "metadata_counts": metadata_counts,
+                "skipped_file_count": skipped_file_count,
+                "described_file_count": described_file_count,
+                "tagged_file_count": tagged_file_count,
+                "tagged_bytes": tagged_bytes,
                 "report": report
             }
             
@@ -326,167 +220,193 @@ class ContentAnalysisAgent(BaseAgent):
             error_message = f"Error in ContentAnalysisAgent: {str(e)}"
             self.log_error(error_message)
             return {"success": False, "error": error_message}
+        
+        finally:
+            self.graph_writer.close()
     
-    async def _analyze_python_file(
-        self, 
-        file_path: str, 
-        file_id: str, 
-        relative_path: str
-    ) -> Optional[Dict[str, Any]]:
+    def _queue_file_metadata(
+        self,
+        file_node: Dict[str, Any],
+        metadata: Optional[Dict[str, Any]],
+        metadata_counts: Dict[str, int]
+    ) -> None:
         """
-        Analyze a Python file using ast module.
+        Queue the metadata nodes and relationships extracted from a file for batched writing.
         
         Args:
-            file_path: Path to the Python file
-            file_id: ID of the File node
-            relative_path: Relative path from project root
-            
-        Returns:
-            Extracted metadata
+            file_node: File node the metadata was extracted from
+            metadata: Extracted metadata, or None if analysis failed
+            metadata_counts: Counts to update with the nodes and relationships queued
         """
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            tree = ast.parse(content)
-            
-            metadata = {
-                "file_id": file_id,
-                "functions": [],
-                "classes": [],
-                "enums": [],
-                "extensions": [],
-                "imports": [],
-                "references": []
-            }
-            
-            # Extract imports first to build a map of imported module names
-            imported_modules = {}
-            for node in ast.walk(tree):
-                if isinstance(node, ast.Import):
-                    for name in node.names:
-                        imported_modules[name.asname or name.name] = name.name
-                elif isinstance(node, ast.ImportFrom):
-                    module_prefix = node.module + "." if node.module else ""
-                    for name in node.names:
-                        full_name = module_prefix + name.name
-                        imported_modules[name.asname or name.name] = full_name
-            
-            # Extract functions, classes, etc.
-            for node in ast.walk(tree):
-                # Extract functions
-                if isinstance(node, ast.FunctionDef):
-                    function_meta = {
-                        "function_id": str(uuid.uuid4()),
-                        "file_id": file_id,
-                        "project_id": self.project_id,
-                        "name": node.name,
-                        "return_type": self._infer_return_type(node),
-                        "arguments": self._extract_arguments(node),
-                        "decorators": self._extract_decorators(node),
-                        "is_static": any(d.id == 'staticmethod' for d in node.decorator_list if isinstance(d, ast.Name)),
-                        "is_async": isinstance(node, ast.AsyncFunctionDef),
-                        "docstring": ast.get_docstring(node) or "",
-                        "lineno": node.lineno,
-                        "end_lineno": getattr(node, 'end_lineno', node.lineno),
-                        "created_at": datetime.utcnow().isoformat()
-                    }
-                    metadata["functions"].append(function_meta)
-                
-                # Extract classes
-                elif isinstance(node, ast.ClassDef):
-                    methods = []
-                    # Extract class methods
-                    for item in node.body:
-                        if isinstance(item, ast.FunctionDef):
-                            method_id = str(uuid.uuid4())
-                            methods.append({
-                                "method_id": method_id,
-                                "name": item.name,
-                                "return_type": self._infer_return_type(item),
-                                "arguments": self._extract_arguments(item),
-                                "decorators": self._extract_decorators(item),
-                                "is_static": any(d.id == 'staticmethod' for d in item.decorator_list if isinstance(d, ast.Name)),
-                                "is_async": isinstance(item, ast.AsyncFunctionDef),
-                                "docstring": ast.get_docstring(item) or "",
-                                "lineno": item.lineno,
-                                "end_lineno": getattr(item, 'end_lineno', item.lineno)
-                            })
-                    
-                    class_meta = {
-                        "class_id": str(uuid.uuid4()),
-                        "file_id": file_id,
-                        "project_id": self.project_id,
-                        "name": node.name,
-                        "type": self._infer_class_type(node),
-                        "is_static": False,  # Determined by class decorator or metaclass
-                        "is_final": any(d.id == 'final' for d in node.decorator_list if isinstance(d, ast.Name)),
-                        "superclasses": [base.id for base in node.bases if isinstance(base, ast.Name)],
-                        "interfaces": [],  # Python doesn't have explicit interfaces
-                        "methods": methods,
-                        "attributes": self._extract_class_attributes(node),
-                        "docstring": ast.get_docstring(node) or "",
-                        "lineno": node.lineno,
-                        "end_lineno": getattr(node, 'end_lineno', node.lineno),
-                        "created_at": datetime.utcnow().isoformat()
-                    }
-                    metadata["classes"].append(class_meta)
-                
-                # Extract imports
-                elif isinstance(node, (ast.Import, ast.ImportFrom)):
-                    import_meta = self._extract_import(node, relative_path)
-                    if import_meta:
-                        metadata["imports"].append(import_meta)
-                
-                # Extract references to other modules/files
-                elif isinstance(node, ast.Name) and node.id in imported_modules:
-                    module_name = imported_modules[node.id]
-                    # Convert module name to file path (e.g., "app.models" -> "app/models.py")
-                    target_path = module_name.replace('.', '/') + '.py'
-                    if target_path in self._file_id_map:
-                        reference_meta = {
-                            "type": "module_reference",
-                            "name": node.id,
-                            "target_path": target_path,
-                            "lineno": node.lineno,
-                            "target_name": module_name,
-                            "created_at": datetime.utcnow().isoformat()
-                        }
-                        metadata["references"].append(reference_meta)
-            
-            # Look for enums (typically classes inheriting from Enum)
-            for class_meta in metadata["classes"]:
-                if "Enum" in class_meta["superclasses"]:
-                    # Extract enum values from class attributes
-                    enum_values = []
-                    for attr in class_meta["attributes"]:
-                        enum_values.append(attr["name"])
-                    
-                    enum_meta = {
-                        "enum_id": str(uuid.uuid4()),
-                        "file_id": file_id,
-                        "project_id": self.project_id,
-                        "name": class_meta["name"],
-                        "values": enum_values,
-                        "docstring": class_meta["docstring"],
-                        "lineno": class_meta["lineno"],
-                        "end_lineno": class_meta["end_lineno"],
+        if not metadata:
+            return
+        
+        file_id = file_node.get("file_id")
+        for label, key, id_property, relationship_type in self._METADATA_NODE_TYPES:
+            for item in metadata.get(key, []):
+                self.graph_writer.add_node(label, self._to_node_properties(item))
+                self.graph_writer.add_relationship({
+                    "from_label": NodeType.FILE,
+                    "from_property": "file_id",
+                    "from_value": item.get("file_id"),
+                    "to_label": label,
+                    "to_property": id_property,
+                    "to_value": item.get(id_property),
+                    "relationship_type": relationship_type,
+                    "properties": {
                         "created_at": datetime.utcnow().isoformat()
                     }
-                    metadata["enums"].append(enum_meta)
-            
-            return metadata
+                })
+            metadata_counts[key] += len(metadata.get(key, []))
+        
+        # Calls within the file were resolved during extraction
+        self._queue_calls(
+            [
+                (call["caller"], call["target"], call["lineno"], call["count"])
+                for call in metadata.get("calls", [])
+                if "target" in call
+            ],
+            metadata_counts
+        )
+        
+        # Imports, references and calls through imported names are resolved
+        # once every file is analyzed; references are kept as [reference type,
+        # dotted target name] and calls as [caller node, dotted target name,
+        # line, count]. The file's symbols are what other files' calls resolve to.
+        import_specs = {
+            "imports": metadata.get("imports", []),
+            "references": [
+                [ref_meta.get("type", "unknown"), ref_meta.get("target_name")]
+                for ref_meta in metadata.get("references", [])
+                if ref_meta.get("target_name")
+            ],
+            "calls": [
+                [call["caller"], call["target_name"], call["lineno"], call["count"]]
+                for call in metadata.get("calls", [])
+                if "target_name" in call
+            ],
+            "symbols": metadata.get("symbols", {})
+        }
+        self._unlinked_files.append((file_node, import_specs, True))
+    
+    def _link_analyzed_files(self, metadata_counts: Dict[str, int]) -> None:
+        """
+        Resolve the imports, references and calls of every analyzed file and
+        queue IMPORTS/REFERENCES/CALLS relationships for those that point into
+        the project.
+        
+        Args:
+            metadata_counts: Counts to update with resolution results and
+                the relationships queued
+        """
+        # Project-wide symbol table: relative path -> qualified name -> call node
+        symbols_by_path: Dict[str, Dict[str, python_extraction.CallNode]] = {}
+        for file_node, import_specs, _ in self._unlinked_files:
+            relative_path = file_node.get("relative_path") or ""
+            if posixpath.basename(relative_path.replace('\\', '/')) == "__init__.py":
+                self._module_index.add_reexports(relative_path, import_specs["imports"])
+            if import_specs.get("symbols"):
+                symbols_by_path[relative_path.replace('\\', '/')] = import_specs["symbols"]
+        
+        for file_node, import_specs, analyzed in self._unlinked_files:
+            file_id = file_node.get("file_id")
+            relative_path = file_node.get("relative_path") or ""
+            
+            # links are [relationship type, target path, reference type]
+            links = []
+            python_imports = tree_sitter_extraction.grammar_for(file_node.get("file_type") or "", relative_path) is None
+            for import_meta in import_specs["imports"]:
+                if python_imports:
+                    target_paths, status = self._module_index.resolve_import(relative_path, import_meta)
+                else:
+                    target_paths, status = tree_sitter_extraction.resolve_source_import(
+                        relative_path, import_meta, self._file_id_map
+                    )
+                metadata_counts[f"imports_{status}"] += 1
+                links.extend([RelationshipType.IMPORTS.value, target_path, None] for target_path in target_paths)
+            for reference_type, target_name in import_specs["references"]:
+                target_path = self._module_index.resolve(target_name, relative_path)
+                if target_path and target_path != relative_path:
+                    links.append([RelationshipType.REFERENCES.value, target_path, reference_type])
+            links = [list(link) for link in dict.fromkeys(tuple(link) for link in links)]
+            self._link_files(file_id, links, metadata_counts)
+            
+            calls = []
+            for caller, target_name, lineno, count in import_specs.get("calls", []):
+                found = self._module_index.resolve_symbol(target_name, relative_path)
+                if not found or not found[1]:
+                    continue
+                target = symbols_by_path.get(found[0], {}).get(found[1])
+                if target is not None:
+                    calls.append((caller, target, lineno, count))
+            self._queue_calls(calls, metadata_counts)
+            
+            # Record what was analyzed so an unchanged file is skipped next run;
+            # the specs are kept so its links are re-resolved against new files
+            content_hash = file_node.get("content_hash")
+            if analyzed and content_hash:
+                self.graph_writer.add_node(NodeType.FILE, {
+                    "file_id": file_id,
+                    "analyzed_hash": content_hash,
+                    "import_specs": json.dumps(import_specs)
+                })
+        
+        self._unlinked_files = []
+    
+    def _analysis_worker_count(self, job_count: int) -> int:
+        """Number of extraction processes to use for job_count source files."""
+        workers = settings.SOURCE_ANALYSIS_WORKERS or os.cpu_count() or 1
+        # Not worth starting processes for fewer files than one chunk per worker
+        workers = min(workers, -(-job_count // settings.PYTHON_ANALYSIS_CHUNK_SIZE))
+        if workers > 1 and multiprocessing.current_process().daemon:
+            self.logger.warning("Running in a daemon process, analyzing source files without a process pool")
+            return 1
+        return max(workers, 1)
+    
+    async def _analyze_source_files(
+        self,
+        source_files: List[Tuple[Dict[str, Any], str]]
+    ) -> AsyncIterator[Tuple[Dict[str, Any], Optional[Dict[str, Any]]]]:
+        """
+        Analyze source files locally in a pool of worker processes: Python
+        with the ast module, other languages with their tree-sitter grammar.
+        
+        Parsing is CPU-bound, so files are sent to SOURCE_ANALYSIS_WORKERS
+        processes in chunks; results arrive as chunks finish, which is not
+        necessarily in input order.
+        
+        Args:
+            source_files: (file node, "python" or grammar name) of the files to analyze
             
-        except Exception as e:
-            self.logger.error(f"Error analyzing Python file {file_path}: {str(e)}")
-            return None
+        Yields:
+            (file node, extracted metadata or None) for every file
+        """
+        nodes_by_id = {file_node["file_id"]: file_node for file_node, _ in source_files}
+        jobs = [
+            (file_node["file_path"], file_node["file_id"], file_node["relative_path"], grammar)
+            for file_node, grammar in source_files
+        ]
+        workers = self._analysis_worker_count(len(jobs))
+        if workers > 1:
+            self.logger.info(f"Analyzing {len(jobs)} source files in {workers} processes")
+        
+        async for file_id, metadata, error in tree_sitter_extraction.analyze_source_files(
+            jobs,
+            self.project_id,
+            workers,
+            settings.PYTHON_ANALYSIS_CHUNK_SIZE
+        ):
+            if error:
+                self.logger.error(error)
+            yield nodes_by_id[file_id], metadata
     
     async def _analyze_with_openai(
         self, 
         file_path: str, 
         file_type: str, 
         file_id: str,
-        relative_path: str
+        relative_path: str,
+        file_size: Optional[int] = None
     ) -> Optional[Dict[str, Any]]:
         """
         Analyze a file using OpenAI's language model.
@@ -496,13 +416,15 @@ class ContentAnalysisAgent(BaseAgent):
             file_type: Type of file
             file_id: ID of the File node
             relative_path: Relative path from project root
+            file_size: Size of the file from the manifest, read from disk if not given
             
         Returns:
             Extracted metadata
         """
         try:
             # Check if file size is too large
-            file_size = os.path.getsize(file_path)
+            if file_size is None:
+                file_size = len(read_project_file(file_path))
             max_size_mb = 0.1  # 100KB limit for analysis
             if file_size > max_size_mb * 1024 * 1024:
                 self.logger.warning(f"File {file_path} is too large ({file_size} bytes) for OpenAI analysis, skipping")
@@ -517,8 +439,7 @@ class ContentAnalysisAgent(BaseAgent):
                 }
             
             # Read file content
-            with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
-                content = f.read()
+            content = read_project_file(file_path).decode('utf-8', errors='replace')
             
             # Check if content is too large for OpenAI
             if len(content) > 25000:  # Conservative limit for token count
@@ -536,28 +457,36 @@ class ContentAnalysisAgent(BaseAgent):
             Code:
             {content}"""
             
-            # Prepare response format based on OpenAI model capabilities
-            try:
-                # Try with response_format
-                response = self.openai_client.chat.completions.create(
-                    model=settings.OPENAI_MODEL,
-                    messages=[{"role": "user", "content": prompt}],
-                    response_format={"type": "json_object"},
-                    temperature=0.0,
-                    max_tokens=4000
-                )
-            except Exception as format_error:
-                self.logger.warning(f"OpenAI JSON response format not supported: {str(format_error)}, using standard response")
-                # Fallback without specifying response format for older models
-                response = self.openai_client.chat.completions.create(
-                    model=settings.OPENAI_MODEL,
-                    messages=[
-                        {"role": "system", "content": "You are a code analyzer. Always respond with valid JSON only."},
-                        {"role": "user", "content": prompt}
-                    ],
-                    temperature=0.0,
-                    max_tokens=4000
-                )
+            # Identical content was usually analyzed before, in this or another project
+            cache = get_llm_cache()
+            cache_key = llm_cache_key(settings.OPENAI_MODEL, _METADATA_PROMPT_VERSION, content, file_type)
+            response_content = cache.get(cache_key) if cache else None
+            from_cache = response_content is not None
+            
+            if not from_cache:
+                # Prepare response format based on OpenAI model capabilities
+                try:
+                    # Try with response_format
+                    response = await self.openai_client.chat.completions.create(
+                        model=settings.OPENAI_MODEL,
+                        messages=[{"role": "user", "content": prompt}],
+                        response_format={"type": "json_object"},
+                        temperature=0.0,
+                        max_tokens=4000
+                    )
+                except Exception as format_error:
+                    self.logger.warning(f"OpenAI JSON response format not supported: {str(format_error)}, using standard response")
+                    # Fallback without specifying response format for older models
+                    response = await self.openai_client.chat.completions.create(
+                        model=settings.OPENAI_MODEL,
+                        messages=[
+                            {"role": "system", "content": "You are a code analyzer. Always respond with valid JSON only."},
+                            {"role": "user", "content": prompt}
+                        ],
+                        temperature=0.0,
+                        max_tokens=4000
+                    )
+                response_content = response.choices[0].message.content
             
             # Parse response and structure metadata
             metadata = {
@@ -571,7 +500,6 @@ class ContentAnalysisAgent(BaseAgent):
             }
             
             # Process OpenAI response
-            response_content = response.choices[0].message.content
             try:
                 import json
                 # Try to find and extract JSON if it's wrapped in markdown code blocks or other text
@@ -584,10 +512,15 @@ class ContentAnalysisAgent(BaseAgent):
                 else:
                     parsed_data = json.loads(response_content)
                 
-                # Process functions
-                for func in parsed_data.get("functions", []):
+                # Only responses that parse are worth caching
+                if cache and not from_cache:
+                    cache.set(cache_key, response_content)
+                
+                # Process functions; ids use the position in the response since
+                # the model does not report line numbers
+                for index, func in enumerate(parsed_data.get("functions", [])):
                     function_meta = {
-                        "function_id": str(uuid.uuid4()),
+                        "function_id": stable_id(file_id, "function", func.get("name", ""), index),
                         "file_id": file_id,
                         "project_id": self.project_id,
                         "name": func.get("name", ""),
@@ -602,9 +535,9 @@ class ContentAnalysisAgent(BaseAgent):
                     metadata["functions"].append(function_meta)
                 
                 # Process classes
-                for cls in parsed_data.get("classes", []):
+                for index, cls in enumerate(parsed_data.get("classes", [])):
                     class_meta = {
-                        "class_id": str(uuid.uuid4()),
+                        "class_id": stable_id(file_id, "class", cls.get("name", ""), index),
                         "file_id": file_id,
                         "project_id": self.project_id,
                         "name": cls.get("name", ""),
@@ -621,9 +554,9 @@ class ContentAnalysisAgent(BaseAgent):
                     metadata["classes"].append(class_meta)
                 
                 # Process enums
-                for enum in parsed_data.get("enums", []):
+                for index, enum in enumerate(parsed_data.get("enums", [])):
                     enum_meta = {
-                        "enum_id": str(uuid.uuid4()),
+                        "enum_id": stable_id(file_id, "enum", enum.get("name", ""), index),
                         "file_id": file_id,
                         "project_id": self.project_id,
                         "name": enum.get("name", ""),
@@ -635,15 +568,10 @@ class ContentAnalysisAgent(BaseAgent):
                 
                 # Process imports
                 for imp in parsed_data.get("imports", []):
-                    module_path = imp.get("module", "")
-                    if module_path:
-                        # Convert module name to file path
-                        module_file_path = module_path.replace('.', '/') + '.py'
-                        import_meta = {
-                            "module_path": module_file_path,
-                            "created_at": datetime.utcnow().isoformat()
-                        }
-                        metadata["imports"].append(import_meta)
+                    module_name = imp.get("module", "")
+                    if module_name:
+                        # Resolved against the project's module index like Python imports
+                        metadata["imports"].append({"module": module_name, "names": [], "level": 0})
             
             except Exception as parse_error:
                 self.logger.error(f"Error parsing OpenAI response for {file_path}: {str(parse_error)}")
@@ -655,103 +583,164 @@ class ContentAnalysisAgent(BaseAgent):
             self.logger.error(f"Error analyzing file {file_path} with OpenAI: {str(e)}")
             return None
     
-    def _infer_return_type(self, node: ast.FunctionDef) -> str:
-        """Infer function return type from annotations or docstring."""
-        if node.returns:
-            return self._get_annotation_name(node.returns)
-        return "Any"  # Default return type
-    
-    def _extract_arguments(self, node: ast.FunctionDef) -> List[Dict[str, str]]:
-        """Extract function arguments with types."""
-        args = []
-        for arg in node.args.args:
-            arg_type = "Any"
-            if arg.annotation:
-                arg_type = self._get_annotation_name(arg.annotation)
-            args.append({"name": arg.arg, "type": arg_type})
-        return args
-    
-    def _extract_decorators(self, node: ast.FunctionDef) -> List[str]:
-        """Extract function decorators."""
-        decorators = []
-        for decorator in node.decorator_list:
-            if isinstance(decorator, ast.Name):
-                decorators.append(f"@{decorator.id}")
-            elif isinstance(decorator, ast.Call):
-                if isinstance(decorator.func, ast.Name):
-                    decorators.append(f"@{decorator.func.id}")
-        return decorators
-    
-    def _infer_class_type(self, node: ast.ClassDef) -> str:
-        """Infer class type (regular, abstract, singleton, etc.)."""
-        # Check for singleton pattern
-        if any(base.id == 'metaclass' for base in node.bases if isinstance(base, ast.Name)):
-            return "singleton"
-        # Check for abstract class
-        if any(d.id == 'abstractmethod' for d in node.decorator_list if isinstance(d, ast.Name)):
-            return "abstract"
-        return "regular"
-    
-    def _extract_class_attributes(self, node: ast.ClassDef) -> List[Dict[str, str]]:
-        """Extract class attributes with types."""
-        attributes = []
-        for item in node.body:
-            if isinstance(item, ast.AnnAssign) and isinstance(item.target, ast.Name):
-                attr_type = "Any"
-                if item.annotation:
-                    attr_type = self._get_annotation_name(item.annotation)
-                attributes.append({
-                    "name": item.target.id,
-                    "type": attr_type,
-                    "visibility": "public"  # Default visibility
+    def _metadata_from_description(self, file_id: str, description: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Build file metadata from the LLM description written during upload.
+        
+        Args:
+            file_id: ID of the File node
+            description: Parsed description with components and dependencies
+            
+        Returns:
+            Extracted metadata in the same shape as _analyze_with_openai
+        """
+        metadata = {
+            "file_id": file_id,
+            "functions": [],
+            "classes": [],
+            "enums": [],
+            "extensions": [],
+            "imports": [],
+            "references": []
+        }
+        
+        for component in description.get("components", []):
+            name = component.get("name")
+            if not name:
+                continue
+            component_type = str(component.get("type", "")).lower()
+            common = {
+                "file_id": file_id,
+                "project_id": self.project_id,
+                "name": name,
+                "docstring": component.get("purpose", ""),
+                "created_at": datetime.utcnow().isoformat()
+            }
+            
+            # Ids use the position among components of the same kind, like
+            # the ids of _analyze_with_openai
+            if "class" in component_type:
+                metadata["classes"].append({
+                    "class_id": stable_id(file_id, "class", name, len(metadata["classes"])),
+                    "type": "regular",
+                    "is_static": False,
+                    "is_final": False,
+                    "superclasses": [],
+                    "interfaces": [],
+                    "methods": [],
+                    "attributes": [],
+                    **common
+                })
+            elif "function" in component_type or "method" in component_type:
+                metadata["functions"].append({
+                    "function_id": stable_id(file_id, "function", name, len(metadata["functions"])),
+                    "return_type": "Any",
+                    "arguments": [],
+                    "decorators": [],
+                    "is_static": False,
+                    "is_async": False,
+                    **common
+                })
+            elif "enum" in component_type:
+                metadata["enums"].append({
+                    "enum_id": stable_id(file_id, "enum", name, len(metadata["enums"])),
+                    "values": [],
+                    **common
                 })
-        return attributes
+        
+        for dependency in description.get("dependencies", []):
+            if isinstance(dependency, str) and dependency:
+                metadata["imports"].append({"module": dependency, "names": [], "level": 0})
+        
+        return metadata
     
-    def _extract_import(self, node: ast.AST, relative_path: str) -> Optional[Dict[str, str]]:
+    def _link_files(self, file_id: str, links: List[List[Any]], metadata_counts: Dict[str, int]) -> None:
         """
-        Extract import information.
+        Queue IMPORTS/REFERENCES relationships from a file to other project files.
         
         Args:
-            node: AST node
-            relative_path: Relative path of the file being analyzed
+            file_id: ID of the source File node
+            links: [relationship type, target path, reference type] entries
+            metadata_counts: Counts to update with the relationships queued
+        """
+        for relationship_type, target_path, reference_type in links:
+            target_file_id = self._file_id_map.get(target_path)
+            if not target_file_id:
+                continue
+            
+            properties = {"created_at": datetime.utcnow().isoformat()}
+            if relationship_type == RelationshipType.REFERENCES.value:
+                properties["reference_type"] = reference_type
+            
+            self.graph_writer.add_relationship({
+                "from_label": NodeType.FILE,
+                "from_property": "file_id",
+                "from_value": file_id,
+                "to_label": NodeType.FILE,
+                "to_property": "file_id",
+                "to_value": target_file_id,
+                "relationship_type": relationship_type,
+                "properties": properties
+            })
+            metadata_counts["imports" if relationship_type == RelationshipType.IMPORTS.value else "references"] += 1
+    
+    def _queue_calls(
+        self,
+        calls: List[Tuple[python_extraction.CallNode, python_extraction.CallNode, int, int]],
+        metadata_counts: Dict[str, int]
+    ) -> None:
+        """
+        Queue CALLS relationships for one file's resolved call sites.
         
-        Returns:
-            Import metadata
+        Methods are not nodes, so a call from or to a method links its class
+        and names the method in caller_methods/callee_methods. Call sites
+        between the same two nodes become one relationship.
+        
+        Args:
+            calls: (caller node, callee node, line, call count) entries
+            metadata_counts: Counts to update with the relationships queued
         """
-        if isinstance(node, ast.Import):
-            for name in node.names:
-                module_path = name.name.replace('.', '/') + '.py'
-                return {"module_path": module_path}
-        elif isinstance(node, ast.ImportFrom):
-            if node.module:
-                # Handle relative imports
-                if node.level > 0:
-                    # Get directory path of current file
-                    current_dir = os.path.dirname(relative_path)
-                    # Go up by node.level directories
-                    for _ in range(node.level):
-                        current_dir = os.path.dirname(current_dir) if current_dir else ""
-                    
-                    # Construct the module path
-                    if node.module:
-                        module_path = os.path.join(current_dir, node.module.replace('.', '/'))
-                    else:
-                        module_path = current_dir
-                    
-                    module_path = module_path.replace('\\', '/') + '.py'
-                else:
-                    module_path = node.module.replace('.', '/') + '.py'
-                
-                return {"module_path": module_path}
-        return None
+        edges: Dict[Tuple[Optional[str], ...], Dict[str, Any]] = {}
+        for (caller_label, caller_id, caller_method), (callee_label, callee_id, callee_method), lineno, count in calls:
+            key = (caller_label, caller_id, callee_label, callee_id)
+            edge = edges.get(key)
+            if edge is None:
+                edge = edges[key] = {"lineno": lineno, "call_count": 0, "caller_methods": set(), "callee_methods": set()}
+            edge["lineno"] = min(edge["lineno"], lineno)
+            edge["call_count"] += count
+            if caller_method:
+                edge["caller_methods"].add(caller_method)
+            if callee_method:
+                edge["callee_methods"].add(callee_method)
+        
+        for (caller_label, caller_id, callee_label, callee_id), edge in edges.items():
+            self.graph_writer.add_relationship({
+                "from_label": caller_label,
+                "from_property": NODE_ID_PROPERTIES[NodeType(caller_label)],
+                "from_value": caller_id,
+                "to_label": callee_label,
+                "to_property": NODE_ID_PROPERTIES[NodeType(callee_label)],
+                "to_value": callee_id,
+                "relationship_type": RelationshipType.CALLS,
+                "properties": {
+                    "lineno": edge["lineno"],
+                    "call_count": edge["call_count"],
+                    "caller_methods": sorted(edge["caller_methods"]),
+                    "callee_methods": sorted(edge["callee_methods"]),
+                    "created_at": datetime.utcnow().isoformat()
+                }
+            })
+        metadata_counts["calls"] += len(edges)
     
-    def _get_annotation_name(self, node: ast.AST) -> str:
-        """Get the string representation of a type annotation."""
-        if isinstance(node, ast.Name):
-            return node.id
-        elif isinstance(node, ast.Constant):
-            return str(node.value)
-        elif isinstance(node, ast.Subscript) and isinstance(node.value, ast.Name):
-            # Handle generic types like List[str], Dict[str, int]
-            return f"{node.value.id}[...]"
-        return "Any"
\ No newline at end of file
+    def _to_node_properties(self, metadata: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Convert extracted metadata to Neo4j node properties.
+        Neo4j cannot store maps or lists of maps, so those are JSON-encoded.
+        """
+        properties = {}
+        for key, value in metadata.items():
+            if isinstance(value, dict) or (isinstance(value, list) and any(isinstance(item, dict) for item in value)):
+                properties[key] = json.dumps(value)
+            else:
+                properties[key] = value
+        return properties
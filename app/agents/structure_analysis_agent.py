@@ -1,6 +1,5 @@
 import os
-import uuid
-import mimetypes
+import posixpath
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple, Set
@@ -9,6 +8,10 @@ from app.agents.base_agent import BaseAgent
 from app.databases import neo4j_manager
 from app.config.settings import get_settings
 from app.utils.constants import RelationshipType, NodeType
+from app.utils.file_manifest import FileManifest, get_manifest
+from app.utils.hashing import file_node_id, stable_id
+from app.utils.storage_lifecycle import record_access
+from app.utils.zip_fs import project_archive_path
 
 settings = get_settings()
 
@@ -16,16 +19,26 @@ settings = get_settings()
 class StructureAnalysisAgent(BaseAgent):
     """
     Agent for analyzing project structure and storing file metadata.
-    Acts as a sub-agent of the Analysis Agent.
+    
+    UploadAgent runs it once per upload and hands its file nodes on to the
+    Analysis Agent; the Analysis Agent only runs it itself when a project
+    is re-analyzed without a new upload.
     """
     
-    async def execute(self, project_dir: Optional[str] = None) -> Dict[str, Any]:
+    async def execute(
+        self,
+        project_dir: Optional[str] = None,
+        manifest: Optional[FileManifest] = None
+    ) -> Dict[str, Any]:
         """
         Execute the structure analysis agent's main functionality.
         
         Args:
             project_dir: Optional path to the project directory. If not provided, 
                          it will be retrieved from the database.
+            manifest: File manifest built during extraction. If not provided,
+                      it is loaded from next to the project directory, or the
+                      directory is scanned once to build it.
         
         Returns:
             Dictionary containing execution results
@@ -43,10 +56,12 @@ class StructureAnalysisAgent(BaseAgent):
                 
                 project_dir = project.get("temp_dir")
             
-            if not os.path.exists(project_dir):
+            # A project served from its archive has no directory until it is extracted
+            if not os.path.exists(project_dir) and not os.path.exists(project_archive_path(project_dir)):
                 error_message = f"Project directory {project_dir} does not exist"
                 self.log_error(error_message)
                 return {"success": False, "error": error_message}
+            record_access(project_dir)
             
             # Update project status
             self.update_project_status(
@@ -55,8 +70,11 @@ class StructureAnalysisAgent(BaseAgent):
                 current_step="Analyzing project structure"
             )
             
+            if manifest is None:
+                manifest = get_manifest(project_dir)
+            
             # Process project structure
-            result = await self._process_project_structure(project_dir)
+            result = await self._process_project_structure(project_dir, manifest)
             
             if not result["success"]:
                 return result
@@ -83,6 +101,9 @@ class StructureAnalysisAgent(BaseAgent):
                 "success": True,
                 "file_count": result["file_count"],
                 "folder_count": result["folder_count"],
+                "unchanged_file_count": result["unchanged_file_count"],
+                "replaced_file_count": result["replaced_file_count"],
+                "deleted_file_count": result["deleted_file_count"],
                 "file_nodes": result["file_nodes"],
                 "folder_nodes": result["folder_nodes"],
                 "project_dir": project_dir
@@ -93,12 +114,18 @@ class StructureAnalysisAgent(BaseAgent):
             self.log_error(error_message)
             return {"success": False, "error": error_message}
     
-    async def _process_project_structure(self, project_dir: str) -> Dict[str, Any]:
+    async def _process_project_structure(self, project_dir: str, manifest: FileManifest) -> Dict[str, Any]:
         """
         Process project structure and create nodes/relationships in Neo4j.
         
+        Node ids are derived from the project, relative path and (for files)
+        content hash, so files and folders already written by a previous run
+        are skipped and only new or changed ones are written. Files and
+        folders from a previous run that no longer exist are retired.
+        
         Args:
             project_dir: Path to the project directory
+            manifest: File manifest of the project directory
             
         Returns:
             Dictionary containing processing results
@@ -109,11 +136,14 @@ class StructureAnalysisAgent(BaseAgent):
             folder_count = 0
             file_nodes = []
             folder_nodes = []
-            folder_map = {}  # Maps path to folder_id
-            created_folders = set()  # Track created folders
+            folder_map = {}  # Maps relative path to folder_id
+            unchanged_file_count = 0
+            
+            # Nodes written by a previous run of this stage
+            existing_files, existing_folder_ids = self._load_existing_structure()
             
             # Create root folder node
-            root_folder_id = str(uuid.uuid4())
+            root_folder_id = stable_id("folder", self.project_id, ".")
             root_folder = {
                 "folder_id": root_folder_id,
                 "project_id": self.project_id,
@@ -125,157 +155,155 @@ class StructureAnalysisAgent(BaseAgent):
                 "updated_at": datetime.utcnow().isoformat()
             }
             
-            folder_node = self.db.create_node("Folder", root_folder)
-            folder_nodes.append(folder_node)
-            folder_map[str(project_path)] = root_folder_id
-            created_folders.add(str(project_path))
+            folder_nodes.append(root_folder)
+            folder_map["."] = root_folder_id
             folder_count += 1
             
-            # Create relationship from Project to root folder
-            self.db.create_relationship(
-                from_label=NodeType.PROJECT,
-                from_property="project_id",
-                from_value=self.project_id,
-                to_label=NodeType.FOLDER,
-                to_property="folder_id",
-                to_value=root_folder_id,
-                relationship_type=RelationshipType.CONTAINS
-            )
+            if root_folder_id not in existing_folder_ids:
+                self.graph_writer.add_node(NodeType.FOLDER, root_folder)
+                
+                # Create relationship from Project to root folder
+                self.graph_writer.add_relationship({
+                    "from_label": NodeType.PROJECT,
+                    "from_property": "project_id",
+                    "from_value": self.project_id,
+                    "to_label": NodeType.FOLDER,
+                    "to_property": "folder_id",
+                    "to_value": root_folder_id,
+                    "relationship_type": RelationshipType.CONTAINS,
+                    "properties": {}
+                })
             
-            # Prepare file and folder nodes
-            file_properties_list = []
-            folder_properties_list = []
-            relationships = []
+            # The manifest lists parent folders before their children
+            for relative_path in manifest.folders:
+                folder_id = stable_id("folder", self.project_id, relative_path)
+                folder_properties = {
+                    "folder_id": folder_id,
+                    "project_id": self.project_id,
+                    "folder_path": os.path.join(project_dir, relative_path),
+                    "relative_path": relative_path,
+                    "name": posixpath.basename(relative_path),
+                    "is_root": False,
+                    "created_at": datetime.utcnow().isoformat(),
+                    "updated_at": datetime.utcnow().isoformat()
+                }
+                
+                folder_nodes.append(folder_properties)
+                folder_map[relative_path] = folder_id
+                folder_count += 1
+                
+                if folder_id in existing_folder_ids:
+                    continue
+                
+                self.graph_writer.add_node(NodeType.FOLDER, folder_properties)
+                
+                # Add relationship to parent folder
+                parent_folder_id = folder_map.get(posixpath.dirname(relative_path) or ".")
+                if parent_folder_id:
+                    self.graph_writer.add_relationship({
+                        "from_label": NodeType.FOLDER,
+                        "from_property": "folder_id",
+                        "from_value": parent_folder_id,
+                        "to_label": NodeType.FOLDER,
+                        "to_property": "folder_id",
+                        "to_value": folder_id,
+                        "relationship_type": RelationshipType.CONTAINS,
+                        "properties": {}
+                    })
             
-            # Walk through the project directory
-            for root, dirs, files in os.walk(project_dir):
-                current_path = Path(root)
-                relative_path = current_path.relative_to(project_path)
-                relative_path_str = str(relative_path).replace('\\', '/') if str(relative_path) != '.' else '.'
+            for file in manifest.files():
+                file_path = file["path"]
+                file_relative_path = file["relative_path"]
+                content_hash = file["content_hash"]
+                file_id = file_node_id(self.project_id, file_relative_path, content_hash)
                 
-                # Ensure parent folders are created
-                parent_path = current_path.parent
-                if str(current_path) != str(project_path) and str(current_path) not in created_folders:
-                    # Create folder node
-                    folder_id = str(uuid.uuid4())
-                    folder_properties = {
-                        "folder_id": folder_id,
-                        "project_id": self.project_id,
-                        "folder_path": str(current_path),
-                        "relative_path": relative_path_str,
-                        "name": current_path.name,
-                        "is_root": False,
-                        "created_at": datetime.utcnow().isoformat(),
-                        "updated_at": datetime.utcnow().isoformat()
-                    }
-                    
-                    folder_properties_list.append(folder_properties)
-                    folder_map[str(current_path)] = folder_id
-                    created_folders.add(str(current_path))
-                    folder_count += 1
-                    
-                    # Add relationship to parent folder
-                    parent_folder_id = folder_map.get(str(parent_path))
-                    if parent_folder_id:
-                        relationships.append({
-                            "from_label": NodeType.FOLDER,
-                            "from_property": "folder_id",
-                            "from_value": parent_folder_id,
-                            "to_label": NodeType.FOLDER,
-                            "to_property": "folder_id",
-                            "to_value": folder_id,
-                            "relationship_type": RelationshipType.CONTAINS,
-                            "properties": {}
-                        })
+                # Create file properties
+                file_properties = {
+                    "file_id": file_id,
+                    "project_id": self.project_id,
+                    "file_path": file_path,
+                    "relative_path": file_relative_path,
+                    "name": file["name"],
+                    "file_type": file["file_type"],
+                    "size": file["size"],
+                    "content_hash": content_hash,
+                    # Binary, generated or minified files are never parsed or described
+                    "content_tag": file["content_tag"],
+                    "created_at": datetime.utcnow().isoformat(),
+                    "updated_at": datetime.utcnow().isoformat()
+                }
                 
-                # Process files in the current directory
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    file_relative_path = str(Path(file_path).relative_to(project_path)).replace('\\', '/')
-                    
-                    # Skip hidden files and directories
-                    if file.startswith('.') or '/.' in file_relative_path or '\\.' in file_relative_path:
-                        continue
-                    
-                    # Get file metadata
-                    file_type = self._get_file_type(file_path)
-                    file_size = os.path.getsize(file_path)
-                    file_id = str(uuid.uuid4())
-                    
-                    # Create file properties
-                    file_properties = {
-                        "file_id": file_id,
-                        "project_id": self.project_id,
-                        "file_path": file_path,
-                        "relative_path": file_relative_path,
-                        "name": file,
-                        "file_type": file_type,
-                        "size": file_size,
-                        "created_at": datetime.utcnow().isoformat(),
-                        "updated_at": datetime.utcnow().isoformat()
-                    }
-                    
-                    file_properties_list.append(file_properties)
-                    file_count += 1
-                    
-                    # Add relationship to parent folder
-                    folder_id = folder_map.get(str(current_path))
-                    if folder_id:
-                        relationships.append({
-                            "from_label": NodeType.FOLDER,
-                            "from_property": "folder_id",
-                            "from_value": folder_id,
-                            "to_label": NodeType.FILE,
-                            "to_property": "file_id",
-                            "to_value": file_id,
-                            "relationship_type": RelationshipType.CONTAINS,
-                            "properties": {}
+                # Same path and content as last run: the node and its
+                # relationships already exist, so skip them
+                existing_file = existing_files.get(file_id)
+                if existing_file is not None:
+                    if existing_file.get("file_path") != file_path:
+                        self.graph_writer.add_node(NodeType.FILE, {
+                            "file_id": file_id,
+                            "file_path": file_path,
+                            "updated_at": datetime.utcnow().isoformat()
                         })
-            
-            # Batch create nodes and relationships
-            if folder_properties_list:
-                batch_size = 100  # Adjust based on performance testing
-                for i in range(0, len(folder_properties_list), batch_size):
-                    batch = folder_properties_list[i:i+batch_size]
-                    folder_nodes.extend(self.db.create_nodes_batch("Folder", batch))
-            
-            if file_properties_list:
-                batch_size = 100  # Adjust based on performance testing
-                for i in range(0, len(file_properties_list), batch_size):
-                    batch = file_properties_list[i:i+batch_size]
-                    file_nodes.extend(self.db.create_nodes_batch("File", batch))
-            
-            if relationships:
-                batch_size = 100  # Adjust based on performance testing
-                for i in range(0, len(relationships), batch_size):
-                    batch = relationships[i:i+batch_size]
-                    self.db.create_relationships_batch(batch)
-            
-            # Create relationship from Project to all files
-            project_file_relationships = []
-            for file_props in file_properties_list:
-                project_file_relationships.append({
+                    file_nodes.append({
+                        **file_properties,
+                        "analyzed_hash": existing_file.get("analyzed_hash"),
+                        "links": existing_file.get("links"),
+                        "import_specs": existing_file.get("import_specs"),
+                        "unchanged": True
+                    })
+                    file_count += 1
+                    unchanged_file_count += 1
+                    continue
+                
+                self.graph_writer.add_node(NodeType.FILE, file_properties)
+                file_nodes.append(file_properties)
+                file_count += 1
+                
+                # Add relationship to parent folder
+                folder_id = folder_map.get(posixpath.dirname(file_relative_path) or ".")
+                if folder_id:
+                    self.graph_writer.add_relationship({
+                        "from_label": NodeType.FOLDER,
+                        "from_property": "folder_id",
+                        "from_value": folder_id,
+                        "to_label": NodeType.FILE,
+                        "to_property": "file_id",
+                        "to_value": file_id,
+                        "relationship_type": RelationshipType.CONTAINS,
+                        "properties": {}
+                    })
+                
+                # Add relationship from Project to file
+                self.graph_writer.add_relationship({
                     "from_label": NodeType.PROJECT,
                     "from_property": "project_id",
                     "from_value": self.project_id,
                     "to_label": NodeType.FILE,
                     "to_property": "file_id",
-                    "to_value": file_props["file_id"],
-                    "relationship_type": RelationshipType.CONTAINS_FILE,
+                    "to_value": file_id,
+                    "relationship_type": RelationshipType.CONTAINS,
                     "properties": {}
                 })
             
-            # Batch create project-file relationships
-            if project_file_relationships:
-                batch_size = 100  # Adjust based on performance testing
-                for i in range(0, len(project_file_relationships), batch_size):
-                    batch = project_file_relationships[i:i+batch_size]
-                    self.db.create_relationships_batch(batch)
+            # Stage boundary: make sure every node and relationship is written
+            self.graph_writer.flush()
+            
+            retired = {"replaced": 0, "tombstoned": 0}
+            if existing_files or existing_folder_ids:
+                retired = self._retire_stale_structure(file_nodes, list(folder_map.values()))
+            
+            self.logger.info(
+                f"Structure of project {self.project_id}: {file_count} files "
+                f"({unchanged_file_count} unchanged, {retired['replaced']} replaced, "
+                f"{retired['tombstoned']} deleted)"
+            )
             
             return {
                 "success": True,
                 "file_count": file_count,
                 "folder_count": folder_count,
+                "unchanged_file_count": unchanged_file_count,
+                "replaced_file_count": retired["replaced"],
+                "deleted_file_count": retired["tombstoned"],
                 "file_nodes": file_nodes,
                 "folder_nodes": folder_nodes
             }
@@ -284,76 +312,127 @@ class StructureAnalysisAgent(BaseAgent):
             error_message = f"Error processing project structure: {str(e)}"
             self.log_error(error_message)
             return {"success": False, "error": error_message}
+        
+        finally:
+            self.graph_writer.close()
     
-    def _get_file_type(self, file_path: str) -> str:
+    def _load_existing_structure(self) -> Tuple[Dict[str, Dict[str, Any]], Set[str]]:
         """
-        Determine the file type based on extension and content.
+        Load the File and Folder nodes written by a previous run of this stage.
+        
+        Returns:
+            Tuple of (file_id -> stored file properties, set of folder ids)
+        """
+        files = self.db.run_query(
+            """
+            MATCH (:Folder {project_id: $project_id})-[:CONTAINS]->(f:File)
+            RETURN f.file_id AS file_id,
+                   f.file_path AS file_path,
+                   f.analyzed_hash AS analyzed_hash,
+                   f.links AS links,
+                   f.import_specs AS import_specs
+            """,
+            {"project_id": self.project_id}
+        )
+        folders = self.db.run_query(
+            """
+            MATCH (d:Folder {project_id: $project_id})
+            RETURN d.folder_id AS folder_id
+            """,
+            {"project_id": self.project_id}
+        )
+        return (
+            {record["file_id"]: record for record in files},
+            {record["folder_id"] for record in folders}
+        )
+    
+    def _retire_stale_structure(
+        self,
+        file_nodes: List[Dict[str, Any]],
+        folder_ids: List[str]
+    ) -> Dict[str, int]:
+        """
+        Retire files and folders from a previous run that are no longer present.
+        
+        A modified file gets a new id, so its old node is replaced: it is
+        removed together with the metadata and component nodes extracted
+        from it. A file whose path is gone was deleted from the project; it
+        is tombstoned instead (marked deleted together with the nodes
+        extracted from it, and detached from the project and folder tree)
+        so its history stays queryable; readers skip deleted nodes and the
+        relationships that touch them.
         
         Args:
-            file_path: Path to the file
+            file_nodes: Files found in this run
+            folder_ids: Ids of the folders found in this run
             
         Returns:
-            File type
+            Dictionary with the number of files replaced and tombstoned
         """
-        file_extension = os.path.splitext(file_path)[1].lower()
+        file_ids = [file_node["file_id"] for file_node in file_nodes]
+        relative_paths = [file_node["relative_path"] for file_node in file_nodes]
         
-        # Map common extensions to language types
-        extension_map = {
-            '.py': 'python',
-            '.js': 'javascript',
-            '.ts': 'typescript',
-            '.jsx': 'react',
-            '.tsx': 'react',
-            '.html': 'html',
-            '.css': 'css',
-            '.scss': 'scss',
-            '.sass': 'sass',
-            '.java': 'java',
-            '.kt': 'kotlin',
-            '.kts': 'kotlin',
-            '.c': 'c',
-            '.cpp': 'cpp',
-            '.h': 'c_header',
-            '.hpp': 'cpp_header',
-            '.cs': 'csharp',
-            '.go': 'go',
-            '.rs': 'rust',
-            '.rb': 'ruby',
-            '.php': 'php',
-            '.swift': 'swift',
-            '.m': 'objective_c',
-            '.mm': 'objective_cpp',
-            '.sql': 'sql',
-            '.json': 'json',
-            '.xml': 'xml',
-            '.yaml': 'yaml',
-            '.yml': 'yaml',
-            '.md': 'markdown',
-            '.cob': 'cobol',
-            '.cbl': 'cobol',
-            '.dpr': 'delphi',
-            '.pas': 'pascal',
-            '.f': 'fortran',
-            '.f90': 'fortran',
-            '.sh': 'shell',
-            '.bat': 'batch',
-            '.ps1': 'powershell',
-            '.config': 'config',
-            '.toml': 'toml',
-            '.ini': 'ini',
-            '.csv': 'csv',
-            '.txt': 'text'
-        }
+        # A file that was deleted and has come back with the same content
+        # reuses its tombstoned node
+        self.db.run_query(
+            """
+            MATCH (f:File {project_id: $project_id})
+            WHERE f.deleted AND f.file_id IN $file_ids
+            OPTIONAL MATCH (f)-[:HAS_FUNCTION|HAS_CLASS|HAS_ENUM|HAS_EXTENSION|CLASSIFIES_AS]->(child)
+            WITH f, collect(child) AS children
+            FOREACH (child IN children | REMOVE child.deleted)
+            REMOVE f.deleted, f.deleted_at, f.deleted_in_revision
+            """,
+            {"project_id": self.project_id, "file_ids": file_ids}
+        )
         
-        file_type = extension_map.get(file_extension, None)
+        replaced = self.db.run_query(
+            """
+            MATCH (:Folder {project_id: $project_id})-[:CONTAINS]->(f:File)
+            WHERE NOT f.file_id IN $file_ids AND f.relative_path IN $relative_paths
+            OPTIONAL MATCH (f)-[:HAS_FUNCTION|HAS_CLASS|HAS_ENUM|HAS_EXTENSION|CLASSIFIES_AS]->(child)
+            WITH f, collect(child) AS children
+            FOREACH (child IN children | DETACH DELETE child)
+            DETACH DELETE f
+            RETURN count(*) AS replaced
+            """,
+            {"project_id": self.project_id, "file_ids": file_ids, "relative_paths": relative_paths}
+        )
         
-        if file_type:
-            return file_type
+        tombstoned = self.db.run_query(
+            """
+            MATCH (p:Project {project_id: $project_id})
+            MATCH (:Folder {project_id: $project_id})-[:CONTAINS]->(f:File)
+            WHERE NOT f.relative_path IN $relative_paths
+            SET f.deleted = true,
+                f.deleted_at = $deleted_at,
+                f.deleted_in_revision = coalesce(p.revision, 1)
+            WITH DISTINCT f
+            OPTIONAL MATCH (f)-[:HAS_FUNCTION|HAS_CLASS|HAS_ENUM|HAS_EXTENSION|CLASSIFIES_AS]->(child)
+            WITH f, collect(child) AS children
+            FOREACH (child IN children | SET child.deleted = true)
+            WITH f
+            MATCH (f)<-[r:CONTAINS|CONTAINS_FILE]-()
+            DELETE r
+            RETURN count(DISTINCT f) AS tombstoned
+            """,
+            {
+                "project_id": self.project_id,
+                "relative_paths": relative_paths,
+                "deleted_at": datetime.utcnow().isoformat()
+            }
+        )
         
-        # If extension not found in map, use MIME type
-        mime_type, _ = mimetypes.guess_type(file_path)
-        if mime_type:
-            return mime_type.split('/')[0]
+        self.db.run_query(
+            """
+            MATCH (d:Folder {project_id: $project_id})
+            WHERE NOT d.folder_id IN $folder_ids
+            DETACH DELETE d
+            """,
+            {"project_id": self.project_id, "folder_ids": folder_ids}
+        )
         
-        # Fallback to generic type
-        return 'unknown' 
\ No newline at end of file
+        return {
+            "replaced": replaced[0]["replaced"] if replaced else 0,
+            "tombstoned": tombstoned[0]["tombstoned"] if tombstoned else 0
+        }
@@ -7,6 +7,7 @@ from app.celery_app import celery_app
 from app.agents.upload_agent import UploadAgent
 from app.agents.analysis_agent import AnalysisAgent
 from app.config.settings import get_settings
+from app.utils.storage_lifecycle import run_storage_lifecycle
 
 settings = get_settings()
 logger = logging.getLogger(__name__)
@@ -31,8 +32,10 @@ def process_upload(project_id: str, zip_file_path: str, project_data: Dict[str,
         # Create and execute upload agent
         upload_agent = UploadAgent(project_id)
         
-        # Execute upload agent with full analysis including OpenAI-based file descriptions
-        upload_result = asyncio.run(upload_agent.execute(zip_file_path, project_data))
+        # Execute upload agent with full analysis including OpenAI-based file descriptions;
+        # the whole run shares one Neo4j session
+        with upload_agent.db.session_scope():
+            upload_result = asyncio.run(upload_agent.execute(zip_file_path, project_data))
         
         # Clean up temporary ZIP file
         try:
@@ -47,14 +50,18 @@ def process_upload(project_id: str, zip_file_path: str, project_data: Dict[str,
         
         # The upload agent now handles:
         # 1. Extracting files
-        # 2. Analyzing project structure (creating File nodes)
-        # 3. Analyzing file contents with OpenAI (generating descriptions, extracting components)
+        # 2. Analyzing project structure (the only walk of the tree; creates File nodes)
+        # 3. Analyzing file contents with OpenAI (generating descriptions)
         # 4. Creating mappings for components
         # 5. Updating project status throughout the process
         
-        # Begin deeper analysis if upload was successful
+        # Begin deeper analysis if upload was successful; it continues from the
+        # upload's file nodes and descriptions rather than repeating them.
+        # They are popped so the task result stays small.
+        structure_result = upload_result.pop("structure")
+        file_descriptions = upload_result.pop("file_descriptions")
         logger.info(f"Upload and initial analysis successful, starting detailed analysis for project {project_id}")
-        analysis_result = analysis_task(project_id)
+        analysis_result = analysis_task(project_id, structure_result, file_descriptions)
         
         return {
             "success": True, 
@@ -73,12 +80,18 @@ def process_upload(project_id: str, zip_file_path: str, project_data: Dict[str,
 
 
 @celery_app.task
-def analysis_task(project_id: str) -> Dict[str, Any]:
+def analysis_task(
+    project_id: str,
+    structure_result: Optional[Dict[str, Any]] = None,
+    file_descriptions: Optional[Dict[str, Dict[str, Any]]] = None
+) -> Dict[str, Any]:
     """
     Run analysis on the project in the background.
     
     Args:
         project_id: Project ID
+        structure_result: Structure analysis already run during upload
+        file_descriptions: File id to the LLM description written during upload
         
     Returns:
         Analysis results
@@ -88,7 +101,8 @@ def analysis_task(project_id: str) -> Dict[str, Any]:
         
         # Create and execute analysis agent
         analysis_agent = AnalysisAgent(project_id)
-        analysis_result = asyncio.run(analysis_agent.execute())
+        with analysis_agent.db.session_scope():
+            analysis_result = asyncio.run(analysis_agent.execute(structure_result, file_descriptions))
         
         if not analysis_result["success"]:
             logger.error(f"Analysis failed: {analysis_result.get('error', 'Unknown error')}")
@@ -164,6 +178,26 @@ def start_migration(project_id: str) -> Dict[str, Any]:
         return {"success": False, "error": error_message, "project_id": project_id}
 
 
+@celery_app.task
+def cleanup_temp_files() -> Dict[str, Any]:
+    """
+    Keep project trees, archives and migrated outputs within the storage quota.
+    
+    Runs periodically under celery beat. Abandoned uploads and partial
+    extractions are removed, and past STORAGE_QUOTA_MB the least recently
+    used projects are evicted.
+    
+    Returns:
+        Metrics of the run
+    """
+    try:
+        return {"success": True, **run_storage_lifecycle()}
+    except Exception as e:
+        error_message = f"Error in cleanup_temp_files: {str(e)}"
+        logger.error(error_message)
+        return {"success": False, "error": error_message}
+
+
 # Additional tasks will be added for subsequent steps:
 # @celery_app.task
 # def mapping_task(project_id: str) -> Dict[str, Any]:
@@ -1,5 +1,5 @@
 import os
-import uuid
+import asyncio
 import zipfile
 import shutil
 import logging
@@ -10,18 +10,40 @@ from typing import Any, Dict, List, Optional, Tuple
 from pathlib import Path
 
 from app.agents.base_agent import BaseAgent
+from app.agents.structure_analysis_agent import StructureAnalysisAgent
 from app.config.settings import get_settings
 from app.utils.openai_client import get_openai_client
 from app.utils.constants import RelationshipType, NodeType
+from app.utils.file_manifest import FileManifest, build_archive_manifest, build_manifest
+from app.utils.hashing import stable_id
+from app.utils.ignore_rules import archive_ignore_rules
+from app.utils.llm_cache import get_llm_cache, llm_cache_key
+from app.utils.llm_scheduler import LLMScheduler, estimate_tokens
+from app.utils.zip_fs import (
+    close_project_archive,
+    extract_members,
+    member_path,
+    open_project_archive,
+    project_archive_path,
+    read_project_file
+)
+from app.utils.zip_guard import ZipBombError
 
 settings = get_settings()
 logger = logging.getLogger(__name__)
 
+# Bump when the description prompt changes so cached responses are not reused
+_DESCRIPTION_PROMPT_VERSION = "file-description-v1"
+
 
 class UploadAgent(BaseAgent):
     """
     Agent for handling file uploads, extracting ZIP files,
     and initializing project metadata in Neo4j.
+    
+    A new revision of an existing project reuses the analysis of every file
+    whose content is unchanged; only added or modified files are described
+    with the LLM.
     """
     
     async def execute(
@@ -34,12 +56,14 @@ class UploadAgent(BaseAgent):
         
         Args:
             zip_file_path: Path to the uploaded ZIP file
-            project_data: Project metadata
+            project_data: Project metadata; is_revision marks a new revision
+                of an existing project
             
         Returns:
             Dictionary containing execution results
         """
         self.logger.info(f"Starting UploadAgent for project {self.project_id}")
+        is_revision = project_data.get("is_revision", False)
         
         try:
             # Validate ZIP file
@@ -48,15 +72,43 @@ class UploadAgent(BaseAgent):
                 self.log_error(error_message)
                 return {"success": False, "error": error_message}
             
-            # Extract ZIP file
+            # Index the archive in place, or extract it; either way the
+            # ignore rules apply before any member is read
             temp_dir = self._create_temp_directory()
-            extract_result = self._extract_zip(zip_file_path, temp_dir)
+            ignore_patterns = self._get_ignore_patterns(project_data, is_revision)
+            if settings.ANALYZE_FROM_ARCHIVE:
+                extract_result = self._index_zip(zip_file_path, temp_dir, ignore_patterns)
+            else:
+                extract_result = self._extract_zip(zip_file_path, temp_dir, ignore_patterns)
             
             if not extract_result["success"]:
                 return extract_result
                 
+            # Every later stage reads the manifest built during extraction
+            # instead of walking the tree again
+            manifest = extract_result["manifest"]
+            
             # Initialize project in Neo4j
-            project = self._create_project_node(temp_dir, project_data)
+            previous_files = {}
+            if is_revision:
+                # Files of the previous revision, read before any new File node is written
+                previous_files = self._load_current_files()
+                project = self._start_revision(temp_dir, project_data, manifest)
+            else:
+                project = self._create_project_node(temp_dir, project_data, manifest)
+            
+            self.create_report(
+                report_type="extraction",
+                message=(
+                    f"{extract_result['bytes_written']} bytes written, "
+                    f"{extract_result['files_skipped']} ignored files "
+                    f"({extract_result['bytes_skipped']} bytes) skipped"
+                ),
+                details={
+                    key: extract_result[key]
+                    for key in ("file_count", "total_size", "bytes_written", "files_skipped", "bytes_skipped")
+                }
+            )
             
             # Update project status
             self.update_project_status(
@@ -65,10 +117,18 @@ class UploadAgent(BaseAgent):
                 current_step="Project extracted, analyzing structure"
             )
             
-            # Analyze project structure and create file nodes
-            structure_result = await self._analyze_project_structure(temp_dir)
+            # Walk the tree once: the structure stage writes every File and
+            # Folder node, and its file nodes feed the descriptions below and
+            # the analysis stage that follows the upload
+            structure_agent = StructureAnalysisAgent(self.project_id)
+            structure_result = await structure_agent.execute(temp_dir, manifest)
             if not structure_result["success"]:
                 return structure_result
+            file_nodes = structure_result["file_nodes"]
+            
+            revision_diff = None
+            if is_revision:
+                revision_diff = self._diff_revision(previous_files, file_nodes)
                 
             # Analyze file contents with OpenAI to generate descriptions
             self.update_project_status(
@@ -77,7 +137,7 @@ class UploadAgent(BaseAgent):
                 current_step="Analyzing files and generating descriptions"
             )
             
-            content_result = await self._analyze_file_contents(temp_dir, structure_result["files"])
+            content_result = await self._analyze_file_contents(temp_dir, file_nodes)
             if not content_result["success"]:
                 return content_result
                 
@@ -88,7 +148,7 @@ class UploadAgent(BaseAgent):
                 current_step="Creating component mappings"
             )
             
-            mapping_result = await self._create_mappings(structure_result["files"], content_result["metadata"])
+            mapping_result = await self._create_mappings(file_nodes, content_result["metadata"])
             if not mapping_result["success"]:
                 return mapping_result
             
@@ -99,19 +159,37 @@ class UploadAgent(BaseAgent):
                 current_step="Project uploaded, analyzed and ready for migration"
             )
             
+            # Recorded only now, so a later upload of the same archive is
+            # recognised as a duplicate only if this one succeeded
+            if project_data.get("archive_hash"):
+                self.db.update_node(
+                    "Project", "project_id", self.project_id,
+                    {"archive_hash": project_data["archive_hash"]}
+                )
+            
             return {
                 "success": True,
                 "project_id": self.project_id,
                 "temp_dir": temp_dir,
                 "project": project,
                 "files_analyzed": structure_result["file_count"],
-                "components_mapped": mapping_result["mapping_count"]
+                "files_described": content_result["analyzed_files"],
+                "components_mapped": mapping_result["mapping_count"],
+                "revision_diff": revision_diff,
+                # Handed to AnalysisAgent so it neither walks the tree nor
+                # sends a described file to the LLM again
+                "structure": structure_result,
+                "file_descriptions": content_result["metadata"]
             }
             
         except Exception as e:
             error_message = f"Error in UploadAgent: {str(e)}"
             self.log_error(error_message)
             return {"success": False, "error": error_message}
+        
+        finally:
+            # Write what is still buffered on every path, including early returns
+            self.graph_writer.close()
     
     def _create_temp_directory(self) -> str:
         """
@@ -128,58 +206,108 @@ class UploadAgent(BaseAgent):
             settings.TEMP_DIR, 
             f"project_{self.project_id}_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}"
         )
-        os.makedirs(temp_dir, exist_ok=True)
-        self.logger.info(f"Created temporary directory: {temp_dir}")
+        # Served from the archive, the directory only appears once the
+        # project is extracted for a stage that needs the files on disk
+        if not settings.ANALYZE_FROM_ARCHIVE:
+            os.makedirs(temp_dir, exist_ok=True)
+            self.logger.info(f"Created temporary directory: {temp_dir}")
         
         return temp_dir
     
-    def _extract_zip(self, zip_file_path: str, extract_dir: str) -> Dict[str, Any]:
+    def _get_ignore_patterns(self, project_data: Dict[str, Any], is_revision: bool) -> Optional[List[str]]:
+        """
+        Get the per-upload ignore patterns; a revision sent without any keeps the project's.
+        
+        Args:
+            project_data: Project metadata
+            is_revision: Whether a new revision of an existing project is uploaded
+            
+        Returns:
+            Patterns, or None for the defaults and the archive's .gitignore files only
+        """
+        if project_data.get("ignore_patterns") is not None or not is_revision:
+            return project_data.get("ignore_patterns")
+        project = self.db.find_node("Project", "project_id", self.project_id) or {}
+        return project.get("ignore_patterns")
+    
+    def _extract_zip(
+        self,
+        zip_file_path: str,
+        extract_dir: str,
+        ignore_patterns: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
         """
         Extract a ZIP file to the specified directory.
         
+        The ignore rules (defaults, the archive's .gitignore files and
+        ignore_patterns) are compiled first, so ignored members are never
+        decompressed. The rest are extracted in parallel and hashed while
+        they are written, and the extracted tree is then scanned once into
+        the project's file manifest.
+        
         Args:
             zip_file_path: Path to the ZIP file
             extract_dir: Directory to extract the files to
+            ignore_patterns: Per-upload ignore patterns
             
         Returns:
             Dictionary containing extraction results
         """
         try:
             with zipfile.ZipFile(zip_file_path, 'r') as zip_ref:
-                # Check for malicious paths (path traversal)
-                for zip_info in zip_ref.infolist():
-                    if zip_info.filename.startswith('/') or '..' in zip_info.filename:
-                        error_message = f"Potentially malicious path in ZIP: {zip_info.filename}"
-                        self.log_error(error_message)
-                        return {"success": False, "error": error_message}
-                
-                # Get total size for validation
-                total_size = sum(zip_info.file_size for zip_info in zip_ref.infolist())
-                max_size_mb = settings.MAX_UPLOAD_SIZE_MB
-                if max_size_mb and total_size > max_size_mb * 1024 * 1024:
-                    error_message = f"ZIP file too large. Maximum allowed size: {max_size_mb}MB"
+                error_message = self._validate_zip(zip_ref)
+                if error_message:
                     self.log_error(error_message)
                     return {"success": False, "error": error_message}
+                total_size = sum(zip_info.file_size for zip_info in zip_ref.infolist())
+                
+                # Decide what to extract before anything is written
+                ignore = archive_ignore_rules(zip_ref, ignore_patterns)
+                members = []
+                files_skipped = 0
+                bytes_skipped = 0
+                for zip_info in zip_ref.infolist():
+                    if ignore.is_ignored(member_path(zip_info), zip_info.is_dir()):
+                        if not zip_info.is_dir():
+                            files_skipped += 1
+                            bytes_skipped += zip_info.file_size
+                        continue
+                    members.append(zip_info)
+                
+                # Extract files, hashing their contents on the way to disk;
+                # the guard counts the bytes really inflated, not the declared ones
+                content_hashes = extract_members(zip_ref, members, extract_dir)
                 
-                # Extract files
-                zip_ref.extractall(extract_dir)
+                manifest = build_manifest(extract_dir, content_hashes)
+                manifest.save()
+                
+                # The archive stays too, so the storage lifecycle can evict
+                # the extracted tree and keep serving files from the archive
+                self._keep_archive(zip_file_path, extract_dir)
                 
                 # Gather file stats
-                file_count = len(zip_ref.infolist())
+                file_count = len(content_hashes)
                 file_types = {}
-                for zip_info in zip_ref.infolist():
-                    if not zip_info.is_dir():
-                        ext = os.path.splitext(zip_info.filename)[1].lower()
-                        file_types[ext] = file_types.get(ext, 0) + 1
+                for relative_path in content_hashes:
+                    ext = os.path.splitext(relative_path)[1].lower()
+                    file_types[ext] = file_types.get(ext, 0) + 1
+                bytes_written = sum(zip_info.file_size for zip_info in members)
                 
-                self.logger.info(f"Extracted {file_count} files to {extract_dir}")
+                self.logger.info(
+                    f"Extracted {file_count} files ({bytes_written} bytes) to {extract_dir}, "
+                    f"skipped {files_skipped} ignored files ({bytes_skipped} bytes)"
+                )
                 
                 return {
                     "success": True,
                     "extract_dir": extract_dir,
                     "file_count": file_count,
                     "file_types": file_types,
-                    "total_size": total_size
+                    "total_size": total_size,
+                    "bytes_written": bytes_written,
+                    "files_skipped": files_skipped,
+                    "bytes_skipped": bytes_skipped,
+                    "manifest": manifest
                 }
                 
         except zipfile.BadZipFile:
@@ -187,18 +315,144 @@ class UploadAgent(BaseAgent):
             self.log_error(error_message)
             return {"success": False, "error": error_message}
         
+        except ZipBombError as e:
+            # Give the disk back before the next upload on this worker
+            shutil.rmtree(extract_dir, ignore_errors=True)
+            error_message = f"ZIP file rejected: {str(e)}"
+            self.log_error(error_message)
+            return {"success": False, "error": error_message}
+        
         except Exception as e:
             error_message = f"Error extracting ZIP file: {str(e)}"
             self.log_error(error_message)
             return {"success": False, "error": error_message}
     
-    def _create_project_node(self, temp_dir: str, project_data: Dict[str, Any]) -> Dict[str, Any]:
+    def _index_zip(
+        self,
+        zip_file_path: str,
+        project_dir: str,
+        ignore_patterns: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Serve a project from its ZIP file instead of extracting it.
+        
+        The archive is kept next to the project directory, where
+        read_project_file and ensure_extracted find it, and its central
+        directory is indexed into the project's file manifest. Members left
+        out by the ignore rules are not even listed; the others are only
+        decompressed to hash them, and nothing is written to disk.
+        
+        Args:
+            zip_file_path: Path to the ZIP file
+            project_dir: Project directory the archive stands in for
+            ignore_patterns: Per-upload ignore patterns
+            
+        Returns:
+            Dictionary containing indexing results
+        """
+        try:
+            with zipfile.ZipFile(zip_file_path, 'r') as zip_ref:
+                error_message = self._validate_zip(zip_ref)
+            if error_message:
+                self.log_error(error_message)
+                return {"success": False, "error": error_message}
+            
+            archive = self._keep_archive(zip_file_path, project_dir)
+            
+            fs = open_project_archive(project_dir, ignore_patterns)
+            manifest = build_archive_manifest(project_dir, fs)
+            manifest.save()
+            file_stats = manifest.stats()
+            
+            self.logger.info(
+                f"Indexed {len(manifest)} files of {archive} for {project_dir}, "
+                f"skipped {fs.skipped_files} ignored files ({fs.skipped_bytes} bytes)"
+            )
+            
+            return {
+                "success": True,
+                "extract_dir": project_dir,
+                "file_count": file_stats["file_count"],
+                "file_types": file_stats["file_types"],
+                "total_size": sum(manifest.sizes),
+                "bytes_written": 0,
+                "files_skipped": fs.skipped_files,
+                "bytes_skipped": fs.skipped_bytes,
+                "manifest": manifest
+            }
+            
+        except zipfile.BadZipFile:
+            error_message = f"Invalid ZIP file: {zip_file_path}"
+            self.log_error(error_message)
+            return {"success": False, "error": error_message}
+        
+        except ZipBombError as e:
+            close_project_archive(project_dir)
+            archive = project_archive_path(project_dir)
+            if os.path.exists(archive):
+                os.unlink(archive)
+            error_message = f"ZIP file rejected: {str(e)}"
+            self.log_error(error_message)
+            return {"success": False, "error": error_message}
+        
+        except Exception as e:
+            error_message = f"Error indexing ZIP file: {str(e)}"
+            self.log_error(error_message)
+            return {"success": False, "error": error_message}
+    
+    def _keep_archive(self, zip_file_path: str, project_dir: str) -> str:
+        """
+        Keep the uploaded ZIP file next to the project directory.
+        
+        A hard link keeps the upload where process_upload cleans it up
+        without copying it; across filesystems it is copied.
+        
+        Args:
+            zip_file_path: Path to the ZIP file
+            project_dir: Project directory the archive belongs to
+            
+        Returns:
+            Path of the kept archive
+        """
+        archive = project_archive_path(project_dir)
+        try:
+            os.link(zip_file_path, archive)
+        except OSError:
+            shutil.copyfile(zip_file_path, archive)
+        return archive
+    
+    def _validate_zip(self, zip_ref: zipfile.ZipFile) -> Optional[str]:
+        """
+        Check a ZIP file's member paths before any of them is read.
+        
+        Sizes and ratios are checked by the extraction guard, over the
+        members the ignore rules keep, when they are extracted or indexed.
+        
+        Args:
+            zip_ref: Open ZIP file
+            
+        Returns:
+            Error message, or None if the archive is acceptable
+        """
+        # Check for malicious paths (path traversal)
+        for zip_info in zip_ref.infolist():
+            if zip_info.filename.startswith('/') or '..' in zip_info.filename:
+                return f"Potentially malicious path in ZIP: {zip_info.filename}"
+        return None
+    
+    def _create_project_node(
+        self,
+        temp_dir: str,
+        project_data: Dict[str, Any],
+        manifest: FileManifest
+    ) -> Dict[str, Any]:
         """
         Create a Project node in Neo4j.
         
         Args:
             temp_dir: Path to the temporary directory
             project_data: Project metadata
+            manifest: File manifest of the extracted project
             
         Returns:
             Created Project node
@@ -212,7 +466,7 @@ class UploadAgent(BaseAgent):
         os.makedirs(migrated_dir, exist_ok=True)
         
         # Get ZIP file metadata (from extraction step)
-        file_stats = self._get_file_stats(temp_dir)
+        file_stats = manifest.stats()
         
         # Prepare project properties
         project_properties = {
@@ -229,10 +483,13 @@ class UploadAgent(BaseAgent):
             "target_framework": project_data.get("target_framework"),
             "description": project_data.get("description"),
             "custom_mappings": json.dumps(project_data.get("custom_mappings", {})),  # Serialize to JSON string
+            "ignore_patterns": project_data.get("ignore_patterns") or [],
             "file_count": file_stats["file_count"],
             "folder_count": file_stats["folder_count"],
             "largest_file_size": file_stats["largest_file_size"],
             "file_types": json.dumps(file_stats["file_types"]),
+            "tagged_file_count": file_stats["tagged_file_count"],
+            "tagged_bytes": file_stats["tagged_bytes"],
             "created_at": now,
             "updated_at": now
         }
@@ -243,219 +500,139 @@ class UploadAgent(BaseAgent):
         
         return project
         
-    def _get_file_stats(self, directory: str) -> Dict[str, Any]:
+    def _start_revision(
+        self,
+        temp_dir: str,
+        project_data: Dict[str, Any],
+        manifest: FileManifest
+    ) -> Dict[str, Any]:
         """
-        Get statistics about files in the extracted project.
+        Point an existing Project node at a newly uploaded revision.
         
         Args:
-            directory: Path to the directory to analyze
+            temp_dir: Path to the temporary directory of the new revision
+            project_data: Project settings sent with the new revision
+            manifest: File manifest of the new revision
             
         Returns:
-            Dictionary containing file statistics
+            Updated Project node
         """
-        file_count = 0
-        folder_count = 0
-        largest_file_size = 0
-        file_types = {}
+        project = self.db.find_node("Project", "project_id", self.project_id) or {}
+        file_stats = manifest.stats()
         
-        for root, dirs, files in os.walk(directory):
-            folder_count += len(dirs)
-            
-            for file in files:
-                file_path = os.path.join(root, file)
-                
-                # Skip hidden files
-                if file.startswith('.'):
-                    continue
-                
-                # Get file extension and update counts
-                ext = os.path.splitext(file)[1].lower()
-                file_types[ext] = file_types.get(ext, 0) + 1
-                
-                # Update counts
-                file_count += 1
-                
-                # Check file size
-                file_size = os.path.getsize(file_path)
-                largest_file_size = max(largest_file_size, file_size)
-        
-        return {
-            "file_count": file_count,
-            "folder_count": folder_count,
-            "largest_file_size": largest_file_size,
-            "file_types": file_types
+        updates = {
+            key: value
+            for key, value in project_data.items()
+            if key not in ("is_revision", "custom_mappings", "archive_hash")
         }
+        if "custom_mappings" in project_data:
+            updates["custom_mappings"] = json.dumps(project_data["custom_mappings"])
+        updates.update({
+            "temp_dir": temp_dir,
+            "revision": (project.get("revision") or 1) + 1,
+            "status": "uploaded",
+            "progress": 10.0,
+            "current_step": "Project revision uploaded and extracted",
+            "file_count": file_stats["file_count"],
+            "folder_count": file_stats["folder_count"],
+            "largest_file_size": file_stats["largest_file_size"],
+            "file_types": json.dumps(file_stats["file_types"]),
+            "tagged_file_count": file_stats["tagged_file_count"],
+            "tagged_bytes": file_stats["tagged_bytes"],
+            "updated_at": datetime.utcnow().isoformat()
+        })
+        
+        self.logger.info(f"Starting revision {updates['revision']} of project {self.project_id}")
+        return self.db.update_node("Project", "project_id", self.project_id, updates)
     
-    async def _analyze_project_structure(self, directory: str) -> Dict[str, Any]:
+    def _load_current_files(self) -> Dict[str, str]:
         """
-        Analyze project structure and create File nodes in Neo4j.
+        Load the files of the project's current revision.
         
-        Args:
-            directory: Path to the project directory
-            
         Returns:
-            Dictionary containing analysis results
+            Dictionary mapping relative path to file id
         """
-        try:
-            self.logger.info(f"Analyzing project structure for {self.project_id}")
-            files = []
-            file_count = 0
-            
-            # Get project node
-            project_node = self.db.find_node("Project", "project_id", self.project_id)
-            if not project_node:
-                return {"success": False, "error": "Project node not found"}
-            
-            # Walk through directory
-            for root, dirs, filenames in os.walk(directory):
-                # Process files
-                for filename in filenames:
-                    # Skip hidden files and directories
-                    if filename.startswith('.') or "/." in root:
-                        continue
-                    
-                    file_path = os.path.join(root, filename)
-                    relative_path = os.path.relpath(file_path, directory)
-                    
-                    # Get file info
-                    file_size = os.path.getsize(file_path)
-                    file_ext = os.path.splitext(filename)[1].lower()
-                    
-                    # Determine file type
-                    file_type = self._detect_file_type(filename, file_ext)
-                    
-                    # Create file node
-                    file_id = str(uuid.uuid4())
-                    file_properties = {
-                        "id": file_id,
-                        "file_id": file_id,
-                        "project_id": self.project_id,
-                        "file_path": file_path,
-                        "relative_path": relative_path,
-                        "file_name": filename,
-                        "file_type": file_type,
-                        "extension": file_ext,
-                        "size": file_size,
-                        "created_at": datetime.utcnow().isoformat()
-                    }
-                    
-                    file_node = self.db.create_node("File", file_properties)
-                    
-                    # Create relationship to project
-                    self.db.create_relationship(
-                        "Project", "project_id", self.project_id,
-                        "CONTAINS",
-                        "File", "id", file_id
-                    )
-                    
-                    files.append({
-                        "id": file_id,
-                        "path": file_path,
-                        "relative_path": relative_path,
-                        "name": filename,
-                        "type": file_type,
-                        "extension": file_ext,
-                        "size": file_size
-                    })
-                    
-                    file_count += 1
-            
-            self.logger.info(f"Created {file_count} File nodes for project {self.project_id}")
-            
-            return {
-                "success": True,
-                "file_count": file_count,
-                "files": files
-            }
-            
-        except Exception as e:
-            error_message = f"Error analyzing project structure: {str(e)}"
-            self.log_error(error_message)
-            return {"success": False, "error": error_message}
+        result = self.db.run_query(
+            """
+            MATCH (:Project {project_id: $project_id})-[:CONTAINS]->(f:File)
+            WHERE coalesce(f.deleted, false) = false
+            RETURN f.relative_path AS relative_path, f.file_id AS file_id
+            """,
+            {"project_id": self.project_id}
+        )
+        return {record["relative_path"]: record["file_id"] for record in result}
     
-    def _detect_file_type(self, filename: str, extension: str) -> str:
+    def _diff_revision(
+        self,
+        previous_files: Dict[str, str],
+        files: List[Dict[str, Any]]
+    ) -> Dict[str, int]:
         """
-        Detect file type based on filename and extension.
+        Compare a new revision's files with the previous revision and report it.
+        
+        File ids are derived from path and content, so a file whose id is
+        unchanged has identical content.
         
         Args:
-            filename: Name of the file
-            extension: File extension
+            previous_files: Relative path to file id for the previous revision
+            files: File nodes of the new revision
             
         Returns:
-            Detected file type
-        """
-        # Map common extensions to file types
-        ext_map = {
-            ".py": "python",
-            ".js": "javascript",
-            ".ts": "typescript",
-            ".jsx": "react",
-            ".tsx": "react",
-            ".html": "html",
-            ".css": "css",
-            ".scss": "sass",
-            ".java": "java",
-            ".c": "c",
-            ".cpp": "cpp",
-            ".h": "header",
-            ".cs": "csharp",
-            ".php": "php",
-            ".rb": "ruby",
-            ".go": "go",
-            ".rs": "rust",
-            ".kt": "kotlin",
-            ".swift": "swift",
-            ".m": "objective-c",
-            ".json": "json",
-            ".xml": "xml",
-            ".yml": "yaml",
-            ".yaml": "yaml",
-            ".md": "markdown",
-            ".sql": "sql",
-            ".sh": "shell",
-            ".bat": "batch",
-            ".ps1": "powershell",
-            ".gitignore": "git",
-            ".dockerignore": "docker",
-            ".env": "env",
-            ".txt": "text",
-            ".pdf": "pdf",
-            ".doc": "doc",
-            ".docx": "docx",
-            ".xls": "excel",
-            ".xlsx": "excel",
-            ".csv": "csv",
-            ".jpg": "image",
-            ".jpeg": "image",
-            ".png": "image",
-            ".gif": "image",
-            ".svg": "image",
-            ".ico": "image"
-        }
+            Counts of added, modified, unchanged and deleted files
+        """
+        current_files = {file["relative_path"]: file["file_id"] for file in files}
+        diff = {"added": 0, "modified": 0, "unchanged": 0, "deleted": 0}
+        for relative_path, file_id in current_files.items():
+            previous_id = previous_files.get(relative_path)
+            if previous_id is None:
+                diff["added"] += 1
+            elif previous_id == file_id:
+                diff["unchanged"] += 1
+            else:
+                diff["modified"] += 1
+        diff["deleted"] = sum(1 for relative_path in previous_files if relative_path not in current_files)
+        
+        self.db.update_node("Project", "project_id", self.project_id, {"revision_diff": json.dumps(diff)})
+        self.create_report(
+            report_type="revision_diff",
+            message=(
+                f"{diff['added']} added, {diff['modified']} modified, "
+                f"{diff['unchanged']} unchanged, {diff['deleted']} deleted files"
+            ),
+            details=diff
+        )
+        return diff
+    
+    def _load_file_descriptions(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Load LLM descriptions already stored on this project's File nodes.
         
-        # Handle special filenames
-        if filename == "Dockerfile":
-            return "docker"
-        elif filename == "package.json":
-            return "npm"
-        elif filename == "requirements.txt":
-            return "python-deps"
-        elif filename == "Cargo.toml":
-            return "rust-deps"
-        elif filename == "pom.xml":
-            return "maven"
-        
-        # Return file type based on extension
-        return ext_map.get(extension, "unknown")
+        Returns:
+            Dictionary mapping file id to its description metadata
+        """
+        result = self.db.run_query(
+            """
+            MATCH (f:File {project_id: $project_id})
+            WHERE f.metadata IS NOT NULL
+            RETURN f.file_id AS file_id, f.metadata AS metadata
+            """,
+            {"project_id": self.project_id}
+        )
+        descriptions = {}
+        for record in result:
+            try:
+                descriptions[record["file_id"]] = json.loads(record["metadata"])
+            except (json.JSONDecodeError, TypeError):
+                continue
+        return descriptions
     
     async def _analyze_file_contents(self, directory: str, files: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
         Analyze file contents and generate descriptions using OpenAI.
-        Detects functions, classes, imports, etc. and creates nodes in Neo4j.
         
         Args:
             directory: Path to the project directory
-            files: List of file dictionaries
+            files: File nodes from structure analysis
             
         Returns:
             Dictionary containing analysis results
@@ -467,67 +644,74 @@ class UploadAgent(BaseAgent):
             openai_client = get_openai_client()
             if not openai_client:
                 self.logger.warning("OpenAI client not available, skipping content analysis")
-                return {"success": True, "metadata": {}, "analyzed_files": 0}
+                return {"success": True, "metadata": {}, "analyzed_files": 0, "reused_files": 0}
             
             analyzed_files = 0
+            reused_files = 0
             metadata = {}
             
-            # Process code files (skip binary and large files)
+            # File ids are content-derived, so a stored description for the same
+            # id is still valid; only new or modified files go to the LLM
+            stored_descriptions = self._load_file_descriptions()
+            
+            # Process code files (skip binary, generated, minified and large files)
             code_files = [
                 f for f in files 
-                if self._is_code_file(f["type"]) and f["size"] < settings.MAX_FILE_SIZE_ANALYSIS
+                if self._is_code_file(f["file_type"])
+                and not f.get("content_tag")
+                and f["size"] < settings.MAX_FILE_SIZE_ANALYSIS
             ]
+            tagged_files = [f for f in files if f.get("content_tag") and self._is_code_file(f["file_type"])]
             
-            # Group files by type for batch processing
-            file_groups = {}
+            pending_files: asyncio.Queue = asyncio.Queue()
             for file in code_files:
-                file_type = file["type"]
-                if file_type not in file_groups:
-                    file_groups[file_type] = []
-                file_groups[file_type].append(file)
-            
-            # Analyze each file type group
-            for file_type, group_files in file_groups.items():
-                for file in group_files:
-                    # Read file content
-                    file_path = file["path"]
-                    try:
-                        with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-                            content = f.read()
-                    except Exception as e:
-                        self.logger.warning(f"Error reading file {file_path}: {str(e)}")
-                        continue
-                    
-                    # Skip empty files
-                    if not content.strip():
-                        continue
-                    
-                    # Generate file description with OpenAI
-                    file_metadata = await self._generate_file_description(
-                        file["id"], 
-                        file["relative_path"], 
-                        file_type, 
-                        content
-                    )
-                    
+                if file["file_id"] in stored_descriptions:
+                    metadata[file["file_id"]] = stored_descriptions[file["file_id"]]
+                    reused_files += 1
+                else:
+                    pending_files.put_nowait(file)
+            
+            # LLM calls run concurrently under the scheduler's in-flight and
+            # rate limits; one worker per in-flight slot bounds how many file
+            # contents are held in memory at once
+            self._llm_scheduler = LLMScheduler()
+            completed_files = reused_files
+            
+            async def describe_files() -> None:
+                nonlocal analyzed_files, completed_files
+                while not pending_files.empty():
+                    file = pending_files.get_nowait()
+                    file_metadata = await self._describe_file(file)
                     if file_metadata:
-                        metadata[file["id"]] = file_metadata
+                        metadata[file["file_id"]] = file_metadata
                         analyzed_files += 1
                     
-                    # Update progress periodically
-                    if analyzed_files % 10 == 0:
-                        progress = 30 + min(30, (analyzed_files / len(code_files)) * 30)
+                    # Files finish out of order, so progress counts completions
+                    completed_files += 1
+                    if completed_files % 10 == 0 or completed_files == len(code_files):
+                        progress = 30 + min(30, (completed_files / len(code_files)) * 30)
                         self.update_project_status(
                             progress=progress,
-                            current_step=f"Analyzed {analyzed_files}/{len(code_files)} files"
+                            current_step=f"Analyzed {completed_files}/{len(code_files)} files"
                         )
             
-            self.logger.info(f"Analyzed {analyzed_files} files for project {self.project_id}")
+            workers = min(self._llm_scheduler.max_concurrency, pending_files.qsize())
+            await asyncio.gather(*(describe_files() for _ in range(workers)))
+            
+            # Stage boundary: make sure every described component is written
+            self.graph_writer.flush()
+            self.logger.info(
+                f"Analyzed {analyzed_files} files for project {self.project_id} "
+                f"({reused_files} unchanged files reused, {len(tagged_files)} binary, generated or minified "
+                f"files ({sum(f['size'] for f in tagged_files)} bytes) skipped, "
+                f"{self._llm_scheduler.stats['retries']} LLM retries)"
+            )
             
             return {
                 "success": True,
                 "metadata": metadata,
-                "analyzed_files": analyzed_files
+                "analyzed_files": analyzed_files,
+                "reused_files": reused_files
             }
             
         except Exception as e:
@@ -535,6 +719,34 @@ class UploadAgent(BaseAgent):
             self.log_error(error_message)
             return {"success": False, "error": error_message}
     
+    async def _describe_file(self, file: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Read a file and generate its description.
+        
+        Args:
+            file: File node
+            
+        Returns:
+            File metadata, or an empty dictionary if the file is empty or unreadable
+        """
+        file_path = file["file_path"]
+        try:
+            content = read_project_file(file_path).decode("utf-8", errors="ignore")
+        except Exception as e:
+            self.logger.warning(f"Error reading file {file_path}: {str(e)}")
+            return {}
+        
+        # Skip empty files
+        if not content.strip():
+            return {}
+        
+        return await self._generate_file_description(
+            file["file_id"],
+            file["relative_path"],
+            file["file_type"],
+            content
+        )
+    
     def _is_code_file(self, file_type: str) -> bool:
         """
         Check if file is a code file that should be analyzed.
@@ -546,9 +758,10 @@ class UploadAgent(BaseAgent):
             True if file is a code file, False otherwise
         """
         code_file_types = [
-            "python", "javascript", "typescript", "react", "java", "c", "cpp", 
-            "csharp", "php", "ruby", "go", "rust", "kotlin", "swift", "objective-c",
-            "html", "css", "sass", "shell", "sql"
+            "python", "javascript", "typescript", "react", "java", "c", "cpp",
+            "c_header", "cpp_header", "csharp", "php", "ruby", "go", "rust", "kotlin",
+            "swift", "objective_c", "objective_cpp", "html", "css", "scss", "sass",
+            "shell", "sql"
         ]
         return file_type in code_file_types
     
@@ -606,73 +819,46 @@ class UploadAgent(BaseAgent):
             Response (JSON only):
             """
             
-            # Call OpenAI
-            response = await openai_client.chat.completions.create(
-                model=settings.OPENAI_MODEL,
-                messages=[
-                    {"role": "system", "content": "You analyze code files and extract metadata in JSON format."},
-                    {"role": "user", "content": prompt}
-                ],
-                response_format={"type": "json_object"},
-                temperature=0.2
-            )
+            # Vendored and boilerplate files repeat across projects, so the
+            # description is cached by content rather than by file
+            cache = get_llm_cache()
+            cache_key = llm_cache_key(settings.OPENAI_MODEL, _DESCRIPTION_PROMPT_VERSION, content, file_type)
+            ai_response = cache.get(cache_key) if cache else None
+            from_cache = ai_response is not None
+            
+            if not from_cache:
+                # Call OpenAI; the scheduler owns retries, so the client's own are disabled
+                client = openai_client.with_options(max_retries=0)
+                response = await self._llm_scheduler.run(
+                    lambda: client.chat.completions.create(
+                        model=settings.OPENAI_MODEL,
+                        messages=[
+                            {"role": "system", "content": "You analyze code files and extract metadata in JSON format."},
+                            {"role": "user", "content": prompt}
+                        ],
+                        response_format={"type": "json_object"},
+                        temperature=0.2
+                    ),
+                    estimated_tokens=estimate_tokens(prompt, max_output_tokens=1000)
+                )
+                ai_response = response.choices[0].message.content
             
             # Parse response
-            ai_response = response.choices[0].message.content
             metadata = json.loads(ai_response)
+            if cache and not from_cache:
+                cache.set(cache_key, ai_response)
             
-            # Update file node with description
-            self.db.update_node_properties(
-                "File", 
-                "id", 
-                file_id, 
-                {
-                    "description": metadata.get("description", ""),
-                    "metadata": json.dumps(metadata)
-                }
-            )
-            
-            # Create component nodes for classes and functions
-            if "components" in metadata:
-                for component in metadata.get("components", []):
-                    # Skip if no name
-                    if not component.get("name"):
-                        continue
-                    
-                    component_id = str(uuid.uuid4())
-                    component_type = component.get("type", "unknown").lower()
-                    
-                    # Determine node label based on component type
-                    node_label = "Component"
-                    if "class" in component_type:
-                        node_label = "Class"
-                    elif "function" in component_type or "method" in component_type:
-                        node_label = "Function"
-                    elif "enum" in component_type:
-                        node_label = "Enum"
-                    
-                    # Create component node
-                    component_props = {
-                        "id": component_id,
-                        f"{node_label.lower()}_id": component_id,
-                        "project_id": self.project_id,
-                        "file_id": file_id,
-                        "name": component.get("name"),
-                        "type": component_type,
-                        "purpose": component.get("purpose", ""),
-                        "created_at": datetime.utcnow().isoformat()
-                    }
-                    
-                    node = self.db.create_node(node_label, component_props)
-                    
-                    # Create relationship from file to component
-                    relationship_type = f"HAS_{node_label.upper()}"
-                    self.db.create_relationship(
-                        NodeType.FILE, "id", file_id,
-                        node_label, "id", component_id,
-                        relationship_type
-                    )
+            # Update file node with description; other descriptions are in
+            # flight on this event loop, so backpressure must not block it
+            await self.graph_writer.add_node_async(NodeType.FILE, {
+                "file_id": file_id,
+                "description": metadata.get("description", ""),
+                "metadata": json.dumps(metadata)
+            })
             
+            # Function, Class and Enum nodes are written once, by
+            # ContentAnalysisAgent, which parses the file locally or builds
+            # them from this description
             return metadata
             
         except Exception as e:
@@ -688,7 +874,7 @@ class UploadAgent(BaseAgent):
         Create component mappings based on file analysis.
         
         Args:
-            files: List of file dictionaries
+            files: File nodes from structure analysis
             metadata: File metadata
             
         Returns:
@@ -713,7 +899,7 @@ class UploadAgent(BaseAgent):
             # Group files by type
             file_types = {}
             for file in files:
-                file_type = file["type"]
+                file_type = file["file_type"]
                 if file_type not in file_types:
                     file_types[file_type] = []
                 file_types[file_type].append(file)
@@ -737,7 +923,7 @@ class UploadAgent(BaseAgent):
                     continue
                 
                 # Create component node
-                component_id = str(uuid.uuid4())
+                component_id = stable_id("component", self.project_id, file_type)
                 component_props = {
                     "id": component_id,
                     "component_id": component_id,
@@ -748,15 +934,20 @@ class UploadAgent(BaseAgent):
                     "created_at": datetime.utcnow().isoformat()
                 }
                 
-                component_node = self.db.create_node("Component", component_props)
+                self.graph_writer.add_node(NodeType.COMPONENT, component_props)
                 
                 # Link files to component
                 for file in file_types[file_type]:
-                    self.db.create_relationship(
-                        NodeType.COMPONENT, "id", component_id,
-                        NodeType.FILE, "id", file["id"],
-                        RelationshipType.CLASSIFIES_AS
-                    )
+                    self.graph_writer.add_relationship({
+                        "from_label": NodeType.COMPONENT,
+                        "from_property": "component_id",
+                        "from_value": component_id,
+                        "to_label": NodeType.FILE,
+                        "to_property": "file_id",
+                        "to_value": file["file_id"],
+                        "relationship_type": RelationshipType.CLASSIFIES_AS,
+                        "properties": {}
+                    })
                 
                 # Create mapping if we have target language/framework
                 if target_language != "unknown":
@@ -776,7 +967,7 @@ class UploadAgent(BaseAgent):
                     
                     if target_component:
                         # Create mapping node
-                        mapping_id = str(uuid.uuid4())
+                        mapping_id = stable_id("mapping", component_id)
                         mapping_props = {
                             "id": mapping_id,
                             "mapping_id": mapping_id,
@@ -787,17 +978,24 @@ class UploadAgent(BaseAgent):
                             "created_at": datetime.utcnow().isoformat()
                         }
                         
-                        mapping_node = self.db.create_node("Mapping", mapping_props)
+                        self.graph_writer.add_node(NodeType.MAPPING, mapping_props)
                         
                         # Create relationships
-                        self.db.create_relationship(
-                            NodeType.COMPONENT, "id", component_id,
-                            NodeType.MAPPING, "id", mapping_id,
-                            RelationshipType.MAPS_TO
-                        )
+                        self.graph_writer.add_relationship({
+                            "from_label": NodeType.COMPONENT,
+                            "from_property": "component_id",
+                            "from_value": component_id,
+                            "to_label": NodeType.MAPPING,
+                            "to_property": "mapping_id",
+                            "to_value": mapping_id,
+                            "relationship_type": RelationshipType.MAPS_TO,
+                            "properties": {}
+                        })
                         
                         mapping_count += 1
             
+            # Stage boundary: make sure every component and mapping is written
+            self.graph_writer.flush()
             self.logger.info(f"Created {mapping_count} mappings for project {self.project_id}")
             
             return {
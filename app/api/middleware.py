@@ -0,0 +1,90 @@
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+from fastapi import Request
+from fastapi.responses import JSONResponse
+
+from app.schemas import ErrorResponse
+from app.utils.uploads import UploadTooLargeError, max_upload_bytes
+
+# Room for the multipart boundaries and form fields sent along with the archive
+_MULTIPART_OVERHEAD = 64 * 1024
+
+
+def upload_too_large_response(max_bytes: int) -> JSONResponse:
+    """
+    Build the 413 response for an upload over the size limit.
+
+    Args:
+        max_bytes: Size limit in bytes
+
+    Returns:
+        Error response
+    """
+    return JSONResponse(
+        status_code=413,
+        content=ErrorResponse(
+            status="error",
+            message=UploadTooLargeError(max_bytes).detail,
+            error_code="upload_too_large",
+            details={"max_bytes": max_bytes}
+        ).dict()
+    )
+
+
+async def upload_too_large_handler(request: Request, exc: UploadTooLargeError) -> JSONResponse:
+    """Exception handler answering an UploadTooLargeError with the 413 error response."""
+    return upload_too_large_response(exc.max_bytes)
+
+
+class UploadSizeLimitMiddleware:
+    """
+    Reject upload requests over MAX_UPLOAD_SIZE_MB with 413 while they stream in.
+
+    A declared Content-Length over the limit is rejected before any of the
+    body is read. Otherwise the body is counted as it arrives and the
+    request is aborted at the first chunk past the limit, before the
+    multipart parser has spooled the rest of the upload.
+    """
+
+    def __init__(self, app: Callable[..., Awaitable[None]], path_suffixes: Tuple[str, ...] = ("/upload",)):
+        """
+        Initialize the middleware.
+
+        Args:
+            app: ASGI application to wrap
+            path_suffixes: Request paths ending with one of these are limited
+        """
+        self.app = app
+        self.path_suffixes = path_suffixes
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        max_bytes = max_upload_bytes()
+        if (
+            scope["type"] != "http"
+            or scope["method"] not in ("POST", "PUT")
+            or not scope["path"].endswith(self.path_suffixes)
+            or not max_bytes
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        limit = max_bytes + _MULTIPART_OVERHEAD
+        content_length = dict(scope["headers"]).get(b"content-length", b"")
+        if content_length.isdigit() and int(content_length) > limit:
+            await upload_too_large_response(max_bytes)(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive() -> Dict[str, Any]:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    # An HTTPException passes through the form parser and
+                    # reaches upload_too_large_handler
+                    raise UploadTooLargeError(max_bytes)
+            return message
+
+        await self.app(scope, limited_receive, send)
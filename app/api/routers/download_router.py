@@ -7,6 +7,7 @@ from datetime import datetime
 
 from app.schemas import ErrorResponse
 from app.config.dependencies import dependency_initializer
+from app.utils.storage_lifecycle import record_access
 
 router = APIRouter()
 
@@ -31,7 +32,7 @@ async def download_migrated_code(project_id: str):
     """
     try:
         # Get Neo4j manager from dependency initializer
-        neo4j_manager = dependency_initializer.get_service("neo4j")
+        neo4j_manager = dependency_initializer.get_service("async_neo4j")
         if neo4j_manager is None:
             return JSONResponse(
                 status_code=500,
@@ -44,7 +45,7 @@ async def download_migrated_code(project_id: str):
             )
             
         # Check if project exists
-        project = neo4j_manager.find_node("Project", "project_id", project_id)
+        project = await neo4j_manager.find_node("Project", "project_id", project_id)
         if not project:
             return JSONResponse(
                 status_code=404,
@@ -88,6 +89,8 @@ async def download_migrated_code(project_id: str):
                 ).dict()
             )
         
+        record_access(migrated_dir)
+        
         # Create ZIP file with progress tracking
         zip_filename = f"migrated_{project_id}_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.zip"
         zip_path = os.path.join(tempfile.gettempdir(), zip_filename)
@@ -107,7 +110,7 @@ async def download_migrated_code(project_id: str):
                         # Update progress in Neo4j
                         files_processed += 1
                         progress = (files_processed / total_files) * 100
-                        neo4j_manager.update_node(
+                        await neo4j_manager.update_node(
                             label="Project",
                             property_name="project_id",
                             property_value=project_id,
@@ -35,7 +35,7 @@ async def create_feedback(
     """
     try:
         # Get Neo4j manager from dependency initializer
-        neo4j_manager = dependency_initializer.get_service("neo4j")
+        neo4j_manager = dependency_initializer.get_service("async_neo4j")
         if neo4j_manager is None:
             return JSONResponse(
                 status_code=500,
@@ -47,7 +47,7 @@ async def create_feedback(
             )
             
         # Check if project exists
-        project = neo4j_manager.find_node("Project", "project_id", project_id)
+        project = await neo4j_manager.find_node("Project", "project_id", project_id)
         if not project:
             return JSONResponse(
                 status_code=404,
@@ -75,10 +75,10 @@ async def create_feedback(
         }
         
         # Create Feedback node
-        neo4j_manager.create_node("Feedback", feedback_properties)
+        await neo4j_manager.create_node("Feedback", feedback_properties)
         
         # Create relationship to Project
-        neo4j_manager.create_relationship(
+        await neo4j_manager.create_relationship(
             from_label=NodeType.PROJECT,
             from_property="project_id",
             from_value=project_id,
@@ -89,7 +89,7 @@ async def create_feedback(
         )
         
         # Update project's updated_at timestamp
-        neo4j_manager.update_node(
+        await neo4j_manager.update_node(
             label="Project",
             property_name="project_id",
             property_value=project_id,
@@ -141,7 +141,7 @@ async def get_project_feedback(project_id: str):
     """
     try:
         # Get Neo4j manager from dependency initializer
-        neo4j_manager = dependency_initializer.get_service("neo4j")
+        neo4j_manager = dependency_initializer.get_service("async_neo4j")
         if neo4j_manager is None:
             return JSONResponse(
                 status_code=500,
@@ -153,7 +153,7 @@ async def get_project_feedback(project_id: str):
             )
             
         # Check if project exists
-        project = neo4j_manager.find_node("Project", "project_id", project_id)
+        project = await neo4j_manager.find_node("Project", "project_id", project_id)
         if not project:
             return JSONResponse(
                 status_code=404,
@@ -170,7 +170,7 @@ async def get_project_feedback(project_id: str):
         RETURN f
         ORDER BY f.created_at DESC
         """
-        result = neo4j_manager.run_query(query, {"project_id": project_id})
+        result = await neo4j_manager.run_query(query, {"project_id": project_id})
         
         feedback_list = [FeedbackResponse(**record["f"]) for record in result]
         
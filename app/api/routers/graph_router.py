@@ -1,15 +1,73 @@
 from fastapi import APIRouter, HTTPException, Query
-from fastapi.responses import JSONResponse
-from typing import List, Optional
+from fastapi.responses import JSONResponse, StreamingResponse
+from typing import Any, Dict, List, Optional
 import uuid
 import json
 
 from app.schemas import GraphResponse, ErrorResponse, GraphNode, GraphRelationship
 from app.config.dependencies import dependency_initializer
 from app.utils.constants import RelationshipType
+from app.utils.json_stream import prefetch, stream_json_object
 
 router = APIRouter()
 
+# Properties tried in order to identify a relationship endpoint
+_ENDPOINT_ID_PROPERTIES = ["id", "project_id", "file_id", "function_id", "class_id"]
+_ENDPOINT_ID_PROJECTION = ", ".join(f".{prop}" for prop in _ENDPOINT_ID_PROPERTIES)
+
+
+def _decode_json_property(properties: Dict[str, Any], key: str) -> None:
+    """Decode a JSON-encoded property in place, falling back to an empty dict."""
+    if isinstance(properties.get(key), str):
+        try:
+            properties[key] = json.loads(properties[key])
+        except json.JSONDecodeError:
+            properties[key] = {}
+
+
+def _endpoint_id(endpoint: Dict[str, Any]) -> str:
+    """Return the first id property set on a relationship endpoint."""
+    for prop in _ENDPOINT_ID_PROPERTIES:
+        if endpoint.get(prop):
+            return endpoint[prop]
+    return str(uuid.uuid4())
+
+
+def _to_graph_node(record: Dict[str, Any]) -> GraphNode:
+    """Build a GraphNode from a node query record."""
+    node_labels = record["node_labels"]
+    
+    # Add node_type field and ensure node_id exists
+    node_type = node_labels[0] if node_labels else "Unknown"
+    node_data = dict(record["n"])
+    
+    # Ensure node has an ID
+    if "id" not in node_data:
+        node_data["id"] = f"{node_type.lower()}_{str(uuid.uuid4())}"
+    
+    # Handle special property types
+    _decode_json_property(node_data, "custom_mappings")
+    _decode_json_property(node_data, "metadata")
+    
+    return GraphNode(
+        node_id=node_data["id"],
+        node_type=node_type,
+        properties=node_data
+    )
+
+
+def _to_graph_relationship(record: Dict[str, Any]) -> GraphRelationship:
+    """Build a GraphRelationship from a relationship query record."""
+    rel_props = dict(record["r"] or {})
+    _decode_json_property(rel_props, "metadata")
+    
+    return GraphRelationship(
+        source_id=_endpoint_id(record["n1"]),
+        target_id=_endpoint_id(record["n2"]),
+        relationship_type=record["relationship_type"],
+        properties=rel_props
+    )
+
 
 @router.get(
     "/{project_id}/graph",
@@ -39,7 +97,7 @@ async def get_project_graph(
     """
     try:
         # Get Neo4j manager from dependency initializer
-        neo4j_manager = dependency_initializer.get_service("neo4j")
+        neo4j_manager = dependency_initializer.get_service("async_neo4j")
         if neo4j_manager is None:
             return JSONResponse(
                 status_code=500,
@@ -51,7 +109,7 @@ async def get_project_graph(
             )
             
         # Check if project exists
-        project = neo4j_manager.find_node("Project", "project_id", project_id)
+        project = await neo4j_manager.find_node("Project", "project_id", project_id)
         if not project:
             return JSONResponse(
                 status_code=404,
@@ -65,103 +123,54 @@ async def get_project_graph(
         # Build node query
         node_type_filter = ""
         if node_types and len(node_types) > 0:
-            node_type_filter = " WHERE " + " OR ".join([f"labels(n) CONTAINS '{node_type}'" for node_type in node_types])
+            node_type_filter = " AND (" + " OR ".join([f"'{node_type}' IN labels(n)" for node_type in node_types]) + ")"
         
+        # Tombstoned files and the nodes extracted from them are left out,
+        # along with every relationship that touches one
         nodes_query = f"""
         MATCH (n)
-        WHERE n.project_id = $project_id
-        {node_type_filter}
+        WHERE n.project_id = $project_id AND coalesce(n.deleted, false) = false{node_type_filter}
         RETURN n, labels(n) AS node_labels
         """
         
-        # Get nodes
-        nodes_result = neo4j_manager.run_query(nodes_query, {"project_id": project_id})
-        
         # Build relationship query
         rel_type_filter = ""
         if relationship_types and len(relationship_types) > 0:
-            rel_type_filter = " WHERE " + " OR ".join([f"type(r) = '{rel_type}'" for rel_type in relationship_types])
+            rel_type_filter = " AND (" + " OR ".join([f"type(r) = '{rel_type}'" for rel_type in relationship_types]) + ")"
         
+        # Only the endpoint ids are needed, so avoid shipping whole nodes twice
         relationships_query = f"""
         MATCH (n1)-[r]->(n2)
         WHERE n1.project_id = $project_id AND n2.project_id = $project_id
-        {rel_type_filter}
-        RETURN n1, r, n2
+          AND coalesce(n1.deleted, false) = false AND coalesce(n2.deleted, false) = false{rel_type_filter}
+        RETURN n1 {{{_ENDPOINT_ID_PROJECTION}}} AS n1,
+               properties(r) AS r,
+               type(r) AS relationship_type,
+               n2 {{{_ENDPOINT_ID_PROJECTION}}} AS n2
         """
         
-        # Get relationships
-        relationships_result = neo4j_manager.run_query(relationships_query, {"project_id": project_id})
+        async def _nodes():
+            async for record in neo4j_manager.iter_query(nodes_query, {"project_id": project_id}):
+                yield _to_graph_node(record).dict()
         
-        # Process nodes
-        nodes = []
-        for record in nodes_result:
-            node = record["n"]
-            node_labels = record["node_labels"]
-            
-            # Add node_type field and ensure node_id exists
-            node_type = node_labels[0] if node_labels else "Unknown"
-            node_data = dict(node)
-            
-            # Ensure node has an ID
-            if "id" not in node_data:
-                node_data["id"] = f"{node_type.lower()}_{str(uuid.uuid4())}"
-            
-            # Handle special property types
-            if isinstance(node_data.get("custom_mappings"), str):
-                try:
-                    node_data["custom_mappings"] = json.loads(node_data["custom_mappings"])
-                except json.JSONDecodeError:
-                    node_data["custom_mappings"] = {}
-            
-            if isinstance(node_data.get("metadata"), str):
-                try:
-                    node_data["metadata"] = json.loads(node_data["metadata"])
-                except json.JSONDecodeError:
-                    node_data["metadata"] = {}
-            
-            # Create GraphNode instance
-            graph_node = GraphNode(
-                node_id=node_data["id"],
-                node_type=node_type,
-                properties=node_data
-            )
-            nodes.append(graph_node)
+        async def _relationships():
+            async for record in neo4j_manager.iter_query(relationships_query, {"project_id": project_id}):
+                yield _to_graph_relationship(record).dict()
         
-        # Process relationships
-        relationships = []
-        for record in relationships_result:
-            source = record["n1"]
-            target = record["n2"]
-            relationship = record["r"]
-            
-            # Ensure source and target IDs exist
-            source_id = source.get("id") or source.get("project_id") or source.get("file_id") or source.get("function_id") or source.get("class_id") or str(uuid.uuid4())
-            target_id = target.get("id") or target.get("project_id") or target.get("file_id") or target.get("function_id") or target.get("class_id") or str(uuid.uuid4())
-            
-            # Get relationship properties and handle special types
-            rel_props = dict(relationship)
-            if isinstance(rel_props.get("metadata"), str):
-                try:
-                    rel_props["metadata"] = json.loads(rel_props["metadata"])
-                except json.JSONDecodeError:
-                    rel_props["metadata"] = {}
-            
-            # Create GraphRelationship instance
-            rel_data = GraphRelationship(
-                source_id=source_id,
-                target_id=target_id,
-                relationship_type=type(relationship).__name__,
-                properties=rel_props
-            )
-            relationships.append(rel_data)
+        # Run the first query before any header is sent, so its errors
+        # still become a 500
+        nodes = await prefetch(_nodes())
         
-        # Return graph response with proper data types
-        response_data = {
-            "project_id": project_id,
-            "nodes": [node.dict() for node in nodes],
-            "relationships": [rel.dict() for rel in relationships]
-        }
-        return GraphResponse(**response_data)
+        # Stream the response so memory stays bounded by the fetch size,
+        # not by the size of the project graph
+        return StreamingResponse(
+            stream_json_object({
+                "project_id": project_id,
+                "nodes": nodes,
+                "relationships": _relationships()
+            }),
+            media_type="application/json"
+        )
         
     except Exception as e:
         return JSONResponse(
@@ -206,7 +215,7 @@ async def expand_node(
     """
     try:
         # Get Neo4j manager from dependency initializer
-        neo4j_manager = dependency_initializer.get_service("neo4j")
+        neo4j_manager = dependency_initializer.get_service("async_neo4j")
         if neo4j_manager is None:
             return JSONResponse(
                 status_code=500,
@@ -218,7 +227,7 @@ async def expand_node(
             )
         
         # Check if project exists
-        project = neo4j_manager.find_node("Project", "project_id", project_id)
+        project = await neo4j_manager.find_node("Project", "project_id", project_id)
         if not project:
             return JSONResponse(
                 status_code=404,
@@ -255,14 +264,14 @@ async def expand_node(
         MATCH (start)
         WHERE start.id = $node_id AND start.project_id = $project_id
         OPTIONAL MATCH path = (start){direction_query}(connected)
-        WHERE connected.project_id = $project_id{rel_filter}{node_filter}
+        WHERE connected.project_id = $project_id AND coalesce(connected.deleted, false) = false{rel_filter}{node_filter}
         WITH collect(path) AS paths
         UNWIND paths AS p
         RETURN nodes(p) AS nodes, relationships(p) AS rels
         """
         
         # Execute query
-        result = neo4j_manager.run_query(query, {"node_id": node_id, "project_id": project_id})
+        result = await neo4j_manager.run_query(query, {"node_id": node_id, "project_id": project_id})
         
         # Process results
         all_nodes = {}
@@ -1,11 +1,12 @@
 from fastapi import APIRouter, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from datetime import datetime
 import json
 
 from app.schemas import MetadataResponse, ErrorResponse
 from app.config.dependencies import dependency_initializer
 from app.utils.constants import RelationshipType, NodeType
+from app.utils.json_stream import prefetch, stream_json_object
 
 router = APIRouter()
 
@@ -31,7 +32,7 @@ async def get_project_metadata(project_id: str):
     """
     try:
         # Get Neo4j manager from dependency initializer
-        neo4j_manager = dependency_initializer.get_service("neo4j")
+        neo4j_manager = dependency_initializer.get_service("async_neo4j")
         if neo4j_manager is None:
             return JSONResponse(
                 status_code=500,
@@ -44,7 +45,7 @@ async def get_project_metadata(project_id: str):
             )
             
         # Check if project exists and analysis is complete
-        project = neo4j_manager.find_node("Project", "project_id", project_id)
+        project = await neo4j_manager.find_node("Project", "project_id", project_id)
         if not project:
             return JSONResponse(
                 status_code=404,
@@ -73,165 +74,191 @@ async def get_project_metadata(project_id: str):
                 ).dict()
             )
         
+        # Tombstoned files, with the nodes extracted from them and the
+        # relationships into them, belong to earlier revisions and are skipped
+        
         # Get file metadata with processing information
         files_query = f"""
-        MATCH (p:{NodeType.PROJECT} {{project_id: $project_id}})-[:{RelationshipType.CONTAINS}]->(f:{NodeType.FILE})
+        MATCH (p:{NodeType.PROJECT.value} {{project_id: $project_id}})-[:{RelationshipType.CONTAINS.value}]->(f:{NodeType.FILE.value})
         RETURN f,
-               size((f)<-[:{RelationshipType.CONTAINS}]-(p)) as total_files,
-               size((f)-[:{RelationshipType.HAS_FUNCTION}]->()) as function_count,
-               size((f)-[:{RelationshipType.HAS_CLASS}]->()) as class_count,
-               size((f)-[:{RelationshipType.HAS_ENUM}]->()) as enum_count,
-               size((f)-[:{RelationshipType.HAS_EXTENSION}]->()) as extension_count,
-               size((f)-[:{RelationshipType.IMPORTS}]->()) as import_count,
-               size((f)-[:{RelationshipType.REFERENCES}]->()) as reference_count
+               COUNT {{ (f)<-[:{RelationshipType.CONTAINS.value}]-(p) }} as total_files,
+               COUNT {{ (f)-[:{RelationshipType.HAS_FUNCTION.value}]->() }} as function_count,
+               COUNT {{ (f)-[:{RelationshipType.HAS_CLASS.value}]->() }} as class_count,
+               COUNT {{ (f)-[:{RelationshipType.HAS_ENUM.value}]->() }} as enum_count,
+               COUNT {{ (f)-[:{RelationshipType.HAS_EXTENSION.value}]->() }} as extension_count,
+               COUNT {{ (f)-[:{RelationshipType.IMPORTS.value}]->(t) WHERE coalesce(t.deleted, false) = false }} as import_count,
+               COUNT {{ (f)-[:{RelationshipType.REFERENCES.value}]->(t) WHERE coalesce(t.deleted, false) = false }} as reference_count
         """
-        files_result = neo4j_manager.run_query(files_query, {"project_id": project_id})
-        # Process and serialize file metadata
-        files = []
-        for record in files_result:
-            file_data = dict(record["f"])
-            metadata = {
-                "total_files": int(record["total_files"]),
-                "function_count": int(record["function_count"]),
-                "class_count": int(record["class_count"]),
-                "enum_count": int(record["enum_count"]),
-                "extension_count": int(record["extension_count"]),
-                "import_count": int(record["import_count"]),
-                "reference_count": int(record["reference_count"])
-            }
-            file_data["metadata"] = metadata
-            files.append(file_data)
         
         # Get function metadata with relationship information
         functions_query = f"""
-        MATCH (f:{NodeType.FILE} {{project_id: $project_id}})-[:{RelationshipType.HAS_FUNCTION}]->(fn:{NodeType.FUNCTION})
+        MATCH (f:{NodeType.FILE.value} {{project_id: $project_id}})-[:{RelationshipType.HAS_FUNCTION.value}]->(fn:{NodeType.FUNCTION.value})
+        WHERE coalesce(f.deleted, false) = false
         OPTIONAL MATCH (fn)-[r]->(other)
+        WHERE coalesce(other.deleted, false) = false
         RETURN fn, collect(distinct type(r)) as relationships, collect(distinct labels(other)[0]) as related_types
         """
-        functions_result = neo4j_manager.run_query(functions_query, {"project_id": project_id})
-        # Process function metadata with relationship information
-        functions = []
-        for record in functions_result:
-            function_data = dict(record["fn"])
-            # Ensure proper serialization of function attributes
-            for key in ["arguments", "decorators", "attributes"]:
-                if isinstance(function_data.get(key), str):
-                    try:
-                        function_data[key] = json.loads(function_data[key])
-                    except (json.JSONDecodeError, TypeError):
-                        function_data[key] = []
-            
-            function_data.update({
-                "relationships": record["relationships"] or [],
-                "related_types": record["related_types"] or []
-            })
-            functions.append(function_data)
         
         # Get class metadata with inheritance information
         classes_query = f"""
-        MATCH (f:{NodeType.FILE} {{project_id: $project_id}})-[:{RelationshipType.HAS_CLASS}]->(c:{NodeType.CLASS})
-        OPTIONAL MATCH (c)-[r]->(other:{NodeType.CLASS})
+        MATCH (f:{NodeType.FILE.value} {{project_id: $project_id}})-[:{RelationshipType.HAS_CLASS.value}]->(c:{NodeType.CLASS.value})
+        WHERE coalesce(f.deleted, false) = false
+        OPTIONAL MATCH (c)-[r]->(other:{NodeType.CLASS.value})
+        WHERE coalesce(other.deleted, false) = false
         RETURN c, collect(distinct type(r)) as inheritance_types, collect(distinct other.name) as related_classes
         """
-        classes_result = neo4j_manager.run_query(classes_query, {"project_id": project_id})
-        # Process class metadata with inheritance information
-        classes = []
-        for record in classes_result:
-            class_data = dict(record["c"])
-            # Ensure proper serialization of class attributes
-            for key in ["superclasses", "interfaces", "methods", "attributes"]:
-                if isinstance(class_data.get(key), str):
-                    try:
-                        class_data[key] = json.loads(class_data[key])
-                    except (json.JSONDecodeError, TypeError):
-                        class_data[key] = []
-            
-            class_data.update({
-                "inheritance_types": record["inheritance_types"] or [],
-                "related_classes": record["related_classes"] or []
-            })
-            classes.append(class_data)
         
         # Get enum metadata
         enums_query = f"""
-        MATCH (f:{NodeType.FILE} {{project_id: $project_id}})-[:{RelationshipType.HAS_ENUM}]->(e:{NodeType.ENUM})
+        MATCH (f:{NodeType.FILE.value} {{project_id: $project_id}})-[:{RelationshipType.HAS_ENUM.value}]->(e:{NodeType.ENUM.value})
+        WHERE coalesce(f.deleted, false) = false
         RETURN e
         """
-        enums_result = neo4j_manager.run_query(enums_query, {"project_id": project_id})
-        # Process enum metadata
-        enums = []
-        for record in enums_result:
-            enum_data = dict(record["e"])
-            # Ensure values are properly serialized
-            if isinstance(enum_data.get("values"), str):
-                try:
-                    enum_data["values"] = json.loads(enum_data["values"])
-                except (json.JSONDecodeError, TypeError):
-                    enum_data["values"] = []
-            enums.append(enum_data)
         
         # Get extension metadata
         extensions_query = f"""
-        MATCH (f:{NodeType.FILE} {{project_id: $project_id}})-[:{RelationshipType.HAS_EXTENSION}]->(e:{NodeType.EXTENSION})
+        MATCH (f:{NodeType.FILE.value} {{project_id: $project_id}})-[:{RelationshipType.HAS_EXTENSION.value}]->(e:{NodeType.EXTENSION.value})
+        WHERE coalesce(f.deleted, false) = false
         RETURN e
         """
-        extensions_result = neo4j_manager.run_query(extensions_query, {"project_id": project_id})
-        # Process extension metadata
-        extensions = []
-        for record in extensions_result:
-            extension_data = dict(record["e"])
-            # Ensure methods and other attributes are properly serialized
-            if isinstance(extension_data.get("methods"), str):
-                try:
-                    extension_data["methods"] = json.loads(extension_data["methods"])
-                except (json.JSONDecodeError, TypeError):
-                    extension_data["methods"] = []
-            extensions.append(extension_data)
         
         # Get relationship metadata with file paths
         relationships_query = f"""
-        MATCH (f1:{NodeType.FILE} {{project_id: $project_id}})-[r:{RelationshipType.IMPORTS}|{RelationshipType.REFERENCES}]->(f2:{NodeType.FILE})
+        MATCH (f1:{NodeType.FILE.value} {{project_id: $project_id}})-[r:{RelationshipType.IMPORTS.value}|{RelationshipType.REFERENCES.value}]->(f2:{NodeType.FILE.value})
+        WHERE coalesce(f1.deleted, false) = false AND coalesce(f2.deleted, false) = false
         RETURN f1.relative_path AS source,
                f2.relative_path AS target,
                type(r) AS relationship_type,
                r.imported_items as imported_items,
                r.reference_locations as reference_locations
         """
-        relationships_result = neo4j_manager.run_query(relationships_query, {"project_id": project_id})
-        # Process relationships with metadata
-        relationships = []
-        for record in relationships_result:
-            rel_data = {
-                "source": record["source"],
-                "target": record["target"],
-                "type": record["relationship_type"],
-                "metadata": {
-                    "imported_items": record.get("imported_items", []) or [],
-                    "reference_locations": record.get("reference_locations", []) or []
-                }
-            }
-            relationships.append(rel_data)
         
-        # Prepare summary statistics
+        parameters = {"project_id": project_id}
+        
+        # Sections are streamed record by record; only the counts are kept
+        # in memory for the summary
         summary = {
-            "total_files": len(files),
-            "total_functions": len(functions),
-            "total_classes": len(classes),
-            "total_enums": len(enums),
-            "total_extensions": len(extensions),
-            "total_relationships": len(relationships)
+            "total_files": 0,
+            "total_functions": 0,
+            "total_classes": 0,
+            "total_enums": 0,
+            "total_extensions": 0,
+            "total_relationships": 0
         }
         
-        return MetadataResponse(
-            project_id=project_id,
-            files=files,
-            functions=functions,
-            classes=classes,
-            enums=enums,
-            extensions=extensions,
-            relationships=relationships,
-            summary=summary,
-            last_updated=datetime.utcnow().isoformat()
+        async def _files():
+            # Process and serialize file metadata
+            async for record in neo4j_manager.iter_query(files_query, parameters):
+                file_data = dict(record["f"])
+                file_data["metadata"] = {
+                    "total_files": int(record["total_files"]),
+                    "function_count": int(record["function_count"]),
+                    "class_count": int(record["class_count"]),
+                    "enum_count": int(record["enum_count"]),
+                    "extension_count": int(record["extension_count"]),
+                    "import_count": int(record["import_count"]),
+                    "reference_count": int(record["reference_count"])
+                }
+                summary["total_files"] += 1
+                yield file_data
+        
+        async def _functions():
+            # Process function metadata with relationship information
+            async for record in neo4j_manager.iter_query(functions_query, parameters):
+                function_data = dict(record["fn"])
+                # Ensure proper serialization of function attributes
+                for key in ["arguments", "decorators", "attributes"]:
+                    if isinstance(function_data.get(key), str):
+                        try:
+                            function_data[key] = json.loads(function_data[key])
+                        except (json.JSONDecodeError, TypeError):
+                            function_data[key] = []
+                
+                function_data.update({
+                    "relationships": record["relationships"] or [],
+                    "related_types": record["related_types"] or []
+                })
+                summary["total_functions"] += 1
+                yield function_data
+        
+        async def _classes():
+            # Process class metadata with inheritance information
+            async for record in neo4j_manager.iter_query(classes_query, parameters):
+                class_data = dict(record["c"])
+                # Ensure proper serialization of class attributes
+                for key in ["superclasses", "interfaces", "methods", "attributes"]:
+                    if isinstance(class_data.get(key), str):
+                        try:
+                            class_data[key] = json.loads(class_data[key])
+                        except (json.JSONDecodeError, TypeError):
+                            class_data[key] = []
+                
+                class_data.update({
+                    "inheritance_types": record["inheritance_types"] or [],
+                    "related_classes": record["related_classes"] or []
+                })
+                summary["total_classes"] += 1
+                yield class_data
+        
+        async def _enums():
+            # Process enum metadata
+            async for record in neo4j_manager.iter_query(enums_query, parameters):
+                enum_data = dict(record["e"])
+                # Ensure values are properly serialized
+                if isinstance(enum_data.get("values"), str):
+                    try:
+                        enum_data["values"] = json.loads(enum_data["values"])
+                    except (json.JSONDecodeError, TypeError):
+                        enum_data["values"] = []
+                summary["total_enums"] += 1
+                yield enum_data
+        
+        async def _extensions():
+            # Process extension metadata
+            async for record in neo4j_manager.iter_query(extensions_query, parameters):
+                extension_data = dict(record["e"])
+                # Ensure methods and other attributes are properly serialized
+                if isinstance(extension_data.get("methods"), str):
+                    try:
+                        extension_data["methods"] = json.loads(extension_data["methods"])
+                    except (json.JSONDecodeError, TypeError):
+                        extension_data["methods"] = []
+                summary["total_extensions"] += 1
+                yield extension_data
+        
+        async def _relationships():
+            # Process relationships with metadata
+            async for record in neo4j_manager.iter_query(relationships_query, parameters):
+                summary["total_relationships"] += 1
+                yield {
+                    "source": record["source"],
+                    "target": record["target"],
+                    "type": record["relationship_type"],
+                    "metadata": {
+                        "imported_items": record.get("imported_items", []) or [],
+                        "reference_locations": record.get("reference_locations", []) or []
+                    }
+                }
+        
+        # Pull the first file before the 200 is sent; a failing query or an
+        # unreachable database then lands in the except below
+        files = await prefetch(_files())
+        
+        # Stream the response in MetadataResponse field order; the summary is
+        # written last, once every section has been counted
+        return StreamingResponse(
+            stream_json_object({
+                "project_id": project_id,
+                "files": files,
+                "functions": _functions(),
+                "classes": _classes(),
+                "enums": _enums(),
+                "extensions": _extensions(),
+                "relationships": _relationships(),
+                "summary": lambda: summary,
+                "last_updated": datetime.utcnow().isoformat()
+            }),
+            media_type="application/json"
         )
         
     except Exception as e:
@@ -1,9 +1,7 @@
 import os
 import uuid
-import tempfile
-import shutil
-from typing import Any, Dict, List, Optional
-from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile, BackgroundTasks
+from typing import Any, Dict, List, Optional, Tuple, Union
+from fastapi import APIRouter, Depends, File, Form, Header, HTTPException, Query, Request, UploadFile, BackgroundTasks
 from fastapi.responses import JSONResponse
 from pydantic import ValidationError
 import json
@@ -16,8 +14,12 @@ from app.schemas import (
     ProjectResponse,
     SuccessResponse,
     ErrorResponse,
+    UploadSessionCreate,
 )
 from app.agents.tasks import process_upload
+from app.api.middleware import upload_too_large_response
+from app.utils import upload_sessions
+from app.utils.uploads import UploadTooLargeError, max_upload_bytes, save_upload
 
 settings = get_settings()
 router = APIRouter()
@@ -42,10 +44,21 @@ async def upload_project(
     source_framework: Optional[str] = Form(None),
     target_framework: Optional[str] = Form(None),
     custom_mappings: Optional[str] = Form(None),
+    ignore_patterns: Optional[str] = Form(None),
+    project_id: Optional[str] = Form(None),
 ):
     """
     Upload a ZIP file containing the source code for migration.
     
+    When project_id is given, the archive is uploaded as a new revision of
+    that project: only added or modified files are re-analyzed, unchanged
+    files keep their existing analysis and deleted files are tombstoned.
+    
+    The archive is streamed to disk and hashed as it arrives; an archive
+    over MAX_UPLOAD_SIZE_MB is rejected with 413. An archive identical to
+    the project's current revision, or to a project the user already
+    uploaded for the same target, is not processed again.
+    
     Args:
         file: ZIP file containing the source code
         user_id: User ID
@@ -55,6 +68,10 @@ async def upload_project(
         source_framework: Source framework
         target_framework: Target framework
         custom_mappings: Custom mappings as JSON string
+        ignore_patterns: Extra files to leave out, one .gitignore-style
+            pattern per line, on top of the defaults and the archive's
+            .gitignore files
+        project_id: Existing project to upload a new revision of (optional)
         
     Returns:
         Success response with project ID
@@ -86,47 +103,69 @@ async def upload_project(
             )
     
     try:
-        # Create project data
-        project_id = str(uuid.uuid4())
-        project_data = {
-            "user_id": user_id,
-            "description": description,
-            "source_language": source_language,
-            "target_language": target_language,
-            "source_framework": source_framework,
-            "target_framework": target_framework,
-            "custom_mappings": mappings_dict,
-            "created_at": datetime.utcnow().isoformat(),
-            "updated_at": datetime.utcnow().isoformat(),
-            "status": "uploaded",
-            "progress": 0,
-            "current_step": "Project upload"
-        }
+        neo4j_manager = dependency_initializer.get_service("async_neo4j")
+        prepared = await _prepare_upload(
+            neo4j_manager,
+            project_id,
+            {
+                "user_id": user_id,
+                "description": description,
+                "source_language": source_language,
+                "target_language": target_language,
+                "source_framework": source_framework,
+                "target_framework": target_framework,
+                "custom_mappings": mappings_dict,
+                "ignore_patterns": ignore_patterns.splitlines() if ignore_patterns else None,
+            }
+        )
+        if isinstance(prepared, JSONResponse):
+            return prepared
+        project_id, project, project_data = prepared
+        
+        # Stream the archive to disk, enforcing the size limit and hashing
+        # it in the same pass
+        os.makedirs(settings.TEMP_DIR, exist_ok=True)
+        zip_file_path = os.path.join(settings.TEMP_DIR, f"upload_{uuid.uuid4().hex}.zip")
+        try:
+            _, archive_hash = await save_upload(file, zip_file_path, max_upload_bytes())
+        except UploadTooLargeError as e:
+            return upload_too_large_response(e.max_bytes)
         
-        # Save file to temporary location
-        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.zip')
         try:
-            # Save uploaded file to temporary file
-            with open(temp_file.name, "wb") as buffer:
-                shutil.copyfileobj(file.file, buffer)
+            # An identical archive is recognised before any task is queued
+            duplicate_project_id = await _find_duplicate_upload(neo4j_manager, project, project_data, archive_hash)
+            if duplicate_project_id:
+                os.unlink(zip_file_path)
+                return SuccessResponse(
+                    status="success",
+                    message="Archive already uploaded, not processed again",
+                    data={
+                        "project_id": duplicate_project_id,
+                        "is_revision": bool(project_data.get("is_revision")),
+                        "duplicate": True
+                    }
+                )
+            
+            # Stored on the project once the upload has been processed
+            project_data["archive_hash"] = archive_hash
             
             # Process upload in background
             background_tasks.add_task(
                 process_upload,
                 project_id=project_id,
-                zip_file_path=temp_file.name,
+                zip_file_path=zip_file_path,
                 project_data=project_data
             )
             
         except Exception as e:
             # Clean up temp file on error
-            os.unlink(temp_file.name)
+            os.unlink(zip_file_path)
             raise e
         
         return SuccessResponse(
             status="success",
-            message="Project upload initiated",
-            data={"project_id": project_id}
+            message="Project revision upload initiated" if project_data.get("is_revision") else "Project upload initiated",
+            data={"project_id": project_id, "is_revision": bool(project_data.get("is_revision"))}
         )
         
     except Exception as e:
@@ -140,6 +179,443 @@ async def upload_project(
         )
 
 
+async def _prepare_upload(
+    neo4j_manager: Any,
+    project_id: Optional[str],
+    fields: Dict[str, Any]
+) -> Union[JSONResponse, Tuple[str, Optional[Dict[str, Any]], Dict[str, Any]]]:
+    """
+    Resolve the project an archive is uploaded to and the data for process_upload.
+    
+    Args:
+        neo4j_manager: Async Neo4j manager, or None if not available
+        project_id: Existing project to upload a new revision of, or None
+        fields: Project settings sent with the upload
+        
+    Returns:
+        Tuple of (project ID, existing project or None, project data), or
+        an error response
+    """
+    project = None
+    if project_id:
+        # New revision of an existing project
+        if neo4j_manager is None:
+            return JSONResponse(
+                status_code=500,
+                content=ErrorResponse(
+                    status="error",
+                    message="Database service not available",
+                    error_code="service_unavailable"
+                ).dict()
+            )
+        
+        project = await neo4j_manager.find_node("Project", "project_id", project_id)
+        if not project:
+            return JSONResponse(
+                status_code=404,
+                content=ErrorResponse(
+                    status="error",
+                    message=f"Project {project_id} not found",
+                    error_code="project_not_found"
+                ).dict()
+            )
+        
+        # Only overwrite the project settings that were sent again
+        project_data = {
+            key: value
+            for key, value in {**fields, "custom_mappings": fields.get("custom_mappings") or None}.items()
+            if value is not None
+        }
+        project_data["is_revision"] = True
+    else:
+        # Create project data
+        project_id = str(uuid.uuid4())
+        project_data = {
+            **fields,
+            "custom_mappings": fields.get("custom_mappings") or {},
+            "created_at": datetime.utcnow().isoformat(),
+            "updated_at": datetime.utcnow().isoformat(),
+            "status": "uploaded",
+            "progress": 0,
+            "current_step": "Project upload"
+        }
+    
+    return project_id, project, project_data
+
+
+async def _find_duplicate_upload(
+    neo4j_manager: Any,
+    project: Optional[Dict[str, Any]],
+    project_data: Dict[str, Any],
+    archive_hash: str
+) -> Optional[str]:
+    """
+    Find a project that an identical archive was already uploaded to.
+    
+    Args:
+        neo4j_manager: Async Neo4j manager, or None if not available
+        project: Project a revision is uploaded to, None for a new project
+        project_data: Project settings sent with the upload
+        archive_hash: SHA-256 of the uploaded archive
+        
+    Returns:
+        ID of the project with an identical archive, or None
+    """
+    if project is not None:
+        return project["project_id"] if project.get("archive_hash") == archive_hash else None
+    
+    if neo4j_manager is None:
+        return None
+    
+    # archive_hash is only set once an upload has been processed, so a
+    # failed upload of the same archive is not matched
+    result = await neo4j_manager.run_query(
+        """
+        MATCH (p:Project {user_id: $user_id})
+        WHERE p.archive_hash = $archive_hash
+          AND coalesce(p.target_language, '') = $target_language
+          AND coalesce(p.target_framework, '') = $target_framework
+        RETURN p.project_id AS project_id
+        ORDER BY p.created_at DESC
+        LIMIT 1
+        """,
+        {
+            "user_id": project_data["user_id"],
+            "archive_hash": archive_hash,
+            "target_language": project_data.get("target_language") or "",
+            "target_framework": project_data.get("target_framework") or ""
+        }
+    )
+    return result[0]["project_id"] if result else None
+
+
+@router.post(
+    "/uploads",
+    response_model=SuccessResponse,
+    responses={
+        200: {"model": SuccessResponse},
+        400: {"model": ErrorResponse},
+        413: {"model": ErrorResponse},
+        500: {"model": ErrorResponse},
+    },
+)
+async def create_upload_session(session_request: UploadSessionCreate):
+    """
+    Start a resumable upload of a ZIP file.
+    
+    Alternative to /upload for large archives over unreliable connections:
+    the archive is sent in chunks with PUT /uploads/{session_id}, an
+    interrupted upload resumes from the offset reported by
+    GET /uploads/{session_id}, and POST /uploads/{session_id}/finalize
+    starts processing once every byte has arrived.
+    
+    Args:
+        session_request: Project settings and the size of the archive
+        
+    Returns:
+        Success response with the session ID and offset
+    """
+    if not session_request.filename.endswith('.zip'):
+        return JSONResponse(
+            status_code=400,
+            content=ErrorResponse(
+                status="error",
+                message="Uploaded file must be a ZIP file",
+                error_code="invalid_file_type"
+            ).dict()
+        )
+    
+    max_bytes = max_upload_bytes()
+    if max_bytes and session_request.total_size > max_bytes:
+        return upload_too_large_response(max_bytes)
+    
+    redis_client = dependency_initializer.get_service("redis")
+    if redis_client is None:
+        return JSONResponse(
+            status_code=500,
+            content=ErrorResponse(
+                status="error",
+                message="Upload session store not available",
+                error_code="service_unavailable"
+            ).dict()
+        )
+    
+    try:
+        prepared = await _prepare_upload(
+            dependency_initializer.get_service("async_neo4j"),
+            session_request.project_id,
+            session_request.dict(include={
+                "user_id", "description", "source_language", "target_language",
+                "source_framework", "target_framework", "custom_mappings", "ignore_patterns"
+            })
+        )
+        if isinstance(prepared, JSONResponse):
+            return prepared
+        project_id, _, project_data = prepared
+        
+        session = upload_sessions.create_session(redis_client, project_id, project_data, session_request.total_size)
+        return SuccessResponse(
+            status="success",
+            message="Upload session created",
+            data=_session_data(session)
+        )
+        
+    except Exception as e:
+        return JSONResponse(
+            status_code=500,
+            content=ErrorResponse(
+                status="error",
+                message=f"Error creating upload session: {str(e)}",
+                error_code="upload_failed"
+            ).dict()
+        )
+
+
+@router.put(
+    "/uploads/{session_id}",
+    response_model=SuccessResponse,
+    responses={
+        200: {"model": SuccessResponse},
+        400: {"model": ErrorResponse},
+        404: {"model": ErrorResponse},
+        409: {"model": ErrorResponse},
+        413: {"model": ErrorResponse},
+        500: {"model": ErrorResponse},
+    },
+)
+async def upload_chunk(
+    session_id: str,
+    request: Request,
+    offset: int = Query(..., ge=0, description="Byte offset of this chunk in the archive"),
+    chunk_sha256: Optional[str] = Header(None, alias="X-Chunk-SHA256"),
+):
+    """
+    Append a chunk of a resumable upload at the given offset.
+    
+    The request body is the raw chunk. It is streamed straight into the
+    archive file, and the session only advances once the chunk is complete
+    (and matches X-Chunk-SHA256 when sent), so a failed chunk is retried
+    from the same offset.
+    
+    Args:
+        session_id: Upload session ID
+        request: Request whose body is the chunk
+        offset: Byte offset of this chunk; must equal the session's offset
+        chunk_sha256: SHA-256 hex digest of the chunk (optional)
+        
+    Returns:
+        Success response with the new offset
+    """
+    redis_client = dependency_initializer.get_service("redis")
+    session = upload_sessions.get_session(redis_client, session_id) if redis_client else None
+    if session is None:
+        return _session_not_found(session_id)
+    
+    try:
+        new_offset, received_sha256 = await upload_sessions.write_chunk(
+            redis_client, session, offset, request.stream(), chunk_sha256
+        )
+    except upload_sessions.UploadSessionNotFound:
+        return _session_not_found(session_id)
+    except upload_sessions.UploadSessionConflict as e:
+        return JSONResponse(
+            status_code=409,
+            content=ErrorResponse(
+                status="error",
+                message=str(e),
+                error_code="offset_mismatch",
+                details={"offset": e.offset}
+            ).dict()
+        )
+    except UploadTooLargeError:
+        return JSONResponse(
+            status_code=413,
+            content=ErrorResponse(
+                status="error",
+                message="Chunk runs past the declared size of the archive",
+                error_code="upload_too_large",
+                details={"offset": session["offset"], "total_size": session["total_size"]}
+            ).dict()
+        )
+    except ValueError as e:
+        return JSONResponse(
+            status_code=400,
+            content=ErrorResponse(
+                status="error",
+                message=str(e),
+                error_code="checksum_mismatch",
+                details={"offset": session["offset"]}
+            ).dict()
+        )
+    except Exception as e:
+        return JSONResponse(
+            status_code=500,
+            content=ErrorResponse(
+                status="error",
+                message=f"Error writing chunk: {str(e)}",
+                error_code="upload_failed",
+                details={"offset": session["offset"]}
+            ).dict()
+        )
+    
+    return SuccessResponse(
+        status="success",
+        message="Chunk received",
+        data={
+            "session_id": session_id,
+            "offset": new_offset,
+            "total_size": session["total_size"],
+            "chunk_sha256": received_sha256
+        }
+    )
+
+
+@router.get(
+    "/uploads/{session_id}",
+    response_model=SuccessResponse,
+    responses={
+        200: {"model": SuccessResponse},
+        404: {"model": ErrorResponse},
+    },
+)
+async def get_upload_session(session_id: str):
+    """
+    Get the offset a resumable upload continues from.
+    
+    Args:
+        session_id: Upload session ID
+        
+    Returns:
+        Success response with the session's offset and total size
+    """
+    redis_client = dependency_initializer.get_service("redis")
+    session = upload_sessions.get_session(redis_client, session_id) if redis_client else None
+    if session is None:
+        return _session_not_found(session_id)
+    
+    return SuccessResponse(
+        status="success",
+        message="Upload session retrieved",
+        data=_session_data(session)
+    )
+
+
+@router.post(
+    "/uploads/{session_id}/finalize",
+    response_model=SuccessResponse,
+    responses={
+        200: {"model": SuccessResponse},
+        404: {"model": ErrorResponse},
+        409: {"model": ErrorResponse},
+        500: {"model": ErrorResponse},
+    },
+)
+async def finalize_upload_session(session_id: str, background_tasks: BackgroundTasks):
+    """
+    Finish a resumable upload and start processing the archive.
+    
+    The chunks were written into the archive in place, so it is handed to
+    process_upload as is, without being copied. Its hash was computed as
+    the chunks arrived, and an archive identical to one already uploaded is
+    not processed again, as with /upload.
+    
+    Args:
+        session_id: Upload session ID
+        
+    Returns:
+        Success response with project ID
+    """
+    redis_client = dependency_initializer.get_service("redis")
+    session = upload_sessions.get_session(redis_client, session_id) if redis_client else None
+    if session is None:
+        return _session_not_found(session_id)
+    
+    if session["offset"] != session["total_size"]:
+        return JSONResponse(
+            status_code=409,
+            content=ErrorResponse(
+                status="error",
+                message=f"Upload incomplete: {session['offset']} of {session['total_size']} bytes received",
+                error_code="upload_incomplete",
+                details={"offset": session["offset"], "total_size": session["total_size"]}
+            ).dict()
+        )
+    
+    archive_hash = await upload_sessions.archive_sha256(session)
+    
+    # Only the request that removes the session queues the upload
+    if not upload_sessions.delete_session(redis_client, session_id):
+        return _session_not_found(session_id)
+    
+    project_data = session["project_data"]
+    try:
+        neo4j_manager = dependency_initializer.get_service("async_neo4j")
+        project = None
+        if project_data.get("is_revision") and neo4j_manager is not None:
+            project = await neo4j_manager.find_node("Project", "project_id", session["project_id"])
+        
+        duplicate_project_id = await _find_duplicate_upload(neo4j_manager, project, project_data, archive_hash)
+        if duplicate_project_id:
+            os.unlink(session["path"])
+            return SuccessResponse(
+                status="success",
+                message="Archive already uploaded, not processed again",
+                data={
+                    "project_id": duplicate_project_id,
+                    "is_revision": bool(project_data.get("is_revision")),
+                    "duplicate": True
+                }
+            )
+        
+        project_data["archive_hash"] = archive_hash
+        background_tasks.add_task(
+            process_upload,
+            project_id=session["project_id"],
+            zip_file_path=session["path"],
+            project_data=project_data
+        )
+        
+    except Exception as e:
+        os.unlink(session["path"])
+        return JSONResponse(
+            status_code=500,
+            content=ErrorResponse(
+                status="error",
+                message=f"Error finalizing upload: {str(e)}",
+                error_code="upload_failed"
+            ).dict()
+        )
+    
+    return SuccessResponse(
+        status="success",
+        message="Project revision upload initiated" if project_data.get("is_revision") else "Project upload initiated",
+        data={"project_id": session["project_id"], "is_revision": bool(project_data.get("is_revision"))}
+    )
+
+
+def _session_data(session: Dict[str, Any]) -> Dict[str, Any]:
+    """Public fields of an upload session."""
+    return {
+        "session_id": session["session_id"],
+        "project_id": session["project_id"],
+        "offset": session["offset"],
+        "total_size": session["total_size"],
+        "expires_in": session["expires_in"]
+    }
+
+
+def _session_not_found(session_id: str) -> JSONResponse:
+    """Error response for an unknown or expired upload session."""
+    return JSONResponse(
+        status_code=404,
+        content=ErrorResponse(
+            status="error",
+            message=f"Upload session {session_id} not found or expired",
+            error_code="upload_session_not_found"
+        ).dict()
+    )
+
+
 @router.get(
     "/{project_id}",
     response_model=ProjectResponse,
@@ -161,7 +637,7 @@ async def get_project(project_id: str):
     """
     try:
         # Get Neo4j manager from dependency initializer
-        neo4j_manager = dependency_initializer.get_service("neo4j")
+        neo4j_manager = dependency_initializer.get_service("async_neo4j")
         if neo4j_manager is None:
             return JSONResponse(
                 status_code=500,
@@ -173,7 +649,7 @@ async def get_project(project_id: str):
             )
             
         # Retrieve project from database
-        project = neo4j_manager.find_node("Project", "project_id", project_id)
+        project = await neo4j_manager.find_node("Project", "project_id", project_id)
         
         if not project:
             return JSONResponse(
@@ -244,7 +720,7 @@ async def start_migration(
     """
     try:
         # Get Neo4j manager from dependency initializer
-        neo4j_manager = dependency_initializer.get_service("neo4j")
+        neo4j_manager = dependency_initializer.get_service("async_neo4j")
         if neo4j_manager is None:
             return JSONResponse(
                 status_code=500,
@@ -256,7 +732,7 @@ async def start_migration(
             )
             
         # Retrieve project from database
-        project = neo4j_manager.find_node("Project", "project_id", project_id)
+        project = await neo4j_manager.find_node("Project", "project_id", project_id)
         
         if not project:
             return JSONResponse(
@@ -28,7 +28,7 @@ async def get_project_status(project_id: str):
     """
     try:
         # Get Neo4j manager from dependency initializer
-        neo4j_manager = dependency_initializer.get_service("neo4j")
+        neo4j_manager = dependency_initializer.get_service("async_neo4j")
         if neo4j_manager is None:
             return JSONResponse(
                 status_code=500,
@@ -44,7 +44,7 @@ async def get_project_status(project_id: str):
         MATCH (p:Project {project_id: $project_id})
         RETURN p
         """
-        result = neo4j_manager.run_query(query, {"project_id": project_id})
+        result = await neo4j_manager.run_query(query, {"project_id": project_id})
         
         if not result:
             return JSONResponse(
@@ -55,11 +55,16 @@ def setup_celery_dependencies(sender, **kwargs):
         sys.exit(1)
 
 
-# Define periodic tasks if needed
-# @celery_app.on_after_configure.connect
-# def setup_periodic_tasks(sender, **kwargs):
-#     # Executes every 10 minutes
-#     sender.add_periodic_task(600.0, cleanup_temp_files.s(), name="cleanup temp files")
+@celery_app.on_after_configure.connect
+def setup_periodic_tasks(sender, **kwargs):
+    """
+    Schedule periodic tasks; they run when celery beat is started next to the workers.
+    """
+    from app.agents.tasks import cleanup_temp_files
+    from app.config.settings import get_settings
+    
+    interval = float(get_settings().STORAGE_LIFECYCLE_INTERVAL_SECONDS)
+    sender.add_periodic_task(interval, cleanup_temp_files.s(), name="cleanup temp files")
 
 
 if __name__ == "__main__":
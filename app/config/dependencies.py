@@ -7,6 +7,7 @@ import redis.exceptions
 
 from app.config.settings import get_settings
 from app.databases.neo4j_manager import Neo4jManager
+from app.databases.async_neo4j_manager import AsyncNeo4jManager
 
 # Set up logger
 logger = logging.getLogger(__name__)
@@ -85,7 +86,18 @@ class DependencyInitializer:
             # Test connectivity
             neo4j_manager.driver.verify_connectivity()
             
+            # Idempotent schema migration: constraints and indexes for node lookups
+            if settings.NEO4J_SCHEMA_BOOTSTRAP:
+                schema = neo4j_manager.ensure_schema()
+                logger.info(
+                    f"Neo4j schema ensured: {len(schema['constraints'])} constraints, "
+                    f"{len(schema['indexes'])} indexes, {len(schema['failed'])} failed"
+                )
+            
             self._services["neo4j"] = neo4j_manager
+            
+            # Async manager for FastAPI routers; shares settings with the sync driver
+            self._services["async_neo4j"] = AsyncNeo4jManager()
             logger.info("Neo4j connection initialized successfully")
             return True
             
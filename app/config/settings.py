@@ -1,7 +1,7 @@
 import os
 from functools import lru_cache
 from pydantic_settings import BaseSettings
-from pydantic import Field
+from pydantic import AliasChoices, Field
 from typing import Optional
 
 
@@ -18,11 +18,31 @@ class Settings(BaseSettings):
     NEO4J_URI: str = Field(default="bolt://localhost:7687", description="Neo4j URI")
     NEO4J_USER: str = Field(default="neo4j", description="Neo4j username")
     NEO4J_PASSWORD: str = Field(default="password", description="Neo4j password")
+    NEO4J_SCHEMA_BOOTSTRAP: bool = Field(default=True, description="Create Neo4j constraints and indexes on startup")
+    NEO4J_FETCH_SIZE: int = Field(default=1000, description="Records fetched per round trip when streaming query results")
+    NEO4J_MAX_CONNECTION_POOL_SIZE: int = Field(default=100, description="Maximum connections per Neo4j driver pool")
+    NEO4J_CONNECTION_ACQUISITION_TIMEOUT: float = Field(default=60.0, description="Seconds to wait for a free pooled connection")
+    NEO4J_MAX_CONNECTION_LIFETIME: int = Field(default=3600, description="Seconds before a pooled connection is retired")
+    NEO4J_KEEP_ALIVE: bool = Field(default=True, description="Enable TCP keep-alive on Neo4j connections")
+    GRAPH_WRITE_BATCH_SIZE: int = Field(default=500, description="Rows per batched graph write")
+    GRAPH_WRITE_MAX_AGE_SECONDS: float = Field(default=2.0, description="Maximum time a buffered graph write may wait before flushing")
+    GRAPH_WRITE_MAX_PENDING_BATCHES: int = Field(default=4, description="Queued graph write batches before agents block")
     
     # OpenAI settings
     OPENAI_API_KEY: Optional[str] = None
     OPENAI_MODEL: str = "gpt-4o-mini"  # Default model
     OPENAI_TIMEOUT: int = 60  # Timeout in seconds
+    LLM_MAX_CONCURRENCY: int = Field(default=8, description="Maximum LLM requests in flight per agent")
+    LLM_REQUESTS_PER_MINUTE: int = Field(default=500, description="LLM requests allowed per minute (0 disables the limit)")
+    LLM_TOKENS_PER_MINUTE: int = Field(default=200000, description="LLM tokens allowed per minute (0 disables the limit)")
+    LLM_MAX_RETRIES: int = Field(default=5, description="Retries for LLM requests failing with 429, 5xx or connection errors")
+    LLM_RETRY_BASE_DELAY: float = Field(default=1.0, description="Base delay in seconds for LLM retry backoff")
+    LLM_RETRY_MAX_DELAY: float = Field(default=30.0, description="Maximum delay in seconds between LLM retries")
+    LLM_CACHE_ENABLED: bool = Field(default=True, description="Cache LLM responses by model, prompt version and content hash")
+    LLM_CACHE_DIR: str = Field(default="./storage/llm_cache", description="Directory of the on-disk LLM response cache")
+    LLM_CACHE_TTL_SECONDS: int = Field(default=30 * 24 * 3600, description="Lifetime of cached LLM responses (0 keeps them until evicted)")
+    LLM_CACHE_MAX_DISK_MB: int = Field(default=1024, description="Size limit of the on-disk LLM response cache")
+    LLM_CACHE_REDIS: bool = Field(default=True, description="Share cached LLM responses between workers through Redis")
     
     # Celery settings
     CELERY_BROKER_URL: str = Field(default="redis://localhost:6379/0", description="Celery broker URL")
@@ -31,7 +51,19 @@ class Settings(BaseSettings):
     # Storage settings
     STORAGE_DIR: str = Field(default="./storage", description="Storage directory for project files")
     TEMP_DIR: str = Field(default="./tmp", description="Temporary directory for extracted files")
-    MAX_UPLOAD_SIZE_MB: int = Field(default=500, description="Maximum allowed upload size in MB")
+    MAX_UPLOAD_SIZE_MB: int = Field(default=500, description="Maximum allowed upload size in MB (archive size while uploading, uncompressed size when extracting)")
+    UPLOAD_CHUNK_SIZE: int = Field(default=1024 * 1024, description="Bytes read and written at a time when streaming an upload to disk")
+    UPLOAD_SESSION_TTL_SECONDS: int = Field(default=24 * 3600, description="Lifetime of an idle resumable upload session, renewed by every chunk")
+    UPLOAD_SESSION_LOCK_SECONDS: int = Field(default=600, description="Longest a single chunk write may hold its upload session")
+    ANALYZE_FROM_ARCHIVE: bool = Field(default=True, description="Analyze uploads straight from the ZIP archive, extracting it only when a stage needs the files on disk")
+    ARCHIVE_CACHE_MB: int = Field(default=64, description="Decompressed archive members kept in memory per open archive")
+    MAX_MEMBER_SIZE_MB: int = Field(default=100, description="Maximum uncompressed size in MB of a single file in an uploaded archive")
+    MAX_COMPRESSION_RATIO: int = Field(default=100, description="Maximum ratio of uncompressed to compressed size, per file and for the whole archive, before an upload is treated as a zip bomb")
+    EXTRACT_WORKERS: int = Field(default=4, description="Threads decompressing archive members in parallel during extraction")
+    DEDUP_STORE: bool = Field(default=True, description="Store extracted files once in a content-addressed blob store under STORAGE_DIR and hard-link project trees to it")
+    STORAGE_QUOTA_MB: int = Field(default=20480, description="Disk budget in MB for project trees, archives and migrated outputs; cold projects are evicted past it (0 disables eviction)")
+    STORAGE_MIN_IDLE_SECONDS: int = Field(default=3600, description="Projects and outputs used more recently than this are never evicted")
+    STORAGE_LIFECYCLE_INTERVAL_SECONDS: int = Field(default=600, description="How often the periodic task enforces the storage quota")
     
     # S3 settings (optional)
     USE_S3: bool = Field(default=False, description="Whether to use S3 for storage")
@@ -42,6 +74,13 @@ class Settings(BaseSettings):
     
     # File analysis settings
     MAX_FILE_SIZE_ANALYSIS: int = 500 * 1024  # 500KB max for content analysis
+    SOURCE_ANALYSIS_WORKERS: int = Field(
+        default=0,
+        validation_alias=AliasChoices("SOURCE_ANALYSIS_WORKERS", "PYTHON_ANALYSIS_WORKERS"),
+        description="Processes used to parse Python and tree-sitter source files (0 uses one per CPU; PYTHON_ANALYSIS_WORKERS is read as a fallback)"
+    )
+    PYTHON_ANALYSIS_CHUNK_SIZE: int = Field(default=64, description="Source files sent to an analysis process at a time")
+    TREE_SITTER_LIBRARY: str = Field(default="", description="Compiled tree-sitter grammar library (defaults to STORAGE_DIR/build/languages.so, then the grammars bundled with tree-sitter-languages)")
 
     class Config:
         env_file = ".env"
@@ -1,3 +1,4 @@
 from app.databases.neo4j_manager import neo4j_manager
+from app.databases.async_neo4j_manager import async_neo4j_manager
 
-__all__ = ["neo4j_manager"] 
\ No newline at end of file
+__all__ = ["neo4j_manager", "async_neo4j_manager"] 
\ No newline at end of file
@@ -0,0 +1,358 @@
+import logging
+import time
+from functools import wraps
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, TypeVar
+
+from neo4j import AsyncGraphDatabase, AsyncDriver, AsyncSession
+from neo4j.exceptions import ServiceUnavailable, AuthError
+
+from app.config.settings import get_settings
+from app.databases.neo4j_metrics import Neo4jMetrics
+from app.databases.neo4j_manager import (
+    _driver_pool_config,
+    _serialize_node,
+    _serialize_record,
+    _sanitize_relationship_type,
+    _label,
+    _build_relationship_statements,
+)
+
+settings = get_settings()
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+
+def _timed(func: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+    """Record the latency of an async manager method in the manager's metrics."""
+    @wraps(func)
+    async def wrapper(self, *args: Any, **kwargs: Any) -> T:
+        with self.metrics.time_operation(func.__name__):
+            return await func(self, *args, **kwargs)
+    return wrapper
+
+
+class AsyncNeo4jManager:
+    """
+    Async Neo4j database manager using the Singleton pattern.
+    Mirrors Neo4jManager on top of the driver's AsyncGraphDatabase so that
+    FastAPI routers can query Neo4j without blocking the event loop.
+    """
+
+    _instance = None
+    _driver = None
+
+    def __new__(cls) -> 'AsyncNeo4jManager':
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance.metrics = Neo4jMetrics()
+            cls._instance._init_driver()
+        return cls._instance
+
+    def _init_driver(self) -> None:
+        """Initialize the async Neo4j driver with authentication and pool settings."""
+        try:
+            self._driver = AsyncGraphDatabase.driver(
+                settings.NEO4J_URI,
+                auth=(settings.NEO4J_USER, settings.NEO4J_PASSWORD),
+                **_driver_pool_config()
+            )
+            self.metrics.instrument_pool(self._driver)
+        except (ServiceUnavailable, AuthError) as e:
+            logger.error(f"Failed to initialize async Neo4j driver: {str(e)}")
+            raise
+
+    @property
+    def driver(self) -> AsyncDriver:
+        """Get the async Neo4j driver instance."""
+        if not self._driver:
+            self._init_driver()
+        return self._driver
+
+    def get_session(self) -> AsyncSession:
+        """Get a new async Neo4j session."""
+        return self.driver.session()
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Get connection pool and query latency metrics.
+
+        Returns:
+            Dictionary with in-use/idle connections, connection acquisition
+            wait and per-operation latency histograms
+        """
+        return self.metrics.snapshot(self._driver)
+
+    async def close(self) -> None:
+        """Close the async Neo4j driver connection."""
+        if self._driver:
+            await self._driver.close()
+            self._driver = None
+
+    @_timed
+    async def run_query(
+        self,
+        query: str,
+        parameters: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Run a Cypher query and return the result as a list of dictionaries.
+
+        Args:
+            query: Cypher query string
+            parameters: Query parameters (optional)
+
+        Returns:
+            List of dictionaries containing the query results
+        """
+        async with self.get_session() as session:
+            result = await session.run(query, parameters or {})
+            # Serialize the records to ensure proper JSON conversion
+            return [_serialize_record(record) async for record in result]
+
+    async def iter_query(
+        self,
+        query: str,
+        parameters: Optional[Dict[str, Any]] = None,
+        fetch_size: Optional[int] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Run a Cypher query and stream the results one record at a time.
+
+        Async counterpart of Neo4jManager.iter_query; records are pulled in
+        batches of fetch_size and the session closes when iteration ends.
+
+        Args:
+            query: Cypher query string
+            parameters: Query parameters (optional)
+            fetch_size: Records per round trip (defaults to NEO4J_FETCH_SIZE)
+
+        Yields:
+            Dictionary for each result record
+        """
+        started = time.perf_counter()
+        try:
+            async with self.driver.session(fetch_size=fetch_size or settings.NEO4J_FETCH_SIZE) as session:
+                result = await session.run(query, parameters or {})
+                async for record in result:
+                    yield _serialize_record(record)
+        finally:
+            self.metrics.observe_query("iter_query", time.perf_counter() - started)
+
+    @_timed
+    async def run_transaction(
+        self,
+        tx_function: Callable[..., Awaitable[T]],
+        *args: Any,
+        **kwargs: Any
+    ) -> T:
+        """
+        Run an async function in a write transaction.
+
+        Args:
+            tx_function: Coroutine function to run in transaction
+            args: Positional arguments for the function
+            kwargs: Keyword arguments for the function
+
+        Returns:
+            Result of the transaction function
+        """
+        async with self.get_session() as session:
+            return await session.execute_write(tx_function, *args, **kwargs)
+
+    @_timed
+    async def find_node(
+        self,
+        label: str,
+        property_name: str,
+        property_value: Any
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Find a node by label and property.
+
+        Args:
+            label: Node label
+            property_name: Property name
+            property_value: Property value
+
+        Returns:
+            Dictionary representing the node, or None if not found
+        """
+        query = f"""
+        MATCH (n:{label})
+        WHERE n.{property_name} = $value
+        RETURN n
+        """
+        result = await self.run_query(query, {"value": property_value})
+        if not result:
+            return None
+
+        return _serialize_node(result[0]['n'])
+
+    @_timed
+    async def create_node(
+        self,
+        label: str,
+        properties: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Create a node with the given label and properties.
+
+        Args:
+            label: Node label
+            properties: Node properties
+
+        Returns:
+            Dictionary representing the created node
+        """
+        query = f"""
+        CREATE (n:{label} $properties)
+        RETURN n
+        """
+        result = await self.run_query(query, {"properties": properties})
+        return _serialize_node(result[0]['n']) if result else {}
+
+    @_timed
+    async def update_node(
+        self,
+        label: str,
+        property_name: str,
+        property_value: Any,
+        updates: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Merge the given properties into an existing node.
+
+        Args:
+            label: Node label
+            property_name: Property name used to identify the node
+            property_value: Property value used to identify the node
+            updates: Properties to set on the node
+
+        Returns:
+            Dictionary representing the updated node, or None if not found
+        """
+        query = f"""
+        MATCH (n:{label})
+        WHERE n.{property_name} = $value
+        SET n += $updates
+        RETURN n
+        """
+        result = await self.run_query(query, {"value": property_value, "updates": updates})
+        return _serialize_node(result[0]['n']) if result else None
+
+    @_timed
+    async def create_relationship(
+        self,
+        from_label: str,
+        from_property: str,
+        from_value: Any,
+        to_label: str,
+        to_property: str,
+        to_value: Any,
+        relationship_type: str,
+        properties: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Create a relationship between two nodes.
+
+        Args:
+            from_label: Label of the source node
+            from_property: Property name to identify the source node
+            from_value: Property value to identify the source node
+            to_label: Label of the target node
+            to_property: Property name to identify the target node
+            to_value: Property value to identify the target node
+            relationship_type: Type of relationship
+            properties: Relationship properties (optional)
+
+        Returns:
+            Dictionary representing the created relationship
+        """
+        sanitized_relationship_type = _sanitize_relationship_type(_label(relationship_type))
+
+        query = f"""
+        MATCH (a:{_label(from_label)}), (b:{_label(to_label)})
+        WHERE a.{from_property} = $from_value AND b.{to_property} = $to_value
+        CREATE (a)-[r:{sanitized_relationship_type} $properties]->(b)
+        RETURN r
+        """
+        result = await self.run_query(
+            query,
+            {
+                "from_value": from_value,
+                "to_value": to_value,
+                "properties": properties or {}
+            }
+        )
+        return result[0]['r'] if result else {}
+
+    @_timed
+    async def create_nodes_batch(
+        self,
+        label: str,
+        properties_list: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Create multiple nodes with the same label in a single transaction.
+
+        Args:
+            label: Node label
+            properties_list: List of property dictionaries for each node
+
+        Returns:
+            List of dictionaries representing the created nodes
+        """
+        if not properties_list:
+            return []
+
+        async def _create_nodes_tx(tx, props_list):
+            query = f"""
+            UNWIND $props_list AS props
+            CREATE (n:{label}) SET n = props
+            RETURN n
+            """
+            result = await tx.run(query, props_list=props_list)
+            return [_serialize_node(record["n"]) async for record in result]
+
+        return await self.run_transaction(_create_nodes_tx, properties_list)
+
+    @_timed
+    async def create_relationships_batch(
+        self,
+        relationships: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Create multiple relationships in a single transaction, one UNWIND
+        statement per (labels, match properties, relationship type) group.
+
+        Args:
+            relationships: List of dictionaries containing relationship info
+                (same shape as Neo4jManager.create_relationships_batch)
+
+        Returns:
+            List of dictionaries with the relationship type and the number of
+            relationships created for each group
+        """
+        if not relationships:
+            return []
+
+        statements = _build_relationship_statements(relationships)
+
+        async def _create_relationships_tx(tx, grouped_statements):
+            results = []
+            for rel_type, query, rows in grouped_statements:
+                result = await tx.run(query, rows=rows)
+                record = await result.single()
+                results.append({
+                    "relationship_type": rel_type,
+                    "created": record["count"] if record else 0
+                })
+            return results
+
+        return await self.run_transaction(_create_relationships_tx, statements)
+
+
+async_neo4j_manager = AsyncNeo4jManager()
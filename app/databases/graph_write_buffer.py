@@ -0,0 +1,287 @@
+import asyncio
+import logging
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.config.settings import get_settings
+
+settings = get_settings()
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+# Queue items are ("nodes", label, rows), ("relationships", None, rows) or the stop sentinel
+_STOP = ("stop", None, None)
+
+# How often async producers check for room in a full queue
+_BACKPRESSURE_POLL_SECONDS = 0.01
+
+
+class GraphWriteBuffer:
+    """
+    Write-behind buffer for graph nodes and relationships.
+
+    Agents enqueue nodes and relationships; the buffer groups them into
+    batches and a background thread upserts them through the Neo4j manager's
+    MERGE batch writers, so re-running a stage does not duplicate its graph.
+    Batches are flushed when they reach the configured size, when the oldest
+    buffered item exceeds the configured age, and whenever flush() is called
+    at a stage boundary.
+
+    Node batches are always queued ahead of the relationship batches that may
+    reference them, and the queue of pending batches is bounded so producers
+    block (backpressure) when Neo4j falls behind. Coroutines running
+    alongside others on an event loop use add_node_async and
+    add_relationship_async, which wait for room without blocking the loop.
+
+    The writer thread runs from the first buffered row until flush(), and
+    writes out rows past the age limit itself when the producer goes quiet.
+    """
+
+    def __init__(
+        self,
+        db: Any,
+        batch_size: Optional[int] = None,
+        max_age_seconds: Optional[float] = None,
+        max_pending_batches: Optional[int] = None
+    ):
+        """
+        Initialize the write buffer.
+
+        Args:
+            db: Neo4j manager providing merge_nodes_batch and merge_relationships_batch
+            batch_size: Rows per write batch (defaults to GRAPH_WRITE_BATCH_SIZE)
+            max_age_seconds: Maximum time a row may sit in the buffer (defaults to GRAPH_WRITE_MAX_AGE_SECONDS)
+            max_pending_batches: Batches queued before producers block (defaults to GRAPH_WRITE_MAX_PENDING_BATCHES)
+        """
+        self.db = db
+        self.batch_size = batch_size or settings.GRAPH_WRITE_BATCH_SIZE
+        self.max_age_seconds = max_age_seconds if max_age_seconds is not None else settings.GRAPH_WRITE_MAX_AGE_SECONDS
+        self._queue: "queue.Queue[Tuple[str, Optional[str], Optional[List[Dict[str, Any]]]]]" = queue.Queue(
+            maxsize=max_pending_batches or settings.GRAPH_WRITE_MAX_PENDING_BATCHES
+        )
+        self._nodes: Dict[str, List[Dict[str, Any]]] = {}
+        self._relationships: List[Dict[str, Any]] = []
+        self._oldest: Optional[float] = None
+        # Guards the buffered rows against the writer thread's age flush
+        self._lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+        self._error: Optional[BaseException] = None
+        self.stats = {
+            "nodes_written": 0,
+            "relationships_written": 0,
+            "batches_written": 0,
+            "backpressure_waits": 0,
+            "backpressure_seconds": 0.0
+        }
+
+    def add_node(self, label: str, properties: Dict[str, Any]) -> None:
+        """
+        Buffer a node for creation, or an update of the node with the same id.
+
+        Args:
+            label: Node label
+            properties: Node properties, including the label's id property
+        """
+        label = getattr(label, "value", label)
+        with self._lock:
+            rows = self._nodes.setdefault(label, [])
+            rows.append(properties)
+            self._touch()
+            if len(rows) >= self.batch_size:
+                self._enqueue(("nodes", label, self._nodes.pop(label)))
+            self._check_age()
+
+    def add_nodes(self, label: str, properties_list: List[Dict[str, Any]]) -> None:
+        """Buffer several nodes with the same label."""
+        for properties in properties_list:
+            self.add_node(label, properties)
+
+    def add_relationship(self, relationship: Dict[str, Any]) -> None:
+        """
+        Buffer a relationship for creation unless it already exists.
+
+        Args:
+            relationship: Relationship dict in the shape accepted by
+                Neo4jManager.merge_relationships_batch
+        """
+        with self._lock:
+            self._relationships.append(relationship)
+            self._touch()
+            if len(self._relationships) >= self.batch_size:
+                # Endpoints may still be buffered, so nodes go out first
+                self._enqueue_nodes()
+                self._enqueue(("relationships", None, self._relationships))
+                self._relationships = []
+            self._check_age()
+
+    def add_relationships(self, relationships: List[Dict[str, Any]]) -> None:
+        """Buffer several relationships."""
+        for relationship in relationships:
+            self.add_relationship(relationship)
+
+    async def add_node_async(self, label: str, properties: Dict[str, Any]) -> None:
+        """Like add_node, but waits for room in the queue without blocking the event loop."""
+        await self._wait_for_room()
+        self.add_node(label, properties)
+
+    async def add_relationship_async(self, relationship: Dict[str, Any]) -> None:
+        """Like add_relationship, but waits for room in the queue without blocking the event loop."""
+        await self._wait_for_room()
+        self.add_relationship(relationship)
+
+    def flush(self) -> None:
+        """
+        Write everything buffered and wait until it is in Neo4j.
+        Call at stage boundaries, before reading back what was written.
+
+        Raises:
+            RuntimeError: If any batch failed to write
+        """
+        with self._lock:
+            self._drain()
+        if self._worker is not None:
+            self._queue.join()
+            self._stop_worker()
+        self._raise_error()
+
+    def close(self) -> None:
+        """Flush remaining writes and stop the writer thread, logging any failure."""
+        try:
+            self.flush()
+        except Exception as e:
+            logger.error(f"Error flushing graph writes: {str(e)}")
+
+    async def _wait_for_room(self) -> None:
+        """Sleep until the queue has room for every batch the next row may queue."""
+        if self._has_room():
+            return
+        started = time.monotonic()
+        while not self._has_room():
+            await asyncio.sleep(_BACKPRESSURE_POLL_SECONDS)
+        self.stats["backpressure_waits"] += 1
+        self.stats["backpressure_seconds"] += time.monotonic() - started
+
+    def _has_room(self) -> bool:
+        """Whether queuing one batch per buffered label, plus relationships, would not block."""
+        needed = min(len(self._nodes) + 2, self._queue.maxsize)
+        return self._queue.maxsize - self._queue.qsize() >= needed
+
+    def _touch(self) -> None:
+        """Record the arrival time of the oldest buffered row."""
+        if self._oldest is None:
+            self._oldest = time.monotonic()
+            self._ensure_worker()
+
+    def _aged(self) -> bool:
+        """Whether the oldest buffered row is older than max_age_seconds."""
+        return self._oldest is not None and time.monotonic() - self._oldest >= self.max_age_seconds
+
+    def _check_age(self) -> None:
+        """Drain the buffer if its oldest row is older than max_age_seconds."""
+        if self._aged():
+            self._drain()
+
+    def _drain(self) -> None:
+        """Queue every buffered row, nodes ahead of relationships."""
+        self._enqueue_nodes()
+        if self._relationships:
+            self._enqueue(("relationships", None, self._relationships))
+            self._relationships = []
+        self._oldest = None
+
+    def _enqueue_nodes(self) -> None:
+        """Queue all buffered node batches."""
+        for label in list(self._nodes):
+            self._enqueue(("nodes", label, self._nodes.pop(label)))
+
+    def _enqueue(self, item: Tuple[str, Optional[str], Optional[List[Dict[str, Any]]]]) -> None:
+        """Queue a batch for the writer thread, blocking while the queue is full."""
+        self._raise_error()
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            started = time.monotonic()
+            self._queue.put(item)
+            self.stats["backpressure_waits"] += 1
+            self.stats["backpressure_seconds"] += time.monotonic() - started
+
+    def _ensure_worker(self) -> None:
+        """Start the writer thread if it is not running."""
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run, name="graph-write-buffer", daemon=True)
+            self._worker.start()
+
+    def _stop_worker(self) -> None:
+        """Stop the writer thread once the queue is empty."""
+        if self._worker is not None and self._worker.is_alive():
+            self._queue.put(_STOP)
+            self._worker.join()
+        self._worker = None
+
+    def _raise_error(self) -> None:
+        """Re-raise a write failure from the writer thread in the caller."""
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise RuntimeError(f"Graph write failed: {str(error)}") from error
+
+    def _flush_aged(self) -> None:
+        """
+        Writer thread: write out buffered rows past the age limit.
+
+        Producers only queue batches under the lock, so with the lock held
+        and the queue empty nothing written earlier is still pending, and
+        writing directly keeps nodes ahead of the relationships that follow.
+        A producer holding the lock is active and checks the age itself, so
+        the flush is skipped rather than waiting for it.
+        """
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            if not self._aged() or not self._queue.empty():
+                return
+            batches = [("nodes", label, rows) for label, rows in self._nodes.items()]
+            if self._relationships:
+                batches.append(("relationships", None, self._relationships))
+            self._nodes = {}
+            self._relationships = []
+            self._oldest = None
+        finally:
+            self._lock.release()
+        for kind, label, rows in batches:
+            self._write(kind, label, rows)
+
+    def _write(self, kind: str, label: Optional[str], rows: List[Dict[str, Any]]) -> None:
+        """Writer thread: write one batch, recording a failure for the producers."""
+        # After a failure, later batches may reference missing nodes; drop them
+        if self._error is not None:
+            return
+        try:
+            if kind == "nodes":
+                self.db.merge_nodes_batch(label, rows)
+                self.stats["nodes_written"] += len(rows)
+            else:
+                self.db.merge_relationships_batch(rows)
+                self.stats["relationships_written"] += len(rows)
+            self.stats["batches_written"] += 1
+        except Exception as e:
+            logger.error(f"Error writing {kind} batch to Neo4j: {str(e)}")
+            self._error = e
+
+    def _run(self) -> None:
+        """Writer thread: write queued batches in order until stopped, and aged rows while idle."""
+        while True:
+            try:
+                kind, label, rows = self._queue.get(timeout=max(self.max_age_seconds, 0.1))
+            except queue.Empty:
+                self._flush_aged()
+                continue
+            try:
+                if kind == "stop":
+                    return
+                self._write(kind, label, rows)
+            finally:
+                self._queue.task_done()
@@ -1,11 +1,17 @@
+from enum import Enum
 from functools import wraps
 import logging
-from typing import Any, Callable, Dict, List, Optional, Union, TypeVar, cast
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union, TypeVar, cast
 
-from neo4j import GraphDatabase, Session, Driver, Result
-from neo4j.exceptions import ServiceUnavailable, AuthError
+from neo4j import GraphDatabase, Session, Driver, Result, Record
+from neo4j.exceptions import ServiceUnavailable, AuthError, ClientError
 
 from app.config.settings import get_settings
+from app.databases.neo4j_metrics import Neo4jMetrics
+from app.utils.constants import NODE_ID_PROPERTIES, INDEXED_PROPERTIES, NodeType
 
 settings = get_settings()
 
@@ -14,6 +20,10 @@ logger = logging.getLogger(__name__)
 
 T = TypeVar('T')
 
+# Session shared by every call inside Neo4jManager.session_scope(); context
+# local, so other threads (e.g. GraphWriteBuffer's writer) get their own
+_bound_session: ContextVar[Optional[Session]] = ContextVar("neo4j_bound_session", default=None)
+
 def _serialize_node(node_data: Dict[str, Any]) -> Dict[str, Any]:
     """Serialize node data to ensure proper JSON conversion."""
     result = {}
@@ -28,6 +38,30 @@ def _serialize_node(node_data: Dict[str, Any]) -> Dict[str, Any]:
             result[key] = str(value)  # Convert any other types to string
     return result
 
+def _serialize_record(record: Record) -> Dict[str, Any]:
+    """Convert a driver record to a dictionary of serialized values."""
+    return {
+        key: _serialize_node(value) if isinstance(value, dict) else value
+        for key, value in record.data().items()
+    }
+
+def _timed(func: Callable[..., T]) -> Callable[..., T]:
+    """Record the latency of a manager method in the manager's metrics."""
+    @wraps(func)
+    def wrapper(self, *args: Any, **kwargs: Any) -> T:
+        with self.metrics.time_operation(func.__name__):
+            return func(self, *args, **kwargs)
+    return wrapper
+
+def _driver_pool_config() -> Dict[str, Any]:
+    """Connection pool options shared by the sync and async drivers."""
+    return {
+        "max_connection_pool_size": settings.NEO4J_MAX_CONNECTION_POOL_SIZE,
+        "connection_acquisition_timeout": settings.NEO4J_CONNECTION_ACQUISITION_TIMEOUT,
+        "max_connection_lifetime": settings.NEO4J_MAX_CONNECTION_LIFETIME,
+        "keep_alive": settings.NEO4J_KEEP_ALIVE,
+    }
+
 def _sanitize_relationship_type(rel_type: str) -> str:
     """
     Sanitize relationship type to be a valid Neo4j identifier.
@@ -43,6 +77,69 @@ def _sanitize_relationship_type(rel_type: str) -> str:
     # Convert to uppercase as per Neo4j conventions
     return sanitized.upper()
 
+def _label(value: Any) -> str:
+    """Return the plain string for a label given as a str or str-valued Enum."""
+    return value.value if isinstance(value, Enum) else str(value)
+
+def _id_property(label: Any) -> str:
+    """Return the unique id property for a node label."""
+    try:
+        return NODE_ID_PROPERTIES[NodeType(_label(label))]
+    except ValueError:
+        raise ValueError(f"No id property registered for node label {_label(label)}")
+
+def _build_relationship_statements(
+    relationships: List[Dict[str, Any]],
+    merge: bool = False
+) -> List[Tuple[str, str, List[Dict[str, Any]]]]:
+    """
+    Group relationship dicts into parameterised UNWIND statements.
+    
+    Rows are grouped by (from_label, from_property, to_label, to_property,
+    relationship_type) since labels, property keys and relationship types
+    cannot be query parameters.
+    
+    Args:
+        relationships: Relationship dicts
+        merge: Use MERGE so an existing relationship is reused rather than
+            duplicated; properties are only set when it is created
+    
+    Returns:
+        List of (relationship_type, query, rows) tuples, one per group
+    """
+    groups: Dict[Tuple[str, str, str, str, str], List[Dict[str, Any]]] = {}
+    for rel in relationships:
+        key = (
+            _label(rel['from_label']),
+            rel['from_property'],
+            _label(rel['to_label']),
+            rel['to_property'],
+            _sanitize_relationship_type(_label(rel['relationship_type']))
+        )
+        groups.setdefault(key, []).append({
+            "from_value": rel['from_value'],
+            "to_value": rel['to_value'],
+            "properties": rel.get('properties') or {}
+        })
+    
+    statements = []
+    for (from_label, from_property, to_label, to_property, rel_type), rows in groups.items():
+        query = f"""
+        UNWIND $rows AS row
+        MATCH (a:{from_label} {{{from_property}: row.from_value}})
+        MATCH (b:{to_label} {{{to_property}: row.to_value}})
+        {"MERGE" if merge else "CREATE"} (a)-[r:{rel_type}]->(b)
+        {"ON CREATE " if merge else ""}SET r = row.properties
+        RETURN count(r) AS count
+        """
+        statements.append((rel_type, query, rows))
+    return statements
+
+def _schema_name(label: str, property_name: str, suffix: str) -> str:
+    """Build a deterministic schema object name, e.g. ``file_file_id_unique``."""
+    snake_label = ''.join(f'_{c.lower()}' if c.isupper() else c for c in label).lstrip('_')
+    return f"{snake_label}_{property_name}_{suffix}"
+
 class Neo4jManager:
     """
     Neo4j database manager using the Singleton pattern.
@@ -55,16 +152,19 @@ class Neo4jManager:
     def __new__(cls) -> 'Neo4jManager':
         if cls._instance is None:
             cls._instance = super().__new__(cls)
+            cls._instance.metrics = Neo4jMetrics()
             cls._instance._init_driver()
         return cls._instance
     
     def _init_driver(self) -> None:
-        """Initialize the Neo4j driver with authentication."""
+        """Initialize the Neo4j driver with authentication and pool settings."""
         try:
             self._driver = GraphDatabase.driver(
                 settings.NEO4J_URI,
-                auth=(settings.NEO4J_USER, settings.NEO4J_PASSWORD)
+                auth=(settings.NEO4J_USER, settings.NEO4J_PASSWORD),
+                **_driver_pool_config()
             )
+            self.metrics.instrument_pool(self._driver)
         except (ServiceUnavailable, AuthError) as e:
             logger.error(f"Failed to initialize Neo4j driver: {str(e)}")
             raise
@@ -80,12 +180,95 @@ class Neo4jManager:
         """Get a new Neo4j session."""
         return self.driver.session()
     
+    @contextmanager
+    def session_scope(self) -> Iterator[Session]:
+        """
+        Share one session across every manager call made inside the block.
+        
+        Use it around a unit of work such as an agent stage, instead of
+        opening a session per query. Nested scopes reuse the outer session.
+        
+        Yields:
+            The session bound to the current context
+        """
+        session = _bound_session.get()
+        if session is not None:
+            yield session
+            return
+        
+        with self.get_session() as session:
+            token = _bound_session.set(session)
+            try:
+                yield session
+            finally:
+                _bound_session.reset(token)
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Get connection pool and query latency metrics.
+        
+        Returns:
+            Dictionary with in-use/idle connections, connection acquisition
+            wait and per-operation latency histograms
+        """
+        return self.metrics.snapshot(self._driver)
+    
     def close(self) -> None:
         """Close the Neo4j driver connection."""
         if self._driver:
             self._driver.close()
             self._driver = None
     
+    def ensure_schema(self) -> Dict[str, List[str]]:
+        """
+        Create uniqueness constraints and indexes used by node lookups.
+        
+        Every node type gets a uniqueness constraint on its id property and a
+        property index on each of INDEXED_PROPERTIES. All statements use
+        IF NOT EXISTS, so this is safe to run on every startup.
+        
+        Returns:
+            Dictionary with the names of the constraints and indexes ensured,
+            and any that could not be created
+        """
+        summary: Dict[str, List[str]] = {"constraints": [], "indexes": [], "failed": []}
+        
+        for node_type, id_property in NODE_ID_PROPERTIES.items():
+            label = node_type.value
+            constraint_name = _schema_name(label, id_property, "unique")
+            try:
+                self.run_query(
+                    f"CREATE CONSTRAINT {constraint_name} IF NOT EXISTS "
+                    f"FOR (n:{label}) REQUIRE n.{id_property} IS UNIQUE"
+                )
+                summary["constraints"].append(constraint_name)
+            except ClientError as e:
+                # Existing duplicate ids make the constraint impossible; a plain
+                # index still gives the lookup speedup
+                logger.warning(f"Could not create constraint {constraint_name}: {str(e)}")
+                summary["failed"].append(constraint_name)
+                self._ensure_index(label, id_property, summary)
+            
+            for property_name in INDEXED_PROPERTIES:
+                if property_name != id_property:
+                    self._ensure_index(label, property_name, summary)
+        
+        return summary
+    
+    def _ensure_index(self, label: str, property_name: str, summary: Dict[str, List[str]]) -> None:
+        """Create a single-property range index if it does not exist."""
+        index_name = _schema_name(label, property_name, "index")
+        try:
+            self.run_query(
+                f"CREATE INDEX {index_name} IF NOT EXISTS "
+                f"FOR (n:{label}) ON (n.{property_name})"
+            )
+            summary["indexes"].append(index_name)
+        except ClientError as e:
+            logger.warning(f"Could not create index {index_name}: {str(e)}")
+            summary["failed"].append(index_name)
+    
+    @_timed
     def run_query(
         self, 
         query: str, 
@@ -101,15 +284,44 @@ class Neo4jManager:
         Returns:
             List of dictionaries containing the query results
         """
-        with self.get_session() as session:
+        with self.session_scope() as session:
             result = session.run(query, parameters or {})
             # Serialize the records to ensure proper JSON conversion
-            return [
-                {key: _serialize_node(value) if isinstance(value, dict) else value 
-                 for key, value in record.data().items()}
-                for record in result
-            ]
+            return [_serialize_record(record) for record in result]
+    
+    def iter_query(
+        self, 
+        query: str, 
+        parameters: Optional[Dict[str, Any]] = None,
+        fetch_size: Optional[int] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Run a Cypher query and stream the results one record at a time.
+        
+        Records are pulled from the server in batches of fetch_size, so only
+        one batch is held in memory regardless of the size of the result.
+        The session stays open until the iterator is exhausted or closed.
+        
+        Args:
+            query: Cypher query string
+            parameters: Query parameters (optional)
+            fetch_size: Records per round trip (defaults to NEO4J_FETCH_SIZE)
+            
+        Yields:
+            Dictionary for each result record
+        """
+        # Streams get their own session; a shared one cannot run other
+        # queries while this result is still open
+        started = time.perf_counter()
+        try:
+            with self.driver.session(fetch_size=fetch_size or settings.NEO4J_FETCH_SIZE) as session:
+                result = session.run(query, parameters or {})
+                for record in result:
+                    yield _serialize_record(record)
+        finally:
+            self.metrics.observe_query("iter_query", time.perf_counter() - started)
     
+    @_timed
     def run_transaction(
         self, 
         tx_function: Callable[[Session], T], 
@@ -127,9 +339,10 @@ class Neo4jManager:
         Returns:
             Result of the transaction function
         """
-        with self.get_session() as session:
+        with self.session_scope() as session:
             return session.execute_write(tx_function, *args, **kwargs)
 
+    @_timed
     def find_node(
         self, 
         label: str, 
@@ -159,6 +372,7 @@ class Neo4jManager:
         # Ensure proper serialization of node data
         return _serialize_node(result[0]['n'])
         
+    @_timed
     def create_node(
         self, 
         label: str, 
@@ -181,6 +395,36 @@ class Neo4jManager:
         result = self.run_query(query, {"properties": properties})
         return _serialize_node(result[0]['n']) if result else {}
         
+    @_timed
+    def update_node(
+        self,
+        label: str,
+        property_name: str,
+        property_value: Any,
+        updates: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Merge the given properties into an existing node.
+        
+        Args:
+            label: Node label
+            property_name: Property name used to identify the node
+            property_value: Property value used to identify the node
+            updates: Properties to set on the node
+            
+        Returns:
+            Dictionary representing the updated node, or None if not found
+        """
+        query = f"""
+        MATCH (n:{label})
+        WHERE n.{property_name} = $value
+        SET n += $updates
+        RETURN n
+        """
+        result = self.run_query(query, {"value": property_value, "updates": updates})
+        return _serialize_node(result[0]['n']) if result else None
+        
+    @_timed
     def create_relationship(
         self, 
         from_label: str, 
@@ -208,10 +452,10 @@ class Neo4jManager:
         Returns:
             Dictionary representing the created relationship
         """
-        sanitized_relationship_type = _sanitize_relationship_type(relationship_type)  # Sanitize the relationship type
+        sanitized_relationship_type = _sanitize_relationship_type(_label(relationship_type))  # Sanitize the relationship type
 
         query = f"""
-        MATCH (a:{from_label}), (b:{to_label})
+        MATCH (a:{_label(from_label)}), (b:{_label(to_label)})
         WHERE a.{from_property} = $from_value AND b.{to_property} = $to_value
         CREATE (a)-[r:{sanitized_relationship_type} $properties]->(b)
         RETURN r
@@ -226,6 +470,7 @@ class Neo4jManager:
         )
         return result[0]['r'] if result else {}
 
+    @_timed
     def create_nodes_batch(
         self,
         label: str,
@@ -255,6 +500,7 @@ class Neo4jManager:
         
         return self.run_transaction(_create_nodes_tx, properties_list)
         
+    @_timed
     def create_relationships_batch(
         self,
         relationships: List[Dict[str, Any]]
@@ -262,6 +508,9 @@ class Neo4jManager:
         """
         Create multiple relationships in a single transaction.
         
+        Relationships are grouped by endpoint labels, match properties and
+        relationship type, and each group is written with one UNWIND statement.
+        
         Args:
             relationships: List of dictionaries containing relationship info:
                 {
@@ -276,68 +525,107 @@ class Neo4jManager:
                 }
                 
         Returns:
-            List of dictionaries representing the created relationships
+            List of dictionaries with the relationship type and the number of
+            relationships created for each group
         """
         if not relationships:
             return []
+        
+        statements = _build_relationship_statements(relationships)
+        
+        def _create_relationships_tx(tx, grouped_statements):
+            results = []
+            for rel_type, query, rows in grouped_statements:
+                record = tx.run(query, rows=rows).single()
+                results.append({
+                    "relationship_type": rel_type,
+                    "created": record["count"] if record else 0
+                })
+            return results
+        
+        return self.run_transaction(_create_relationships_tx, statements)
+    
+    @_timed
+    def merge_nodes_batch(
+        self,
+        label: str,
+        properties_list: List[Dict[str, Any]]
+    ) -> int:
+        """
+        Create or update multiple nodes with the same label in one transaction.
+        
+        Nodes are matched on the label's id property (see NODE_ID_PROPERTIES).
+        Existing nodes get the new properties merged in but keep their
+        original created_at, so writing the same rows twice is a no-op.
+        
+        Args:
+            label: Node label
+            properties_list: List of property dictionaries for each node
             
-        results = []
-        # Process in batches of similar relationship types
-        relationship_types = {}
-        
-        for rel in relationships:
-            # Use a generic relationship type and store the original as a property
-            original_type = rel['relationship_type']
-            sanitized_type = 'RELATED_TO'  # Using a generic type for all relationships
-            
-            # Prepare properties including the original relationship type
-            props = rel.get('properties', {}).copy()
-            props.update({
-                'uuid': original_type,  # Store the UUID
-                'display_name': original_type  # Store for display purposes
-            })
-            
-            # Update the relationship data with the new properties
-            rel_data = rel.copy()
-            rel_data['properties'] = props
-            
-            if sanitized_type not in relationship_types:
-                relationship_types[sanitized_type] = []
-            relationship_types[sanitized_type].append(rel_data)
-        
-        for rel_type, rels in relationship_types.items():
-            def _create_relationships_tx(tx, rel_data):
-                statements = []
-                for rel in rel_data:
-                    from_label = rel['from_label']
-                    from_property = rel['from_property']
-                    from_value = rel['from_value']
-                    to_label = rel['to_label']
-                    to_property = rel['to_property']
-                    to_value = rel['to_value']
-                    props = rel['properties']
-                    
-                    # Fixed sanitized relationship type
-                    rel_type = 'RELATED_TO'
-
-                    query = f"""
-                    MATCH (a:{from_label}), (b:{to_label})
-                    WHERE a.{from_property} = $from_value AND b.{to_property} = $to_value
-                    CREATE (a)-[r:{rel_type} $props]->(b)
-                    RETURN r
-                    """
-                    result = tx.run(query, {
-                        "from_value": from_value,
-                        "to_value": to_value,
-                        "props": props
-                    })
-                    statements.extend([record.data() for record in result])
-                return statements
-
+        Returns:
+            Number of nodes created or updated
+        """
+        if not properties_list:
+            return 0
+        
+        label = _label(label)
+        id_property = _id_property(label)
+        rows = [
+            {
+                "id": props[id_property],
+                "properties": {key: value for key, value in props.items() if key != "created_at"},
+                "created_at": props.get("created_at")
+            }
+            for props in properties_list
+        ]
+        
+        def _merge_nodes_tx(tx, merge_rows):
+            query = f"""
+            UNWIND $rows AS row
+            MERGE (n:{label} {{{id_property}: row.id}})
+            SET n += row.properties
+            SET n.created_at = coalesce(n.created_at, row.created_at)
+            RETURN count(n) AS merged
+            """
+            record = tx.run(query, rows=merge_rows).single()
+            return record["merged"] if record else 0
+        
+        return self.run_transaction(_merge_nodes_tx, rows)
+    
+    @_timed
+    def merge_relationships_batch(
+        self,
+        relationships: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Create multiple relationships in a single transaction unless they
+        already exist.
+        
+        Same input as create_relationships_batch, but uses MERGE so writing
+        the same relationships twice does not duplicate them.
+        
+        Args:
+            relationships: List of dictionaries containing relationship info
             
-            batch_results = self.run_transaction(_create_relationships_tx, rels)
-            results.extend(batch_results)
+        Returns:
+            List of dictionaries with the relationship type and the number of
+            relationships matched or created for each group
+        """
+        if not relationships:
+            return []
+        
+        statements = _build_relationship_statements(relationships, merge=True)
+        
+        def _merge_relationships_tx(tx, grouped_statements):
+            results = []
+            for rel_type, query, rows in grouped_statements:
+                record = tx.run(query, rows=rows).single()
+                results.append({
+                    "relationship_type": rel_type,
+                    "merged": record["count"] if record else 0
+                })
+            return results
         
-        return results
+        return self.run_transaction(_merge_relationships_tx, statements)
 
 neo4j_manager = Neo4jManager()
\ No newline at end of file
@@ -0,0 +1,167 @@
+import bisect
+import inspect
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Dict, Iterator, List, Optional
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+# Upper bounds (milliseconds) of the latency histogram buckets; the last
+# bucket is unbounded
+LATENCY_BUCKETS_MS: List[float] = [1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+# Name of the manager operation currently being timed in this context, so
+# nested calls (find_node -> run_query) are only counted once
+_current_operation: ContextVar[Optional[str]] = ContextVar("neo4j_current_operation", default=None)
+
+
+class LatencyHistogram:
+    """Thread-safe fixed-bucket latency histogram."""
+
+    def __init__(self, buckets_ms: Optional[List[float]] = None):
+        self.buckets_ms = buckets_ms or LATENCY_BUCKETS_MS
+        self._counts = [0] * (len(self.buckets_ms) + 1)
+        self._count = 0
+        self._total_ms = 0.0
+        self._max_ms = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        """Record one observation."""
+        ms = seconds * 1000
+        with self._lock:
+            self._counts[bisect.bisect_left(self.buckets_ms, ms)] += 1
+            self._count += 1
+            self._total_ms += ms
+            self._max_ms = max(self._max_ms, ms)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return count, mean/max and cumulative bucket counts."""
+        with self._lock:
+            counts = list(self._counts)
+            count, total_ms, max_ms = self._count, self._total_ms, self._max_ms
+
+        buckets = {}
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets_ms + ["+Inf"], counts):
+            cumulative += bucket_count
+            buckets[f"le_{bound}"] = cumulative
+        return {
+            "count": count,
+            "mean_ms": round(total_ms / count, 3) if count else 0.0,
+            "max_ms": round(max_ms, 3),
+            "buckets": buckets
+        }
+
+
+class Neo4jMetrics:
+    """
+    Telemetry for a Neo4j driver: connection pool usage, connection
+    acquisition wait time and per-operation query latency.
+    """
+
+    def __init__(self):
+        self.acquisition = LatencyHistogram()
+        self._queries: Dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    def observe_query(self, operation: str, seconds: float) -> None:
+        """Record the latency of one manager operation."""
+        histogram = self._queries.get(operation)
+        if histogram is None:
+            with self._lock:
+                histogram = self._queries.setdefault(operation, LatencyHistogram())
+        histogram.observe(seconds)
+
+    @contextmanager
+    def time_operation(self, operation: str) -> Iterator[None]:
+        """Time the enclosed block as one operation unless already inside one."""
+        if _current_operation.get() is not None:
+            yield
+            return
+        token = _current_operation.set(operation)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe_query(operation, time.perf_counter() - started)
+            _current_operation.reset(token)
+
+    def instrument_pool(self, driver: Any) -> None:
+        """
+        Time connection acquisition on the driver's pool.
+
+        The driver has no public hook for this, so the pool's acquire method
+        is wrapped on this driver instance only. If the pool layout differs
+        from what is expected, acquisition is simply not timed.
+        """
+        pool = getattr(driver, "_pool", None)
+        acquire = getattr(pool, "acquire", None)
+        if acquire is None:
+            logger.warning("Neo4j driver pool not found; connection acquisition will not be timed")
+            return
+
+        if inspect.iscoroutinefunction(acquire):
+            @wraps(acquire)
+            async def timed_acquire(*args: Any, **kwargs: Any) -> Any:
+                started = time.perf_counter()
+                try:
+                    return await acquire(*args, **kwargs)
+                finally:
+                    self.acquisition.observe(time.perf_counter() - started)
+        else:
+            @wraps(acquire)
+            def timed_acquire(*args: Any, **kwargs: Any) -> Any:
+                started = time.perf_counter()
+                try:
+                    return acquire(*args, **kwargs)
+                finally:
+                    self.acquisition.observe(time.perf_counter() - started)
+
+        pool.acquire = timed_acquire
+
+    def snapshot(self, driver: Any = None) -> Dict[str, Any]:
+        """
+        Return the current metrics.
+
+        Args:
+            driver: Driver whose pool usage should be reported (optional)
+
+        Returns:
+            Dictionary with pool usage, acquisition wait and query latency
+        """
+        with self._lock:
+            queries = dict(self._queries)
+        return {
+            "pool": _pool_usage(driver),
+            "acquisition": self.acquisition.snapshot(),
+            "queries": {operation: histogram.snapshot() for operation, histogram in sorted(queries.items())}
+        }
+
+
+def _pool_usage(driver: Any) -> Optional[Dict[str, Any]]:
+    """Count in-use and idle connections in a driver's pool, if it can be read."""
+    pool = getattr(driver, "_pool", None)
+    connections = getattr(pool, "connections", None)
+    if connections is None:
+        return None
+
+    in_use = idle = 0
+    # Copy first: the pool mutates these deques from other threads
+    for address_connections in list(connections.values()):
+        for connection in list(address_connections):
+            if connection.in_use:
+                in_use += 1
+            else:
+                idle += 1
+    pool_config = getattr(pool, "pool_config", None)
+    return {
+        "in_use": in_use,
+        "idle": idle,
+        "max_size": getattr(pool_config, "max_connection_pool_size", None)
+    }
@@ -6,9 +6,13 @@ import sys
 import logging
 from dotenv import load_dotenv
 
+from app.api.middleware import UploadSizeLimitMiddleware, upload_too_large_handler
 from app.api.routers import project_router, status_router, metadata_router, graph_router, download_router, feedback_router
 from app.config.settings import get_settings
 from app.config.dependencies import dependency_initializer
+from app.utils.llm_cache import get_llm_cache
+from app.utils.storage_lifecycle import storage_metrics
+from app.utils.uploads import UploadTooLargeError
 
 # Set up logging
 logging.basicConfig(
@@ -38,6 +42,11 @@ app = FastAPI(
     redoc_url="/redoc",
 )
 
+# Reject oversized uploads with 413 while they stream in, not after they are
+# spooled; added before CORS so CORS stays the outermost middleware
+app.add_middleware(UploadSizeLimitMiddleware)
+app.add_exception_handler(UploadTooLargeError, upload_too_large_handler)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -65,6 +74,27 @@ async def health_check():
     """Health check endpoint."""
     return {"status": "healthy"}
 
+@app.get("/health/neo4j", tags=["Health"])
+async def neo4j_metrics():
+    """Neo4j connection pool and query latency metrics for this process."""
+    metrics = {}
+    for name in ("neo4j", "async_neo4j"):
+        manager = dependency_initializer.get_service(name)
+        if manager:
+            metrics[name] = manager.get_metrics()
+    return metrics
+
+@app.get("/health/llm-cache", tags=["Health"])
+async def llm_cache_metrics():
+    """LLM response cache hit/miss counters."""
+    cache = get_llm_cache()
+    return cache.snapshot() if cache else {"enabled": False}
+
+@app.get("/health/storage", tags=["Health"])
+async def storage_lifecycle_metrics():
+    """Storage quota and eviction metrics."""
+    return storage_metrics()
+
 # Handle application shutdown
 @app.on_event("shutdown")
 async def shutdown_event():
@@ -75,6 +105,11 @@ async def shutdown_event():
         neo4j.close()
         logger.info("Neo4j connection closed")
     
+    async_neo4j = dependency_initializer.get_service("async_neo4j")
+    if async_neo4j:
+        await async_neo4j.close()
+        logger.info("Async Neo4j connection closed")
+    
     redis_client = dependency_initializer.get_service("redis")
     if redis_client:
         redis_client.close()
@@ -5,6 +5,7 @@ from app.schemas.base import (
     ProjectBase,
     ProjectCreate,
     ProjectResponse,
+    UploadSessionCreate,
     StatusResponse,
     MetadataResponse,
     GraphResponse,
@@ -27,6 +28,7 @@ __all__ = [
     "ProjectBase",
     "ProjectCreate",
     "ProjectResponse",
+    "UploadSessionCreate",
     "StatusResponse",
     "MetadataResponse",
     "GraphResponse",
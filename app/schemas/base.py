@@ -35,6 +35,7 @@ class ProjectBase(BaseModel):
     source_framework: Optional[str] = Field(None, description="Source framework")
     target_framework: Optional[str] = Field(None, description="Target framework")
     custom_mappings: Optional[Dict[str, Any]] = Field(None, description="Custom mappings")
+    ignore_patterns: Optional[List[str]] = Field(None, description="Extra .gitignore-style patterns for files to leave out of the upload")
 
 
 class ProjectCreate(ProjectBase):
@@ -47,6 +48,14 @@ class ProjectCreate(ProjectBase):
     current_step: str = Field("Project upload", description="Initial step")
 
 
+class UploadSessionCreate(ProjectBase):
+    """Resumable upload session creation model."""
+    
+    filename: str = Field(..., description="Name of the ZIP file being uploaded")
+    total_size: int = Field(..., gt=0, description="Size of the complete ZIP file in bytes")
+    project_id: Optional[str] = Field(None, description="Existing project to upload a new revision of")
+
+
 class StepDetails(BaseModel):
     """Step details model."""
     
@@ -0,0 +1,77 @@
+import io
+import zipfile
+
+from app.utils.ignore_rules import IgnoreRules, archive_ignore_rules
+
+
+def _archive(members):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for name, content in members.items():
+            archive.writestr(name, content)
+    buffer.seek(0)
+    return zipfile.ZipFile(buffer)
+
+
+def test_negation_re_includes_a_file():
+    rules = IgnoreRules(["*.log", "!keep.log"])
+    assert rules.is_ignored("debug.log")
+    assert rules.is_ignored("src/debug.log")
+    assert not rules.is_ignored("keep.log")
+    assert not rules.is_ignored("src/keep.log")
+
+
+def test_nothing_inside_an_ignored_directory_is_re_included():
+    rules = IgnoreRules(["build/", "!build/keep.txt"])
+    assert rules.is_ignored("build/keep.txt")
+
+
+def test_anchored_and_unanchored_patterns():
+    rules = IgnoreRules(["/out", "tmp", "docs/*.md"])
+    assert rules.is_ignored("out/app.js")
+    assert not rules.is_ignored("src/out/app.js")
+    assert rules.is_ignored("tmp/a.txt")
+    assert rules.is_ignored("src/tmp/a.txt")
+    assert rules.is_ignored("docs/index.md")
+    assert not rules.is_ignored("src/docs/index.md")
+    assert not rules.is_ignored("docs/api/index.md")
+
+
+def test_directory_only_patterns_skip_files():
+    rules = IgnoreRules(["logs/"])
+    assert rules.is_ignored("logs", is_dir=True)
+    assert rules.is_ignored("logs/today.txt")
+    assert rules.is_ignored("src/logs/today.txt")
+    assert not rules.is_ignored("logs")
+    assert not rules.is_ignored("src/logs")
+
+
+def test_patterns_relative_to_a_base_directory():
+    rules = IgnoreRules()
+    rules.add_patterns(["*.tmp", "/local"], base="pkg")
+    assert rules.is_ignored("pkg/a.tmp")
+    assert rules.is_ignored("pkg/sub/a.tmp")
+    assert not rules.is_ignored("a.tmp")
+    assert rules.is_ignored("pkg/local/x.py")
+    assert not rules.is_ignored("pkg/sub/local/x.py")
+
+
+def test_archive_rules_apply_nested_gitignores_and_overrides():
+    archive = _archive({
+        ".gitignore": "*.gen\n",
+        "pkg/.gitignore": "!keep.gen\n",
+        "pkg/keep.gen": "",
+        "keep.gen": "",
+        "node_modules/.gitignore": "!*\n",
+        "node_modules/lib/index.js": "",
+        "src/main.py": "",
+    })
+    rules = archive_ignore_rules(archive)
+    assert rules.is_ignored("keep.gen")
+    assert not rules.is_ignored("pkg/keep.gen")
+    assert rules.is_ignored("node_modules/lib/index.js")
+    assert not rules.is_ignored("src/main.py")
+
+    rules = archive_ignore_rules(archive, ["src/", "!node_modules/"])
+    assert rules.is_ignored("src/main.py")
+    assert not rules.is_ignored("node_modules/lib/index.js")
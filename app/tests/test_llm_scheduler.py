@@ -0,0 +1,22 @@
+import asyncio
+
+from app.utils.llm_scheduler import RateLimiter
+
+
+def test_usage_corrections_do_not_count_as_requests():
+    async def run():
+        limiter = RateLimiter(4, 0)
+        for _ in range(2):
+            await limiter.acquire(100)
+            limiter.record_usage(100, 80)
+        return await asyncio.wait_for(limiter.acquire(100), timeout=1)
+
+    assert asyncio.run(run()) == 0.0
+
+
+def test_usage_corrections_count_against_tokens():
+    limiter = RateLimiter(0, 1000)
+    asyncio.run(limiter.acquire(500))
+    limiter.record_usage(500, 900)
+    assert limiter._wait_time(limiter._window[0][0], 200) > 0
+    assert limiter._wait_time(limiter._window[0][0], 100) == 0
@@ -0,0 +1,84 @@
+import uuid
+
+import pytest
+from neo4j import GraphDatabase
+
+from app.config.settings import get_settings
+
+settings = get_settings()
+
+try:
+    with GraphDatabase.driver(settings.NEO4J_URI, auth=(settings.NEO4J_USER, settings.NEO4J_PASSWORD)) as driver:
+        driver.verify_connectivity()
+except Exception as e:
+    pytest.skip(f"Neo4j is not reachable: {e}", allow_module_level=True)
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.agents.structure_analysis_agent import StructureAnalysisAgent  # noqa: E402
+from app.config.dependencies import dependency_initializer  # noqa: E402
+from app.main import app  # noqa: E402
+
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def project_id():
+    """A completed project where b.py imports a.py and calls its function."""
+    project_id = f"test_{uuid.uuid4().hex}"
+    db = dependency_initializer.get_service("neo4j")
+    db.run_query(
+        """
+        CREATE (p:Project {project_id: $project_id, id: $project_id, status: 'completed', revision: 2})
+        CREATE (d:Folder {folder_id: $project_id + '_root', id: $project_id + '_root', project_id: $project_id})
+        CREATE (a:File {file_id: $project_id + '_a', id: $project_id + '_a', project_id: $project_id, relative_path: 'a.py'})
+        CREATE (b:File {file_id: $project_id + '_b', id: $project_id + '_b', project_id: $project_id, relative_path: 'b.py'})
+        CREATE (fa:Function {function_id: $project_id + '_fa', id: $project_id + '_fa', project_id: $project_id, name: 'fa'})
+        CREATE (fb:Function {function_id: $project_id + '_fb', id: $project_id + '_fb', project_id: $project_id, name: 'fb'})
+        CREATE (p)-[:CONTAINS]->(a), (p)-[:CONTAINS]->(b), (d)-[:CONTAINS]->(a), (d)-[:CONTAINS]->(b)
+        CREATE (a)-[:HAS_FUNCTION]->(fa), (b)-[:HAS_FUNCTION]->(fb)
+        CREATE (b)-[:IMPORTS]->(a), (fb)-[:CALLS]->(fa)
+        """,
+        {"project_id": project_id}
+    )
+    yield project_id
+    db.run_query("MATCH (n {project_id: $project_id}) DETACH DELETE n", {"project_id": project_id})
+
+
+def _retire(project_id, *names):
+    agent = StructureAnalysisAgent(project_id)
+    return agent._retire_stale_structure(
+        [{"file_id": f"{project_id}_{name}", "relative_path": f"{name}.py"} for name in names],
+        [f"{project_id}_root"]
+    )
+
+
+def test_deleted_file_is_left_out_of_metadata_and_graph(project_id):
+    assert _retire(project_id, "b") == {"replaced": 0, "tombstoned": 1}
+
+    metadata = client.get(f"/projects/{project_id}/metadata").json()
+    assert [f["relative_path"] for f in metadata["files"]] == ["b.py"]
+    assert metadata["files"][0]["metadata"]["import_count"] == 0
+    assert [fn["name"] for fn in metadata["functions"]] == ["fb"]
+    assert metadata["functions"][0]["relationships"] == []
+    assert metadata["relationships"] == []
+
+    graph = client.get(f"/projects/{project_id}/graph").json()
+    node_ids = {node["node_id"] for node in graph["nodes"]}
+    assert f"{project_id}_a" not in node_ids
+    assert f"{project_id}_fa" not in node_ids
+    assert f"{project_id}_fb" in node_ids
+    assert not [
+        rel for rel in graph["relationships"]
+        if rel["relationship_type"] in ("IMPORTS", "CALLS")
+    ]
+
+
+def test_restored_file_brings_back_its_nodes(project_id):
+    _retire(project_id, "b")
+    _retire(project_id, "a", "b")
+
+    metadata = client.get(f"/projects/{project_id}/metadata").json()
+    assert sorted(fn["name"] for fn in metadata["functions"]) == ["fa", "fb"]
+    assert [(r["source"], r["target"]) for r in metadata["relationships"]] == [("b.py", "a.py")]
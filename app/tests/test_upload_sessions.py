@@ -0,0 +1,78 @@
+import asyncio
+
+import pytest
+
+from app.utils import upload_sessions
+
+
+class _Redis:
+    """The few Redis commands upload sessions use, kept in memory."""
+
+    def __init__(self):
+        self.data = {}
+
+    def hset(self, key, mapping):
+        self.data.setdefault(key, {}).update({k: str(v) for k, v in mapping.items()})
+
+    def hgetall(self, key):
+        return dict(self.data.get(key, {}))
+
+    def expire(self, key, seconds):
+        return key in self.data
+
+    def ttl(self, key):
+        return 60 if key in self.data else -2
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    def delete(self, key):
+        return int(self.data.pop(key, None) is not None)
+
+    def eval(self, script, numkeys, key, expected, new_offset, ttl):
+        assert script == upload_sessions._ADVANCE_SCRIPT
+        session = self.data.get(key)
+        if session is None or session["offset"] != str(expected):
+            return 0
+        session["offset"] = str(new_offset)
+        return 1
+
+
+async def _body(data):
+    yield data
+
+
+def test_stale_writer_cannot_overwrite_a_committed_chunk(tmp_path, monkeypatch):
+    monkeypatch.setattr(upload_sessions.settings, "TEMP_DIR", str(tmp_path))
+    redis_client = _Redis()
+    session = upload_sessions.create_session(redis_client, "project", {}, 8)
+    first = upload_sessions.get_session(redis_client, session["session_id"])
+    second = upload_sessions.get_session(redis_client, session["session_id"])
+
+    async def run():
+        offset, _ = await upload_sessions.write_chunk(redis_client, first, 0, _body(b"AAAA"))
+        assert offset == 4
+        with pytest.raises(upload_sessions.UploadSessionConflict) as conflict:
+            await upload_sessions.write_chunk(redis_client, second, 0, _body(b"BBBB"))
+        assert conflict.value.offset == 4
+
+    asyncio.run(run())
+    with open(session["path"], "rb") as f:
+        assert f.read() == b"AAAA"
+    assert upload_sessions.get_session(redis_client, session["session_id"])["offset"] == 4
+
+
+def test_chunk_for_a_removed_session_is_not_written(tmp_path, monkeypatch):
+    monkeypatch.setattr(upload_sessions.settings, "TEMP_DIR", str(tmp_path))
+    redis_client = _Redis()
+    session = upload_sessions.create_session(redis_client, "project", {}, 4)
+    upload_sessions.delete_session(redis_client, session["session_id"])
+
+    with pytest.raises(upload_sessions.UploadSessionNotFound):
+        asyncio.run(upload_sessions.write_chunk(redis_client, session, 0, _body(b"AAAA")))
+    assert redis_client.data == {}
+    with open(session["path"], "rb") as f:
+        assert f.read() == b""
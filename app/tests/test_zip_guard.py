@@ -0,0 +1,101 @@
+import copy
+import io
+import os
+import zipfile
+
+import pytest
+
+from app.utils import zip_guard
+from app.utils.file_manifest import build_archive_manifest
+from app.utils.zip_fs import ZipProjectFS
+from app.utils.zip_guard import ExtractionGuard, ZipBombError
+
+MB = 1024 * 1024
+
+
+def _archive(members):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, content in members.items():
+            archive.writestr(name, content)
+    buffer.seek(0)
+    return zipfile.ZipFile(buffer)
+
+
+def _declaring(info, file_size):
+    # zipfile stops reading at the size in the central directory, so the
+    # lie is made where the guard reads the declared sizes
+    declared = copy.copy(info)
+    declared.file_size = file_size
+    return declared
+
+
+def _read_all(guard, archive, info):
+    read = 0
+    with guard.open(archive, info) as member:
+        for block in iter(lambda: member.read(MB), b""):
+            read += len(block)
+    return read
+
+
+def test_member_ceiling_trips_mid_stream_despite_declared_size():
+    archive = _archive({"big.bin": os.urandom(5 * MB)})
+    info = archive.getinfo("big.bin")
+    guard = ExtractionGuard(info.compress_size, max_total_bytes=0, max_member_bytes=2 * MB, max_ratio=0)
+    guard.check_declared([_declaring(info, 1024)])
+
+    with pytest.raises(ZipBombError):
+        _read_all(guard, archive, info)
+    assert guard.total_bytes <= 3 * MB
+
+
+def test_total_ceiling_trips_mid_stream_and_stops_other_members():
+    archive = _archive({name: os.urandom(int(1.5 * MB)) for name in ("a.bin", "b.bin", "c.bin")})
+    infos = archive.infolist()
+    guard = ExtractionGuard(sum(info.compress_size for info in infos), max_total_bytes=2 * MB, max_member_bytes=0, max_ratio=0)
+    guard.check_declared([_declaring(info, 1024) for info in infos])
+
+    assert _read_all(guard, archive, infos[0]) == int(1.5 * MB)
+    with pytest.raises(ZipBombError):
+        _read_all(guard, archive, infos[1])
+    with guard.open(archive, infos[2]) as member, pytest.raises(ZipBombError):
+        member.read(1)
+
+
+def test_declared_sizes_are_checked_before_reading():
+    archive = _archive({"big.bin": os.urandom(3 * MB)})
+    guard = ExtractionGuard.for_archive(archive)
+    guard.max_member_bytes = 2 * MB
+    with pytest.raises(ZipBombError):
+        guard.check_declared(archive.infolist())
+
+
+def test_ratio_floor():
+    archive = _archive({"small.txt": b"\0" * (MB // 2), "large.txt": b"\0" * (2 * MB)})
+    small, large = archive.getinfo("small.txt"), archive.getinfo("large.txt")
+    assert small.file_size > 100 * small.compress_size
+
+    guard = ExtractionGuard(small.compress_size, max_ratio=100)
+    guard.check_declared([small])
+    assert _read_all(guard, archive, small) == MB // 2
+
+    with pytest.raises(ZipBombError):
+        ExtractionGuard(large.compress_size, max_ratio=100).check_declared([large])
+    with pytest.raises(ZipBombError):
+        _read_all(ExtractionGuard(large.compress_size, max_ratio=100), archive, large)
+
+
+def test_ignored_members_do_not_count(tmp_path, monkeypatch):
+    monkeypatch.setattr(zip_guard.settings, "MAX_UPLOAD_SIZE_MB", 1)
+    path = str(tmp_path / "project.zip")
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("main.py", "print(1)\n")
+        archive.writestr("node_modules/big.js", os.urandom(3 * MB))
+
+    fs = ZipProjectFS(path, str(tmp_path / "project"))
+    try:
+        assert build_archive_manifest(fs.root, fs).paths == ["main.py"]
+        with pytest.raises(ZipBombError):
+            ExtractionGuard.for_archive(fs._zip).check_declared(fs._zip.infolist())
+    finally:
+        fs.close()
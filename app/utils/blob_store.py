@@ -0,0 +1,219 @@
+import errno
+import logging
+import os
+import shutil
+import threading
+import time
+import uuid
+from typing import BinaryIO, Dict, Optional
+
+from app.config.settings import get_settings
+from app.utils.hashing import copy_and_hash
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# Directory of the files being written, before they are published under their hash
+_TMP_DIR = "tmp"
+
+
+class BlobStore:
+    """
+    Content-addressed store of project files, shared by every project.
+
+    Each distinct file content is stored once, at blobs/<2 hex>/<sha256>,
+    read-only, and extracted project trees are hard links to it. The link
+    count of a blob is its reference count: one for the store plus one per
+    project file, kept by the filesystem itself, so removing a tree (by the
+    storage lifecycle or by hand) releases its references and nothing can
+    drift. gc removes blobs no tree links to any more.
+
+    Repeated uploads of the same codebase, forks and revisions, therefore
+    take the disk space of what changed. A file whose hash is known up front
+    is linked without being decompressed at all.
+
+    Hard links cannot cross filesystems; if TEMP_DIR and the store are on
+    different ones, files are written to the trees directly, as before.
+    """
+
+    def __init__(self, root: str):
+        """
+        Initialize the store.
+
+        Args:
+            root: Directory of the store
+        """
+        self.root = root
+        self.hardlinks = True
+        self._tmp_dir = os.path.join(root, _TMP_DIR)
+        os.makedirs(self._tmp_dir, exist_ok=True)
+
+    def path(self, content_hash: str) -> str:
+        """
+        Get the path of a blob.
+
+        Args:
+            content_hash: SHA-256 hex digest of the contents
+
+        Returns:
+            Path of the blob, whether or not it is stored
+        """
+        return os.path.join(self.root, content_hash[:2], content_hash)
+
+    def __contains__(self, content_hash: str) -> bool:
+        return os.path.isfile(self.path(content_hash))
+
+    def link(self, content_hash: str, target_path: str) -> bool:
+        """
+        Link a stored blob into a project tree.
+
+        Args:
+            content_hash: SHA-256 hex digest of the contents
+            target_path: Path of the project file to create
+
+        Returns:
+            True if the file was created, False if the blob is not stored
+        """
+        if not self.hardlinks:
+            return False
+        try:
+            os.link(self.path(content_hash), target_path)
+            return True
+        except FileNotFoundError:
+            return False
+        except OSError as e:
+            if e.errno == errno.EXDEV:
+                self._disable_hardlinks(e)
+                return False
+            # Past the filesystem's link limit the file gets its own copy
+            if e.errno != errno.EMLINK:
+                raise
+        shutil.copyfile(self.path(content_hash), target_path)
+        return True
+
+    def add(self, source: BinaryIO, target_path: str) -> str:
+        """
+        Store a stream and link it into a project tree, hashing it on the way.
+
+        Args:
+            source: Stream of the file's contents
+            target_path: Path of the project file to create
+
+        Returns:
+            SHA-256 hex digest of the contents
+        """
+        if not self.hardlinks:
+            return self._write(source, target_path)
+
+        tmp_path = os.path.join(self._tmp_dir, uuid.uuid4().hex)
+        try:
+            content_hash = self._write(source, tmp_path)
+            os.chmod(tmp_path, 0o444)
+            blob_path = self.path(content_hash)
+            os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+            # Publish unless another upload stored the same contents first;
+            # gc may remove an unreferenced blob in between, hence the retry
+            for _ in range(2):
+                try:
+                    os.link(tmp_path, blob_path)
+                except FileExistsError:
+                    pass
+                if self.link(content_hash, target_path):
+                    return content_hash
+                if not self.hardlinks:
+                    break
+            shutil.copyfile(tmp_path, target_path)
+            return content_hash
+        finally:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+
+    def gc(self, min_age_seconds: int = 0) -> Dict[str, int]:
+        """
+        Remove the blobs no project file links to any more.
+
+        It is safe while files are being extracted: a blob is published
+        while its temporary file still links it, and a link to a blob that
+        was just collected fails, so the member is decompressed instead.
+
+        Args:
+            min_age_seconds: Temporary files younger than this are kept, as
+                they may still be being written
+
+        Returns:
+            Dictionary with the removed blob count and bytes, and the count
+            and bytes of the blobs left, split into those shared by several
+            project files and those linked by exactly one
+        """
+        now = time.time()
+        result = {
+            "blobs_removed": 0,
+            "blob_bytes_freed": 0,
+            "shared_blobs": 0,
+            "shared_blob_bytes": 0,
+            "single_blobs": 0,
+            "single_blob_bytes": 0
+        }
+        with os.scandir(self.root) as fanout_dirs:
+            for fanout_dir in fanout_dirs:
+                if not fanout_dir.is_dir(follow_symlinks=False):
+                    continue
+                with os.scandir(fanout_dir.path) as blobs:
+                    for blob in blobs:
+                        try:
+                            stat = blob.stat(follow_symlinks=False)
+                        except OSError:
+                            continue
+                        if fanout_dir.name == _TMP_DIR:
+                            if now - stat.st_mtime >= min_age_seconds:
+                                self._unlink(blob.path)
+                        elif stat.st_nlink <= 1:
+                            if self._unlink(blob.path):
+                                result["blobs_removed"] += 1
+                                result["blob_bytes_freed"] += stat.st_size
+                        elif stat.st_nlink == 2:
+                            result["single_blobs"] += 1
+                            result["single_blob_bytes"] += stat.st_size
+                        else:
+                            result["shared_blobs"] += 1
+                            result["shared_blob_bytes"] += stat.st_size
+        return result
+
+    def _write(self, source: BinaryIO, target_path: str) -> str:
+        with open(target_path, "wb") as destination:
+            return copy_and_hash(source, destination)
+
+    def _unlink(self, path: str) -> bool:
+        try:
+            os.unlink(path)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def _disable_hardlinks(self, error: OSError) -> None:
+        if self.hardlinks:
+            self.hardlinks = False
+            logger.warning(
+                f"Project trees cannot be hard-linked to {self.root} ({str(error)}); "
+                "files are written to every tree instead"
+            )
+
+
+_blob_store: Optional[BlobStore] = None
+_blob_store_lock = threading.Lock()
+
+
+def get_blob_store() -> Optional[BlobStore]:
+    """
+    Get the shared blob store, creating it on first use.
+
+    Returns:
+        The store under STORAGE_DIR, or None if DEDUP_STORE is disabled
+    """
+    global _blob_store
+    if not settings.DEDUP_STORE:
+        return None
+    with _blob_store_lock:
+        if _blob_store is None:
+            _blob_store = BlobStore(os.path.join(settings.STORAGE_DIR, "blobs"))
+        return _blob_store
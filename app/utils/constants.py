@@ -21,6 +21,9 @@ class RelationshipType(str, Enum):
     REFERENCES = "REFERENCES"
     DEPENDS_ON = "DEPENDS_ON"
     
+    # Code relationships
+    CALLS = "CALLS"
+    
     # Component relationships
     CLASSIFIES_AS = "CLASSIFIES_AS"
     MAPS_TO = "MAPS_TO"
@@ -56,4 +59,28 @@ class NodeType(str, Enum):
     TARGET_COMPONENT = "TargetComponent"
     STRATEGY = "Strategy"
     REPORT = "Report"
-    FEEDBACK = "Feedback" 
\ No newline at end of file
+    FEEDBACK = "Feedback"
+
+
+# Unique id property for each node type. Used to bootstrap uniqueness
+# constraints and as the lookup key for node matches.
+NODE_ID_PROPERTIES = {
+    NodeType.PROJECT: "project_id",
+    NodeType.FILE: "file_id",
+    NodeType.FOLDER: "folder_id",
+    NodeType.FUNCTION: "function_id",
+    NodeType.CLASS: "class_id",
+    NodeType.ENUM: "enum_id",
+    NodeType.EXTENSION: "extension_id",
+    NodeType.DEPENDENCY: "dependency_id",
+    NodeType.COMPONENT: "component_id",
+    NodeType.MAPPING: "mapping_id",
+    NodeType.TARGET_COMPONENT: "target_component_id",
+    NodeType.STRATEGY: "strategy_id",
+    NodeType.REPORT: "report_id",
+    NodeType.FEEDBACK: "feedback_id",
+}
+
+# Non-unique properties indexed on every node type. ``project_id`` scopes
+# nearly every query; ``id`` is the legacy key used by the upload agent.
+INDEXED_PROPERTIES = ["project_id", "id"]
@@ -0,0 +1,438 @@
+import logging
+import mimetypes
+import os
+import posixpath
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import msgpack
+
+from app.utils.hashing import stream_content_hash
+from app.utils.zip_fs import ZipProjectFS, open_project_archive
+
+logger = logging.getLogger(__name__)
+
+# Bump when the layout changes; manifests of another version are rebuilt
+MANIFEST_VERSION = 2
+
+# Content tags; a tagged file is listed and stored but never parsed or sent to the LLM
+BINARY = "binary"
+GENERATED = "generated"
+MINIFIED = "minified"
+
+# Bytes from the start of each file that classify_content looks at
+CLASSIFY_HEAD_BYTES = 8192
+
+# Bytes that occur in text; anything else in a file's head counts towards binary
+_TEXT_BYTES = bytes({7, 8, 9, 10, 12, 13, 27} | set(range(0x20, 0x100)) - {0x7f})
+
+# Lockfiles and other files written by tools rather than people
+_GENERATED_NAMES = {
+    "package-lock.json", "npm-shrinkwrap.json", "yarn.lock", "pnpm-lock.yaml",
+    "composer.lock", "gemfile.lock", "cargo.lock", "poetry.lock", "pipfile.lock",
+    "go.sum", "packages.lock.json"
+}
+_GENERATED_SUFFIXES = (
+    ".map", ".pb.go", "_pb2.py", "_pb2_grpc.py", ".g.dart", ".g.cs",
+    ".designer.cs", ".generated.cs"
+)
+_MINIFIED_SUFFIXES = (".min.js", ".min.mjs", ".min.css")
+
+# Headers code generators put at the top of their output, matched lowercased
+_GENERATED_MARKERS = (
+    b"@generated", b"do not edit", b"code generated by", b"autogenerated",
+    b"auto-generated", b"automatically generated"
+)
+
+# Bytes from the start of a file searched for a generator header
+_GENERATED_HEADER_BYTES = 2048
+
+# Lines longer than this are not written by hand
+_MINIFIED_LINE_LENGTH = 500
+
+# Written next to the project directory, not inside it, so it never shows up as a project file
+_MANIFEST_SUFFIX = ".manifest"
+
+# Map common extensions to language types
+_EXTENSION_TYPES = {
+    '.py': 'python',
+    '.js': 'javascript',
+    '.ts': 'typescript',
+    '.jsx': 'react',
+    '.tsx': 'react',
+    '.html': 'html',
+    '.css': 'css',
+    '.scss': 'scss',
+    '.sass': 'sass',
+    '.java': 'java',
+    '.kt': 'kotlin',
+    '.kts': 'kotlin',
+    '.c': 'c',
+    '.cpp': 'cpp',
+    '.h': 'c_header',
+    '.hpp': 'cpp_header',
+    '.cs': 'csharp',
+    '.go': 'go',
+    '.rs': 'rust',
+    '.rb': 'ruby',
+    '.php': 'php',
+    '.swift': 'swift',
+    '.m': 'objective_c',
+    '.mm': 'objective_cpp',
+    '.sql': 'sql',
+    '.json': 'json',
+    '.xml': 'xml',
+    '.yaml': 'yaml',
+    '.yml': 'yaml',
+    '.md': 'markdown',
+    '.cob': 'cobol',
+    '.cbl': 'cobol',
+    '.dpr': 'delphi',
+    '.pas': 'pascal',
+    '.f': 'fortran',
+    '.f90': 'fortran',
+    '.sh': 'shell',
+    '.bat': 'batch',
+    '.ps1': 'powershell',
+    '.config': 'config',
+    '.toml': 'toml',
+    '.ini': 'ini',
+    '.csv': 'csv',
+    '.txt': 'text'
+}
+
+
+def detect_file_type(file_path: str) -> str:
+    """
+    Determine the file type based on extension and MIME type.
+
+    Args:
+        file_path: Path to the file
+
+    Returns:
+        File type
+    """
+    file_type = _EXTENSION_TYPES.get(os.path.splitext(file_path)[1].lower())
+    if file_type:
+        return file_type
+
+    # If extension not found in map, use MIME type
+    mime_type, _ = mimetypes.guess_type(file_path)
+    if mime_type:
+        return mime_type.split('/')[0]
+
+    # Fallback to generic type
+    return 'unknown'
+
+
+def classify_content(file_path: str, head: bytes) -> Optional[str]:
+    """
+    Tag files that are not worth analyzing from their name and first bytes.
+
+    A NUL byte or mostly non-text bytes mark a binary, whatever its
+    extension. Lockfiles, source maps, protobuf and designer output and
+    files with a generator header are generated. Files named .min.* or
+    whose head is mostly lines longer than any hand-written line are
+    minified.
+
+    Args:
+        file_path: Path to the file
+        head: First CLASSIFY_HEAD_BYTES of the file
+
+    Returns:
+        BINARY, GENERATED or MINIFIED, or None for an ordinary file
+    """
+    if not head:
+        return None
+    if b"\0" in head or len(head.translate(None, _TEXT_BYTES)) > len(head) * 0.3:
+        return BINARY
+
+    name = os.path.basename(file_path).lower()
+    header = head[:_GENERATED_HEADER_BYTES].lower()
+    if (
+        name in _GENERATED_NAMES
+        or name.endswith(_GENERATED_SUFFIXES)
+        or any(marker in header for marker in _GENERATED_MARKERS)
+    ):
+        return GENERATED
+
+    if name.endswith(_MINIFIED_SUFFIXES):
+        return MINIFIED
+    long_line_bytes = sum(len(line) for line in head.split(b"\n") if len(line) > _MINIFIED_LINE_LENGTH)
+    if long_line_bytes > len(head) / 2:
+        return MINIFIED
+    return None
+
+
+def _hash_and_classify(source: Any, file_path: str, content_hash: Optional[str] = None) -> Tuple[str, str]:
+    """Hash a file's stream, unless its hash is known, and classify its head, in one read."""
+    head = source.read(CLASSIFY_HEAD_BYTES)
+    if content_hash is None:
+        content_hash = stream_content_hash(source, head)
+    return content_hash, classify_content(file_path, head) or ""
+
+
+class FileManifest:
+    """
+    Every file and folder of a project, scanned once from its extracted
+    directory or its archive.
+
+    Files are stored column-wise (relative path, size, mtime, type, content
+    hash, content tag) so a manifest of a large project stays small on disk
+    and in memory. Later stages read it instead of walking and stat-ing the
+    tree.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        folders: List[str],
+        paths: List[str],
+        sizes: List[int],
+        mtimes: List[float],
+        types: List[str],
+        hashes: List[str],
+        tags: List[str]
+    ):
+        """
+        Initialize a manifest.
+
+        Args:
+            root: Project directory the relative paths are relative to
+            folders: Relative paths of the folders, parents before children
+            paths: Relative paths of the files, using '/' separators
+            sizes: File sizes in bytes
+            mtimes: File modification times
+            types: File types
+            hashes: SHA-256 hex digests of the file contents
+            tags: Content tags from classify_content, '' for ordinary files
+        """
+        self.root = root
+        self.folders = folders
+        self.paths = paths
+        self.sizes = sizes
+        self.mtimes = mtimes
+        self.types = types
+        self.hashes = hashes
+        self.tags = tags
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def files(self) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over the files of the project.
+
+        Yields:
+            Dictionary with the file's path, relative path, name, size,
+            mtime, file type, content hash and content tag (None for
+            ordinary files)
+        """
+        for index, relative_path in enumerate(self.paths):
+            yield {
+                "path": os.path.join(self.root, relative_path),
+                "relative_path": relative_path,
+                "name": posixpath.basename(relative_path),
+                "size": self.sizes[index],
+                "mtime": self.mtimes[index],
+                "file_type": self.types[index],
+                "content_hash": self.hashes[index],
+                "content_tag": self.tags[index] or None
+            }
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get statistics about the files in the project.
+
+        Returns:
+            Dictionary with file count, folder count, largest file size,
+            file count per extension, and the count and total size of the
+            tagged files that analysis skips
+        """
+        file_types = {}
+        for relative_path in self.paths:
+            ext = os.path.splitext(relative_path)[1].lower()
+            file_types[ext] = file_types.get(ext, 0) + 1
+        tagged = [index for index, tag in enumerate(self.tags) if tag]
+        return {
+            "file_count": len(self.paths),
+            "folder_count": len(self.folders),
+            "largest_file_size": max(self.sizes, default=0),
+            "file_types": file_types,
+            "tagged_file_count": len(tagged),
+            "tagged_bytes": sum(self.sizes[index] for index in tagged)
+        }
+
+    def save(self) -> str:
+        """
+        Write the manifest next to its project directory.
+
+        Returns:
+            Path of the manifest file
+        """
+        # Types repeat across files, so each is stored once and referenced by index
+        type_names = sorted(set(self.types))
+        type_index = {name: index for index, name in enumerate(type_names)}
+        data = {
+            "version": MANIFEST_VERSION,
+            "folders": self.folders,
+            "paths": self.paths,
+            "sizes": self.sizes,
+            "mtimes": self.mtimes,
+            "type_names": type_names,
+            "types": [type_index[file_type] for file_type in self.types],
+            "hashes": [bytes.fromhex(content_hash) for content_hash in self.hashes],
+            "tags": self.tags
+        }
+
+        path = manifest_path(self.root)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(msgpack.packb(data, use_bin_type=True))
+        os.replace(temp_path, path)
+        return path
+
+
+def manifest_path(root: str) -> str:
+    """
+    Get the path of the manifest of a project directory.
+
+    Args:
+        root: Project directory
+
+    Returns:
+        Path of the manifest file
+    """
+    return os.path.normpath(root) + _MANIFEST_SUFFIX
+
+
+def build_manifest(root: str, content_hashes: Optional[Dict[str, str]] = None) -> FileManifest:
+    """
+    Scan a project directory once with os.scandir.
+
+    Hidden files and directories are skipped, as every stage skipped them.
+    Each file is opened once, to classify its head and hash it.
+
+    Args:
+        root: Project directory
+        content_hashes: Relative path to content hash of files already
+            hashed, e.g. while they were extracted; other files are hashed here
+
+    Returns:
+        Manifest of the project
+    """
+    content_hashes = content_hashes or {}
+    manifest = FileManifest(root, [], [], [], [], [], [], [])
+
+    def scan(directory: str, relative_dir: str) -> None:
+        with os.scandir(directory) as scanned:
+            entries = sorted(scanned, key=lambda entry: entry.name)
+        for entry in entries:
+            if entry.name.startswith('.'):
+                continue
+            relative_path = posixpath.join(relative_dir, entry.name) if relative_dir else entry.name
+            if entry.is_dir(follow_symlinks=False):
+                manifest.folders.append(relative_path)
+                scan(entry.path, relative_path)
+            elif entry.is_file(follow_symlinks=False):
+                # DirEntry caches the stat of the scan, so no extra syscall per file
+                stat = entry.stat(follow_symlinks=False)
+                manifest.paths.append(relative_path)
+                manifest.sizes.append(stat.st_size)
+                manifest.mtimes.append(stat.st_mtime)
+                manifest.types.append(detect_file_type(entry.name))
+                with open(entry.path, "rb") as source:
+                    content_hash, tag = _hash_and_classify(source, entry.name, content_hashes.get(relative_path))
+                manifest.hashes.append(content_hash)
+                manifest.tags.append(tag)
+
+    scan(root, "")
+    return manifest
+
+
+def build_archive_manifest(root: str, fs: ZipProjectFS) -> FileManifest:
+    """
+    Build the manifest of a project served from its archive, without extracting it.
+
+    Paths, sizes and times come from the archive's central directory; only
+    the content hashes need each member to be decompressed, which is
+    streamed and never written to disk. The pass runs under one extraction
+    guard, so a zip bomb is stopped while it is being hashed.
+
+    Args:
+        root: Project directory the archive stands in for
+        fs: Archive view of the project
+
+    Returns:
+        Manifest of the project
+
+    Raises:
+        ZipBombError: If the archive inflates past a size or ratio ceiling
+    """
+    manifest = FileManifest(root, list(fs.folders), [], [], [], [], [], [])
+    guard = fs.guard()
+    guard.check_declared(fs.members())
+    for relative_path in fs.paths:
+        manifest.paths.append(relative_path)
+        manifest.sizes.append(fs.size(relative_path))
+        manifest.mtimes.append(fs.mtime(relative_path))
+        manifest.types.append(detect_file_type(relative_path))
+        with fs.open(relative_path, guard) as source:
+            content_hash, tag = _hash_and_classify(source, relative_path)
+        manifest.hashes.append(content_hash)
+        manifest.tags.append(tag)
+    return manifest
+
+
+def load_manifest(root: str) -> Optional[FileManifest]:
+    """
+    Load the manifest of a project directory.
+
+    Args:
+        root: Project directory
+
+    Returns:
+        The manifest, or None if there is none or it cannot be read
+    """
+    path = manifest_path(root)
+    if not os.path.exists(path):
+        return None
+
+    try:
+        with open(path, "rb") as f:
+            data = msgpack.unpackb(f.read(), raw=False)
+        if data.get("version") != MANIFEST_VERSION:
+            return None
+        type_names = data["type_names"]
+        return FileManifest(
+            root,
+            data["folders"],
+            data["paths"],
+            data["sizes"],
+            data["mtimes"],
+            [type_names[index] for index in data["types"]],
+            [content_hash.hex() for content_hash in data["hashes"]],
+            data["tags"]
+        )
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable manifest {path}: {str(e)}")
+        return None
+
+
+def get_manifest(root: str) -> FileManifest:
+    """
+    Load the manifest of a project directory, building it if it has none.
+
+    A directory that was never extracted is indexed from its archive.
+
+    Args:
+        root: Project directory
+
+    Returns:
+        Manifest of the project
+    """
+    manifest = load_manifest(root)
+    if manifest is None:
+        fs = None if os.path.isdir(root) else open_project_archive(root)
+        manifest = build_archive_manifest(root, fs) if fs else build_manifest(root)
+        manifest.save()
+    return manifest
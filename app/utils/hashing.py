@@ -0,0 +1,89 @@
+import hashlib
+import uuid
+from typing import Any, BinaryIO
+
+# Namespace for deterministic node ids; changing it re-keys every node
+NODE_ID_NAMESPACE = uuid.UUID("6f1c3e8a-5b7d-4f2a-9c61-2d8e4b0a7f35")
+
+# Read size used when hashing file contents
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def file_content_hash(file_path: str) -> str:
+    """
+    Compute the SHA-256 hex digest of a file's contents.
+
+    Args:
+        file_path: Path to the file
+
+    Returns:
+        Hex digest of the file contents
+    """
+    with open(file_path, 'rb') as f:
+        return stream_content_hash(f)
+
+
+def stream_content_hash(source: BinaryIO, prefix: bytes = b'') -> str:
+    """
+    Compute the SHA-256 hex digest of a stream's contents.
+
+    Args:
+        source: Stream to read from
+        prefix: Bytes already read from the start of the stream
+
+    Returns:
+        Hex digest of the stream contents
+    """
+    digest = hashlib.sha256(prefix)
+    for chunk in iter(lambda: source.read(_HASH_CHUNK_SIZE), b''):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def copy_and_hash(source: BinaryIO, destination: BinaryIO) -> str:
+    """
+    Copy a stream and compute the SHA-256 of its contents in the same pass.
+
+    Args:
+        source: Stream to read from
+        destination: Stream to write to
+
+    Returns:
+        Hex digest of the copied contents
+    """
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: source.read(_HASH_CHUNK_SIZE), b''):
+        digest.update(chunk)
+        destination.write(chunk)
+    return digest.hexdigest()
+
+
+def stable_id(*parts: Any) -> str:
+    """
+    Build a deterministic node id from its identifying parts.
+
+    The id is a UUID5, so it has the same shape as the uuid4 ids used for
+    nodes that are not content-addressed.
+
+    Args:
+        parts: Values that together identify the node
+
+    Returns:
+        UUID string that is the same for the same parts
+    """
+    return str(uuid.uuid5(NODE_ID_NAMESPACE, "\x1f".join(str(part) for part in parts)))
+
+
+def file_node_id(project_id: str, relative_path: str, content_hash: str) -> str:
+    """
+    Build the id of a File node from its project, path and contents.
+
+    Args:
+        project_id: Project ID
+        relative_path: Path relative to the project root
+        content_hash: SHA-256 of the file contents
+
+    Returns:
+        File node id
+    """
+    return stable_id("file", project_id, relative_path.replace('\\', '/'), content_hash)
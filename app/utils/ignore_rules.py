@@ -0,0 +1,198 @@
+import logging
+import posixpath
+import re
+import zipfile
+from typing import Dict, Iterable, List, Optional, Pattern, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Dependency, VCS and build output trees nobody wants migrated
+DEFAULT_IGNORE_PATTERNS = (
+    "node_modules/",
+    ".git/",
+    "dist/",
+    "target/",
+    "vendor/",
+    "__pycache__/",
+)
+
+# Largest .gitignore read from an archive; anything bigger is not a real one
+_MAX_GITIGNORE_SIZE = 256 * 1024
+
+# (compiled pattern, negated, directories only)
+_Rule = Tuple[Pattern[str], bool, bool]
+
+
+def _glob_to_regex(pattern: str) -> str:
+    """Translate the glob part of a gitignore pattern to a regular expression."""
+    regex = ""
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if pattern.startswith("**/", i):
+            regex += "(?:.*/)?"
+            i += 3
+            continue
+        if pattern.startswith("/**", i) and i + 3 == len(pattern):
+            regex += "/.*"
+            i += 3
+            continue
+        if pattern.startswith("**", i):
+            regex += ".*"
+            i += 2
+            continue
+        if char == "*":
+            regex += "[^/]*"
+        elif char == "?":
+            regex += "[^/]"
+        elif char == "[":
+            end = pattern.find("]", i + 1)
+            if end == -1:
+                regex += re.escape(char)
+            else:
+                body = pattern[i + 1:end]
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                regex += f"[{body}]"
+                i = end
+        elif char == "\\" and i + 1 < len(pattern):
+            i += 1
+            regex += re.escape(pattern[i])
+        else:
+            regex += re.escape(char)
+        i += 1
+    return regex
+
+
+class IgnoreRules:
+    """
+    A compiled set of gitignore-style rules.
+
+    Rules are matched in the order they were added and the last match
+    wins, so a later rule can re-include ("!pattern") what an earlier one
+    excluded. As in git, nothing inside an ignored directory is kept.
+    Decisions for directories are cached, so checking every member of a
+    large archive matches each directory once.
+    """
+
+    def __init__(self, patterns: Iterable[str] = ()):
+        """
+        Initialize the rule set.
+
+        Args:
+            patterns: Patterns relative to the project root
+        """
+        self._rules: List[_Rule] = []
+        self._directory_cache: Dict[str, bool] = {}
+        self.add_patterns(patterns)
+
+    def __len__(self) -> int:
+        return len(self._rules)
+
+    def add_patterns(self, patterns: Iterable[str], base: str = "") -> None:
+        """
+        Add rules, in .gitignore syntax.
+
+        Args:
+            patterns: Lines of a .gitignore file or single patterns
+            base: Directory the patterns are relative to ('' for the project root)
+        """
+        prefix = re.escape(base.strip("/") + "/") if base.strip("/") else ""
+        for line in patterns:
+            pattern = line.rstrip("\r\n")
+            if not pattern.endswith("\\ "):
+                pattern = pattern.rstrip()
+            if not pattern or pattern.startswith("#"):
+                continue
+
+            negated = pattern.startswith("!")
+            if negated:
+                pattern = pattern[1:]
+            elif pattern.startswith("\\"):
+                pattern = pattern[1:]
+            directories_only = pattern.endswith("/")
+            pattern = pattern.rstrip("/")
+            if not pattern:
+                continue
+
+            # A slash anywhere but the end anchors the pattern to its base;
+            # otherwise it matches at any depth below it
+            anchored = "/" in pattern
+            glob = _glob_to_regex(pattern.lstrip("/"))
+            regex = prefix + (glob if anchored else f"(?:.*/)?{glob}")
+            self._rules.append((re.compile(f"^{regex}$", re.DOTALL), negated, directories_only))
+        self._directory_cache.clear()
+
+    def _match(self, path: str, is_dir: bool) -> bool:
+        for regex, negated, directories_only in reversed(self._rules):
+            if directories_only and not is_dir:
+                continue
+            if regex.match(path):
+                return not negated
+        return False
+
+    def _directory_ignored(self, path: str) -> bool:
+        ignored = self._directory_cache.get(path)
+        if ignored is None:
+            parent = posixpath.dirname(path)
+            ignored = (bool(parent) and self._directory_ignored(parent)) or self._match(path, True)
+            self._directory_cache[path] = ignored
+        return ignored
+
+    def is_ignored(self, path: str, is_dir: bool = False) -> bool:
+        """
+        Check whether a path is excluded.
+
+        Args:
+            path: Path relative to the project root, using '/' separators
+            is_dir: Whether the path is a directory
+
+        Returns:
+            True if the path or one of its parent directories is ignored
+        """
+        path = path.strip("/")
+        if not path:
+            return False
+        if is_dir:
+            return self._directory_ignored(path)
+        parent = posixpath.dirname(path)
+        return (bool(parent) and self._directory_ignored(parent)) or self._match(path, False)
+
+
+def archive_ignore_rules(zip_ref: zipfile.ZipFile, overrides: Optional[Iterable[str]] = None) -> IgnoreRules:
+    """
+    Compile the ignore rules of an archive before any member is extracted.
+
+    The built-in defaults come first, then every .gitignore in the archive
+    (parents before children, so the deeper file wins), then the upload's
+    own overrides, which win over both. A .gitignore inside a directory that
+    is already ignored is not read.
+
+    Args:
+        zip_ref: Open ZIP file
+        overrides: Per-upload patterns relative to the project root
+
+    Returns:
+        The compiled rules
+    """
+    rules = IgnoreRules(DEFAULT_IGNORE_PATTERNS)
+    gitignores = sorted(
+        (
+            info for info in zip_ref.infolist()
+            if posixpath.basename(info.filename) == ".gitignore" and not info.is_dir()
+        ),
+        key=lambda info: info.filename.count("/")
+    )
+    for info in gitignores:
+        base = posixpath.dirname(info.filename)
+        if info.file_size > _MAX_GITIGNORE_SIZE or (base and rules.is_ignored(base, True)):
+            continue
+        try:
+            content = zip_ref.read(info).decode("utf-8", errors="replace")
+        except Exception as e:
+            logger.warning(f"Skipping unreadable {info.filename}: {str(e)}")
+            continue
+        rules.add_patterns(content.splitlines(), base)
+    if overrides:
+        rules.add_patterns(overrides)
+    return rules
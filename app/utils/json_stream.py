@@ -0,0 +1,108 @@
+import json
+import logging
+from typing import Any, AsyncIterable, AsyncIterator, Dict, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Flush the response buffer once it grows past this many bytes
+_CHUNK_BYTES = 64 * 1024
+
+
+def _dumps(value: Any) -> str:
+    """Encode a value as JSON, stringifying anything json cannot encode."""
+    return json.dumps(value, default=str)
+
+
+async def _chain(first: T, rest: AsyncIterator[T]) -> AsyncIterator[T]:
+    try:
+        yield first
+        async for item in rest:
+            yield item
+    finally:
+        aclose = getattr(rest, "aclose", None)
+        if aclose is not None:
+            await aclose()
+
+
+async def _empty() -> AsyncIterator[Any]:
+    return
+    yield
+
+
+async def prefetch(items: AsyncIterable[T]) -> AsyncIterator[T]:
+    """
+    Pull the first item of an async iterable before a response is started.
+
+    Once a StreamingResponse has sent its 200 headers an error can no longer
+    become an error response, so routers prefetch their first query: a
+    failing query or an unreachable database still raises in the handler.
+
+    Args:
+        items: Async iterable, e.g. the records of a query
+
+    Returns:
+        Async iterator over every item, the prefetched one first
+
+    Raises:
+        Exception: Whatever pulling the first item raised
+    """
+    iterator = items.__aiter__()
+    try:
+        first = await iterator.__anext__()
+    except StopAsyncIteration:
+        return _empty()
+    return _chain(first, iterator)
+
+
+async def stream_json_object(fields: Dict[str, Any]) -> AsyncIterator[bytes]:
+    """
+    Encode a JSON object incrementally for a StreamingResponse.
+
+    Values are written in order. Async iterables are written as JSON arrays
+    one item at a time, so large result sets never need to be held in
+    memory. Callables are called when their field is reached, which lets a
+    summary field use counts gathered while streaming earlier fields. Any
+    other value is encoded as-is.
+
+    A failure after the first chunk cannot change the status any more; it
+    is logged and re-raised so the server aborts the response instead of
+    ending it as if it were complete. Every async iterable is closed either
+    way, which releases the sessions of unfinished queries.
+
+    Args:
+        fields: Mapping of field name to value, async iterable or callable
+
+    Yields:
+        Encoded chunks of the JSON document
+    """
+    try:
+        buffer = ["{"]
+        size = 1
+        for index, (name, value) in enumerate(fields.items()):
+            buffer.append(f'{"," if index else ""}{_dumps(name)}:')
+            if isinstance(value, AsyncIterable):
+                buffer.append("[")
+                first = True
+                async for item in value:
+                    encoded = _dumps(item)
+                    buffer.append(encoded if first else "," + encoded)
+                    first = False
+                    size += len(encoded) + 1
+                    if size >= _CHUNK_BYTES:
+                        yield "".join(buffer).encode("utf-8")
+                        buffer, size = [], 0
+                buffer.append("]")
+            else:
+                buffer.append(_dumps(value() if callable(value) else value))
+        buffer.append("}")
+        yield "".join(buffer).encode("utf-8")
+    except Exception as e:
+        logger.error(f"Error while streaming a JSON response, aborting it: {str(e)}")
+        raise
+    finally:
+        for value in fields.values():
+            aclose = getattr(value, "aclose", None)
+            if aclose is not None:
+                await aclose()
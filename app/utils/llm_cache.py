@@ -0,0 +1,265 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from app.config.dependencies import dependency_initializer
+from app.config.settings import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Prefix for cache entries and the shared counters in Redis
+_REDIS_PREFIX = "llm_cache:"
+_REDIS_STATS_KEY = f"{_REDIS_PREFIX}stats"
+
+# Disk writes between two size checks of the disk tier
+_EVICTION_INTERVAL = 100
+
+
+def llm_cache_key(model: str, prompt_version: str, content: str, *parts: Any) -> str:
+    """
+    Build a cache key for an LLM response.
+
+    Args:
+        model: Model the prompt is sent to
+        prompt_version: Name and version of the prompt template
+        content: Content the prompt is built around
+        parts: Other prompt inputs that change the response (e.g. file type)
+
+    Returns:
+        Hex digest identifying the response
+    """
+    content_hash = hashlib.sha256(content.encode("utf-8", errors="replace")).hexdigest()
+    key = "\x1f".join([model, prompt_version, *(str(part) for part in parts), content_hash])
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    Content-addressed cache of LLM responses.
+
+    Entries live in a local disk tier and, when LLM_CACHE_REDIS is enabled
+    and the redis service is available, in Redis so every worker shares
+    them. Both tiers expire entries after LLM_CACHE_TTL_SECONDS. The disk
+    tier is trimmed to LLM_CACHE_MAX_DISK_MB by evicting the least recently
+    used entries; Redis eviction is left to the server's maxmemory policy.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        ttl_seconds: Optional[int] = None,
+        max_disk_bytes: Optional[int] = None,
+        use_redis: Optional[bool] = None
+    ):
+        self.directory = directory or settings.LLM_CACHE_DIR
+        self.ttl_seconds = settings.LLM_CACHE_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self.max_disk_bytes = (
+            settings.LLM_CACHE_MAX_DISK_MB * 1024 * 1024 if max_disk_bytes is None else max_disk_bytes
+        )
+        self.use_redis = settings.LLM_CACHE_REDIS if use_redis is None else use_redis
+        self.stats = {
+            "hits_disk": 0,
+            "hits_redis": 0,
+            "misses": 0,
+            "writes": 0,
+            "evictions": 0,
+            "errors": 0
+        }
+        self._lock = threading.Lock()
+        self._writes_since_eviction = 0
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _redis(self) -> Any:
+        return dependency_initializer.get_service("redis") if self.use_redis else None
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.stats[name] += 1
+        redis_client = self._redis()
+        if redis_client is not None:
+            try:
+                redis_client.hincrby(_REDIS_STATS_KEY, name, 1)
+            except Exception:
+                pass
+
+    def _expired(self, created_at: float) -> bool:
+        return bool(self.ttl_seconds) and time.time() - created_at > self.ttl_seconds
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a cached response.
+
+        Args:
+            key: Key from llm_cache_key
+
+        Returns:
+            The cached response, or None on a miss
+        """
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            if not self._expired(entry["created_at"]):
+                # The access time drives LRU eviction
+                os.utime(path)
+                self._count("hits_disk")
+                return entry["value"]
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Discarding unreadable LLM cache entry {path}: {str(e)}")
+            self._count("errors")
+
+        redis_client = self._redis()
+        if redis_client is not None:
+            try:
+                value = redis_client.get(f"{_REDIS_PREFIX}{key}")
+            except Exception as e:
+                logger.warning(f"LLM cache Redis lookup failed: {str(e)}")
+                self._count("errors")
+                value = None
+            if value is not None:
+                value = value.decode("utf-8") if isinstance(value, bytes) else value
+                self._write_disk(key, value)
+                self._count("hits_redis")
+                return value
+
+        self._count("misses")
+        return None
+
+    def set(self, key: str, value: str) -> None:
+        """
+        Store a response in every tier.
+
+        Args:
+            key: Key from llm_cache_key
+            value: Response to cache
+        """
+        self._write_disk(key, value)
+        redis_client = self._redis()
+        if redis_client is not None:
+            try:
+                redis_client.set(f"{_REDIS_PREFIX}{key}", value, ex=self.ttl_seconds or None)
+            except Exception as e:
+                logger.warning(f"LLM cache Redis write failed: {str(e)}")
+                self._count("errors")
+        self._count("writes")
+
+    def _write_disk(self, key: str, value: str) -> None:
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write then rename so concurrent readers never see a partial entry
+            temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump({"created_at": time.time(), "value": value}, f)
+            os.replace(temp_path, path)
+        except OSError as e:
+            logger.warning(f"LLM cache disk write failed: {str(e)}")
+            self._count("errors")
+            return
+
+        with self._lock:
+            self._writes_since_eviction += 1
+            due = self._writes_since_eviction >= _EVICTION_INTERVAL
+            if due:
+                self._writes_since_eviction = 0
+        if due:
+            self.evict()
+
+    def evict(self) -> int:
+        """
+        Remove expired entries, then least recently used ones until the disk
+        tier fits within its size limit.
+
+        Returns:
+            Number of entries removed
+        """
+        entries = []
+        total_bytes = 0
+        now = time.time()
+        for root, _, filenames in os.walk(self.directory):
+            for filename in filenames:
+                if not filename.endswith(".json"):
+                    continue
+                path = os.path.join(root, filename)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total_bytes += stat.st_size
+
+        removed = 0
+        entries.sort()
+        for mtime, size, path in entries:
+            # mtime is the last write or hit, so an entry untouched for a whole
+            # TTL has expired either way
+            expired_by_age = bool(self.ttl_seconds) and now - mtime > self.ttl_seconds
+            if not expired_by_age and total_bytes <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total_bytes -= size
+            removed += 1
+
+        if removed:
+            with self._lock:
+                self.stats["evictions"] += removed
+            logger.info(f"Evicted {removed} LLM cache entries")
+        return removed
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Return hit/miss counters for this process and, with Redis enabled,
+        the counters shared by every process.
+        """
+        with self._lock:
+            local = dict(self.stats)
+        lookups = local["hits_disk"] + local["hits_redis"] + local["misses"]
+        local["hit_rate"] = round((local["hits_disk"] + local["hits_redis"]) / lookups, 4) if lookups else 0.0
+
+        metrics: Dict[str, Any] = {"process": local}
+        redis_client = self._redis()
+        if redis_client is not None:
+            try:
+                shared = redis_client.hgetall(_REDIS_STATS_KEY)
+                metrics["shared"] = {
+                    (name.decode() if isinstance(name, bytes) else name): int(count)
+                    for name, count in shared.items()
+                }
+            except Exception as e:
+                logger.warning(f"LLM cache Redis stats unavailable: {str(e)}")
+        return metrics
+
+
+_llm_cache: Optional[LLMResponseCache] = None
+_llm_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> Optional[LLMResponseCache]:
+    """
+    Get the process-wide LLM response cache.
+
+    Returns:
+        LLMResponseCache, or None if caching is disabled
+    """
+    global _llm_cache
+
+    if not settings.LLM_CACHE_ENABLED:
+        return None
+    with _llm_cache_lock:
+        if _llm_cache is None:
+            _llm_cache = LLMResponseCache()
+        return _llm_cache
@@ -0,0 +1,219 @@
+import asyncio
+import heapq
+import logging
+import random
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple, TypeVar
+
+import openai
+
+from app.config.settings import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+T = TypeVar("T")
+
+# Length of the window the per-minute limits apply to
+_WINDOW_SECONDS = 60.0
+
+# Rough characters-per-token ratio used to estimate prompt size before a call
+_CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str, max_output_tokens: int = 0) -> int:
+    """
+    Estimate the tokens a request will consume.
+
+    Args:
+        text: Prompt text sent to the model
+        max_output_tokens: Expected completion size
+
+    Returns:
+        Estimated token count
+    """
+    return len(text) // _CHARS_PER_TOKEN + max_output_tokens
+
+
+def is_retryable(error: Exception) -> bool:
+    """Whether an OpenAI error is worth retrying (429, 5xx, timeouts, connection errors)."""
+    if isinstance(error, openai.APIConnectionError):
+        return True
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code == 429 or error.status_code >= 500
+    return False
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    """Read the Retry-After header of an API error, if it has one."""
+    response = getattr(error, "response", None)
+    value = response.headers.get("retry-after") if response is not None else None
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+class RateLimiter:
+    """
+    Sliding-window limiter for requests and tokens per minute.
+
+    Each admitted request is recorded with its token estimate; a request
+    waits until both the request count and token sum of the last minute
+    leave room for it. A limit of 0 disables that dimension. Corrections
+    from reported usage are kept apart from the admitted requests, so they
+    count against the token limit only.
+    """
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._window: Deque[Tuple[float, int]] = deque()
+        self._corrections: Deque[Tuple[float, int]] = deque()
+        self._tokens = 0
+        self._lock = asyncio.Lock()
+
+    def _expire(self, now: float) -> None:
+        for window in (self._window, self._corrections):
+            while window and now - window[0][0] >= _WINDOW_SECONDS:
+                _, tokens = window.popleft()
+                self._tokens -= tokens
+
+    def _wait_time(self, now: float, tokens: int) -> float:
+        """Seconds until a request of the given size fits, 0 if it fits now."""
+        wait = 0.0
+        if self.requests_per_minute and len(self._window) >= self.requests_per_minute:
+            oldest = self._window[len(self._window) - self.requests_per_minute][0]
+            wait = max(wait, oldest + _WINDOW_SECONDS - now)
+        if self.tokens_per_minute and self._window:
+            # A request larger than the whole budget is admitted on an empty window
+            tokens = min(tokens, self.tokens_per_minute)
+            excess = self._tokens + tokens - self.tokens_per_minute
+            for timestamp, entry_tokens in heapq.merge(self._window, self._corrections):
+                if excess <= 0:
+                    break
+                excess -= entry_tokens
+                wait = max(wait, timestamp + _WINDOW_SECONDS - now)
+        return wait
+
+    async def acquire(self, tokens: int) -> float:
+        """
+        Wait until a request of the given size is within both limits.
+
+        Args:
+            tokens: Estimated tokens of the request
+
+        Returns:
+            Seconds spent waiting
+        """
+        waited = 0.0
+        # Holding the lock while sleeping keeps admission first-come, first-served
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._expire(now)
+                wait = self._wait_time(now, tokens)
+                if wait <= 0:
+                    self._window.append((now, tokens))
+                    self._tokens += tokens
+                    return waited
+                await asyncio.sleep(wait)
+                waited += wait
+
+    def record_usage(self, estimated_tokens: int, actual_tokens: int) -> None:
+        """
+        Charge the difference between estimated and reported token usage.
+
+        Args:
+            estimated_tokens: Tokens reserved when the request was admitted
+            actual_tokens: Tokens the API reported for the request
+        """
+        difference = actual_tokens - estimated_tokens
+        if difference:
+            self._corrections.append((time.monotonic(), difference))
+            self._tokens += difference
+
+
+class LLMScheduler:
+    """
+    Runs LLM calls with bounded concurrency, per-minute rate limits and
+    retries with jittered exponential backoff on 429, 5xx and connection
+    errors.
+
+    Calls are passed as zero-argument coroutine factories so a retry issues
+    a fresh request.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        requests_per_minute: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None,
+        max_retries: Optional[int] = None,
+        retry_base_delay: Optional[float] = None,
+        retry_max_delay: Optional[float] = None
+    ):
+        self.max_concurrency = max_concurrency or settings.LLM_MAX_CONCURRENCY
+        self.max_retries = settings.LLM_MAX_RETRIES if max_retries is None else max_retries
+        self.retry_base_delay = settings.LLM_RETRY_BASE_DELAY if retry_base_delay is None else retry_base_delay
+        self.retry_max_delay = settings.LLM_RETRY_MAX_DELAY if retry_max_delay is None else retry_max_delay
+        self.rate_limiter = RateLimiter(
+            settings.LLM_REQUESTS_PER_MINUTE if requests_per_minute is None else requests_per_minute,
+            settings.LLM_TOKENS_PER_MINUTE if tokens_per_minute is None else tokens_per_minute
+        )
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self.stats: Dict[str, Any] = {
+            "requests": 0,
+            "retries": 0,
+            "failures": 0,
+            "rate_limit_wait_seconds": 0.0
+        }
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        """Full-jitter exponential backoff, never shorter than the server's Retry-After."""
+        delay = random.uniform(0, min(self.retry_max_delay, self.retry_base_delay * (2 ** attempt)))
+        retry_after = _retry_after(error)
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.retry_max_delay))
+        return delay
+
+    async def run(self, call: Callable[[], Awaitable[T]], estimated_tokens: int = 0) -> T:
+        """
+        Run one LLM call under the scheduler's limits.
+
+        Args:
+            call: Function returning a new awaitable for the request
+            estimated_tokens: Tokens to reserve against the per-minute budget
+
+        Returns:
+            Result of the call
+
+        Raises:
+            The call's last error if it is not retryable or retries run out
+        """
+        attempt = 0
+        while True:
+            async with self._semaphore:
+                self.stats["rate_limit_wait_seconds"] += await self.rate_limiter.acquire(estimated_tokens)
+                self.stats["requests"] += 1
+                try:
+                    result = await call()
+                except Exception as e:
+                    if not is_retryable(e) or attempt >= self.max_retries:
+                        self.stats["failures"] += 1
+                        raise
+                    error = e
+                else:
+                    usage = getattr(result, "usage", None)
+                    total_tokens = getattr(usage, "total_tokens", None)
+                    if isinstance(total_tokens, int):
+                        self.rate_limiter.record_usage(estimated_tokens, total_tokens)
+                    return result
+
+            # Back off outside the semaphore so other calls keep the slot busy
+            delay = self._backoff(attempt, error)
+            attempt += 1
+            self.stats["retries"] += 1
+            logger.warning(f"LLM call failed ({error}); retry {attempt}/{self.max_retries} in {delay:.1f}s")
+            await asyncio.sleep(delay)
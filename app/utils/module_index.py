@@ -0,0 +1,241 @@
+import posixpath
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+# Directory names treated as source roots even without a package inside
+SOURCE_ROOT_NAMES = {"src", "lib", "source", "python"}
+
+# Re-export hops followed before giving up, guarding against import cycles
+_MAX_REEXPORT_DEPTH = 5
+
+RESOLVED = "resolved"
+UNRESOLVED = "unresolved"
+EXTERNAL = "external"
+
+
+def import_names(import_meta: Dict[str, Any]) -> List[str]:
+    """
+    Get the dotted names an import statement binds.
+
+    Relative imports keep their leading dots.
+
+    Args:
+        import_meta: Import entry with module, names and level
+
+    Returns:
+        One dotted name per imported name, or the module itself for
+        "import x" and star imports
+    """
+    prefix = "." * import_meta.get("level", 0) + (import_meta.get("module") or "")
+    names = [name for name in import_meta.get("names") or [] if name != "*"]
+    if not names:
+        return [prefix] if prefix else []
+    separator = "" if not import_meta.get("module") else "."
+    return [f"{prefix}{separator}{name}" for name in names]
+
+
+class ModuleIndex:
+    """
+    Maps dotted Python module names to project files.
+
+    Built once per project from the relative paths of its files. Every file
+    is registered under its name relative to the project root and to each
+    detected source root: the directory above a top-level package and
+    conventional names such as src/. Packages resolve to their __init__.py.
+    Lookups are dictionary hits, so resolving one import does not depend on
+    the size of the project.
+    """
+
+    def __init__(self, relative_paths: Iterable[str]):
+        self._modules: Dict[str, str] = {}
+        self._file_modules: Dict[str, str] = {}
+        self._paths: Set[str] = set()
+        self._reexports: Dict[str, Dict[str, str]] = {}
+        self.top_level: Set[str] = set()
+
+        paths = sorted(
+            path.replace("\\", "/") for path in relative_paths if path.endswith(".py")
+        )
+        self._paths.update(paths)
+        package_dirs = {posixpath.dirname(path) for path in paths if posixpath.basename(path) == "__init__.py"}
+
+        roots = {""}
+        for path in paths:
+            directory = posixpath.dirname(path)
+            if directory in package_dirs:
+                # The parent of the outermost package is a source root
+                while directory in package_dirs:
+                    directory = posixpath.dirname(directory)
+                roots.add(directory)
+            parts = directory.split("/") if directory else []
+            for part_index, part in enumerate(parts):
+                if part in SOURCE_ROOT_NAMES:
+                    roots.add("/".join(parts[:part_index + 1]))
+
+        # Register each file under every root above it; when two files claim
+        # the same name, the one under the deeper root wins
+        registered: Dict[str, Tuple[int, str]] = {}
+        for path in paths:
+            parts = path.split("/")
+            for depth in range(len(parts) - 1, -1, -1):
+                if "/".join(parts[:depth]) not in roots:
+                    continue
+                name = self._module_name("/".join(parts[depth:]))
+                if not name:
+                    continue
+                if name not in registered or depth > registered[name][0]:
+                    registered[name] = (depth, path)
+                # Deepest root first, so this is the file's shortest name
+                self._file_modules.setdefault(path, name)
+                self.top_level.add(name.split(".")[0])
+        self._modules = {name: path for name, (_, path) in registered.items()}
+
+    @staticmethod
+    def _module_name(path: str) -> str:
+        parts = path[:-3].split("/")
+        if parts[-1] == "__init__":
+            parts.pop()
+        return ".".join(parts)
+
+    def module_of(self, path: str) -> Optional[str]:
+        """Get the canonical dotted name of a project file."""
+        return self._file_modules.get(path.replace("\\", "/"))
+
+    def absolute_name(self, importer_path: str, name: str) -> Optional[str]:
+        """
+        Turn a relative dotted name into an absolute one.
+
+        Args:
+            importer_path: Relative path of the importing file
+            name: Dotted name, possibly with leading dots
+
+        Returns:
+            Absolute dotted name, or None if it climbs above the root
+        """
+        level = len(name) - len(name.lstrip("."))
+        if not level:
+            return name
+
+        importer_path = importer_path.replace("\\", "/")
+        module = self._file_modules.get(importer_path)
+        if module is None:
+            return None
+        package = module.split(".") if module else []
+        if posixpath.basename(importer_path) != "__init__.py" and package:
+            package.pop()
+        if level - 1 > len(package):
+            return None
+        base = package[:len(package) - (level - 1)]
+        rest = name[level:]
+        return ".".join(base + ([rest] if rest else [])) or None
+
+    def add_reexports(self, init_path: str, imports: List[Dict[str, Any]]) -> None:
+        """
+        Record the names a package __init__.py imports, so imports of those
+        names from the package resolve to the module defining them.
+
+        Args:
+            init_path: Relative path of the __init__.py
+            imports: Import entries extracted from it
+        """
+        package = self.module_of(init_path)
+        if not package:
+            return
+        exports = self._reexports.setdefault(package, {})
+        for import_meta in imports:
+            if not import_meta.get("names"):
+                continue
+            for name in import_names(import_meta):
+                target = self.absolute_name(init_path, name)
+                if target:
+                    exports[name.rsplit(".", 1)[-1]] = target
+
+    def resolve(self, name: str, importer_path: Optional[str] = None) -> Optional[str]:
+        """
+        Find the project file a dotted name refers to.
+
+        Args:
+            name: Dotted name, possibly relative
+            importer_path: Relative path of the importing file
+
+        Returns:
+            Relative path of the file, or None if it is not in the project
+        """
+        found = self.resolve_symbol(name, importer_path)
+        return found[0] if found else None
+
+    def resolve_symbol(
+        self,
+        name: str,
+        importer_path: Optional[str] = None,
+        _depth: int = 0
+    ) -> Optional[Tuple[str, str]]:
+        """
+        Split a dotted name into the project file it refers to and the
+        attribute path within that file.
+
+        The longest prefix of the name that is a module wins, so "a.b.C.run"
+        resolves to (a/b.py, "C.run"). When that module is a package that
+        re-exports the next part of the name, the re-export is followed.
+        Absolute names not found from any source root are also looked up
+        next to the importing file, as Python does for scripts.
+
+        Args:
+            name: Dotted name, possibly relative
+            importer_path: Relative path of the importing file
+
+        Returns:
+            (relative path of the file, attribute path or "" for the module
+            itself), or None if it is not in the project
+        """
+        if importer_path is not None:
+            name = self.absolute_name(importer_path, name)
+            if not name:
+                return None
+
+        parts = name.split(".")
+        for end in range(len(parts), 0, -1):
+            module = ".".join(parts[:end])
+            path = self._modules.get(module)
+            if path is None:
+                continue
+            if end < len(parts) and _depth < _MAX_REEXPORT_DEPTH:
+                target = self._reexports.get(module, {}).get(parts[end])
+                if target:
+                    reexported = self.resolve_symbol(".".join([target] + parts[end + 1:]), _depth=_depth + 1)
+                    if reexported:
+                        return reexported
+            return path, ".".join(parts[end:])
+
+        if importer_path is not None:
+            directory = posixpath.dirname(importer_path.replace("\\", "/"))
+            for end in range(len(parts), 0, -1):
+                relative = "/".join(parts[:end])
+                for candidate in (f"{relative}.py", f"{relative}/__init__.py"):
+                    candidate = posixpath.join(directory, candidate)
+                    if candidate in self._paths:
+                        return candidate, ".".join(parts[end:])
+        return None
+
+    def resolve_import(self, importer_path: str, import_meta: Dict[str, Any]) -> Tuple[List[str], str]:
+        """
+        Resolve one import statement.
+
+        Args:
+            importer_path: Relative path of the importing file
+            import_meta: Import entry with module, names and level
+
+        Returns:
+            (paths of the imported project files, RESOLVED, UNRESOLVED or EXTERNAL)
+        """
+        paths = []
+        for name in import_names(import_meta):
+            path = self.resolve(name, importer_path)
+            if path and path != importer_path and path not in paths:
+                paths.append(path)
+        if paths:
+            return paths, RESOLVED
+
+        module = import_meta.get("module") or ""
+        if import_meta.get("level", 0) or module.split(".")[0] in self.top_level:
+            return paths, UNRESOLVED
+        return paths, EXTERNAL
@@ -0,0 +1,514 @@
+import ast
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Set, Tuple
+
+from app.utils.constants import NodeType
+from app.utils.hashing import stable_id
+from app.utils.zip_fs import read_project_file
+
+# (file path, file id, relative path) of one Python file to analyze
+PythonJob = Tuple[str, str, str]
+
+# (file id, metadata or None, error message or None) for one analyzed file
+PythonResult = Tuple[str, Optional[Dict[str, Any]], Optional[str]]
+
+# [label, node id, method name or None] of a graph node that makes or receives
+# calls; methods are not nodes, so they are addressed through their class
+CallNode = List[Optional[str]]
+
+# Per-process state set once by init_worker, so each chunk only carries its jobs
+_project_id: str = ""
+
+
+def init_worker(project_id: str) -> None:
+    """
+    Set the project context for extraction in this process.
+
+    Args:
+        project_id: Project the analyzed files belong to
+    """
+    global _project_id
+    _project_id = project_id
+
+
+def extract_python_chunk(jobs: List[PythonJob]) -> List[PythonResult]:
+    """
+    Analyze a chunk of Python files. Runs in a worker process.
+
+    Args:
+        jobs: Files to analyze
+
+    Returns:
+        One result per job; errors are returned rather than raised so one
+        bad file does not fail the chunk
+    """
+    results = []
+    for file_path, file_id, relative_path in jobs:
+        try:
+            results.append((file_id, extract_python_metadata(file_path, file_id, relative_path), None))
+        except Exception as e:
+            results.append((file_id, None, f"Error analyzing Python file {file_path}: {str(e)}"))
+    return results
+
+
+def analyze_python_files(
+    jobs: List[PythonJob],
+    project_id: str,
+    workers: int,
+    chunk_size: int
+) -> AsyncIterator[PythonResult]:
+    """
+    Analyze Python files in a pool of worker processes.
+
+    Args:
+        jobs: Files to analyze
+        project_id: Project the files belong to
+        workers: Number of worker processes
+        chunk_size: Files per submitted chunk
+
+    Yields:
+        One result per job
+    """
+    return run_extraction_pool(jobs, project_id, workers, chunk_size, extract_python_chunk, init_worker)
+
+
+async def run_extraction_pool(
+    jobs: List[Any],
+    project_id: str,
+    workers: int,
+    chunk_size: int,
+    extract_chunk: Callable[[List[Any]], List[PythonResult]],
+    initializer: Callable[[str], None]
+) -> AsyncIterator[PythonResult]:
+    """
+    Run an extraction function over jobs in a pool of worker processes.
+
+    Jobs are submitted in chunks, and only a couple of chunks per worker are
+    queued at a time so finished results do not pile up in memory. Results
+    are yielded as chunks finish, not in input order. With one worker the
+    files are analyzed in this process.
+
+    Args:
+        jobs: Files to analyze
+        project_id: Project the files belong to
+        workers: Number of worker processes
+        chunk_size: Files per submitted chunk
+        extract_chunk: Module-level function analyzing a chunk of jobs
+        initializer: Module-level function setting up a worker for project_id
+
+    Yields:
+        One result per job
+    """
+    chunks = [jobs[i:i + chunk_size] for i in range(0, len(jobs), chunk_size)]
+
+    if workers <= 1:
+        initializer(project_id)
+        for chunk in chunks:
+            for result in extract_chunk(chunk):
+                yield result
+        return
+
+    loop = asyncio.get_running_loop()
+    # spawn rather than fork: the parent runs Neo4j driver and graph writer threads
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=initializer,
+        initargs=(project_id,)
+    ) as pool:
+        remaining = iter(chunks)
+        pending = set()
+        while True:
+            for chunk in remaining:
+                pending.add(loop.run_in_executor(pool, extract_chunk, chunk))
+                if len(pending) >= workers * 2:
+                    break
+            if not pending:
+                break
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                for result in future.result():
+                    yield result
+
+
+def extract_python_metadata(file_path: str, file_id: str, relative_path: str) -> Dict[str, Any]:
+    """
+    Extract functions, classes, enums, imports, references and calls from a Python file.
+
+    Imports and references are returned as written, with relative names
+    keeping their leading dots; resolving them to project files needs the
+    whole project and is left to the caller's ModuleIndex. Calls to
+    functions and classes of the same file are resolved here; calls through
+    an imported name carry the dotted target name instead, to be looked up
+    in the symbols of the file it resolves to.
+
+    Args:
+        file_path: Path to the Python file
+        file_id: ID of the File node
+        relative_path: Relative path from project root
+
+    Returns:
+        Extracted metadata
+    """
+    content = read_project_file(file_path).decode('utf-8')
+
+    visitor = _MetadataVisitor(file_id, relative_path)
+    visitor.visit(ast.parse(content))
+    return visitor.finish()
+
+
+class _MetadataVisitor(ast.NodeVisitor):
+    """
+    Single-pass metadata extractor.
+
+    Tracks the enclosing class/function scope for qualified names and a
+    cyclomatic complexity counter per function. Methods are reported only
+    in their class's methods list; every other function, sync or async, in
+    functions. Imports are reported once per statement shape and references
+    once per imported name.
+
+    Call sites are counted per caller and callee name: the innermost
+    function, the class (with the method name) for methods and class
+    bodies, or the file for module-level code. Calls through the method's
+    first argument ("self.save()") are attributed to the enclosing class.
+    """
+
+    def __init__(self, file_id: str, relative_path: str):
+        self.file_id = file_id
+        self.relative_path = relative_path
+        self.metadata: Dict[str, Any] = {
+            "file_id": file_id,
+            "functions": [],
+            "classes": [],
+            "enums": [],
+            "extensions": [],
+            "imports": [],
+            "references": [],
+            "calls": [],
+            "symbols": {}
+        }
+        self._scope: List[str] = []
+        # One decision point counter per enclosing function or class body;
+        # class bodies get one so their branches are not charged to a function
+        self._complexity: List[int] = []
+        self._imported_modules: Dict[str, str] = {}
+        self._import_keys: Set[Tuple[str, int, Tuple[str, ...]]] = set()
+        # First line each name is used on; resolved against the imports at
+        # the end, since a name can be used above the import that binds it
+        self._names: Dict[str, int] = {}
+        # (caller node, caller scope, first argument name, class name) of each
+        # enclosing function, class body or the module
+        self._callers: List[Tuple[CallNode, str, Optional[str], Optional[str]]] = [
+            ([NodeType.FILE.value, file_id, None], "", None, None)
+        ]
+        # (caller node, caller scope, callee name) -> [first line, call count]
+        self._call_sites: Dict[Tuple[Tuple[Optional[str], ...], str, str], List[int]] = {}
+
+    def finish(self) -> Dict[str, Any]:
+        """Collect references, calls and enums once the whole tree has been visited."""
+        for name, lineno in self._names.items():
+            module_name = self._imported_modules.get(name)
+            if module_name is None:
+                continue
+            self.metadata["references"].append({
+                "type": "module_reference",
+                "name": name,
+                "lineno": lineno,
+                "target_name": module_name,
+                "created_at": datetime.utcnow().isoformat()
+            })
+
+        symbols = self.metadata["symbols"]
+        for (caller, scope, name), (lineno, count) in self._call_sites.items():
+            call = {"caller": list(caller), "lineno": lineno, "count": count}
+            first, dot, rest = name.partition(".")
+            module_name = self._imported_modules.get(first)
+            if module_name is not None:
+                call["target_name"] = module_name + dot + rest
+            else:
+                # Innermost enclosing scope first; names nothing in the file
+                # defines (builtins, locals, attributes) are dropped
+                target = None
+                scope_parts = scope.split(".") if scope else []
+                for end in range(len(scope_parts), -1, -1):
+                    target = symbols.get(".".join(scope_parts[:end] + [name]))
+                    if target is not None:
+                        break
+                if target is None:
+                    continue
+                call["target"] = target
+            self.metadata["calls"].append(call)
+
+        # Look for enums (typically classes inheriting from Enum)
+        for class_meta in self.metadata["classes"]:
+            if "Enum" in class_meta["superclasses"]:
+                self.metadata["enums"].append({
+                    "enum_id": stable_id(self.file_id, "enum", class_meta["class_id"]),
+                    "file_id": self.file_id,
+                    "project_id": _project_id,
+                    "name": class_meta["name"],
+                    "values": [attr["name"] for attr in class_meta["attributes"]],
+                    "docstring": class_meta["docstring"],
+                    "lineno": class_meta["lineno"],
+                    "end_lineno": class_meta["end_lineno"],
+                    "created_at": datetime.utcnow().isoformat()
+                })
+        return self.metadata
+
+    def _qualified_name(self, name: str) -> str:
+        return ".".join(self._scope + [name])
+
+    def _branch(self, count: int = 1) -> None:
+        if self._complexity:
+            self._complexity[-1] += count
+
+    def _visit_all(self, nodes: List[ast.AST]) -> None:
+        for node in nodes:
+            self.visit(node)
+
+    def visit_Import(self, node: ast.Import) -> None:
+        for name in node.names:
+            # "import a.b" binds "a"; "import a.b as c" binds "c" to a.b
+            bound = name.asname or name.name.split(".")[0]
+            self._imported_modules[bound] = name.name if name.asname else bound
+            self._add_import(name.name, 0, [], node.lineno)
+
+    def visit_ImportFrom(self, node: ast.ImportFrom) -> None:
+        module_prefix = "." * node.level + (f"{node.module}." if node.module else "")
+        for name in node.names:
+            if name.name != "*":
+                self._imported_modules[name.asname or name.name] = module_prefix + name.name
+        self._add_import(node.module or "", node.level, [name.name for name in node.names], node.lineno)
+
+    def _add_import(self, module: str, level: int, names: List[str], lineno: int) -> None:
+        key = (module, level, tuple(names))
+        if key not in self._import_keys:
+            self._import_keys.add(key)
+            self.metadata["imports"].append({
+                "module": module,
+                "names": names,
+                "level": level,
+                "lineno": lineno
+            })
+
+    def visit_Name(self, node: ast.Name) -> None:
+        self._names.setdefault(node.id, node.lineno)
+
+    def visit_Call(self, node: ast.Call) -> None:
+        name = _dotted_name(node.func)
+        if name:
+            caller, scope, self_name, class_name = self._callers[-1]
+            first, _, rest = name.partition(".")
+            if rest and first == self_name:
+                name = f"{class_name}.{rest}"
+            key = (tuple(caller), scope, name)
+            site = self._call_sites.get(key)
+            if site is None:
+                self._call_sites[key] = [node.lineno, 1]
+            else:
+                site[1] += 1
+        self.generic_visit(node)
+
+    def visit_ClassDef(self, node: ast.ClassDef) -> None:
+        # Decorators, bases and keywords belong to the enclosing scope
+        self._visit_all(node.decorator_list)
+        self._visit_all(node.bases)
+        self._visit_all(node.keywords)
+
+        class_name = self._qualified_name(node.name)
+        class_meta = {
+            "class_id": stable_id(self.file_id, "class", class_name, node.lineno),
+            "file_id": self.file_id,
+            "project_id": _project_id,
+            "name": node.name,
+            "type": _infer_class_type(node),
+            "is_static": False,  # Determined by class decorator or metaclass
+            "is_final": any(d.id == 'final' for d in node.decorator_list if isinstance(d, ast.Name)),
+            "superclasses": [base.id for base in node.bases if isinstance(base, ast.Name)],
+            "interfaces": [],  # Python doesn't have explicit interfaces
+            "methods": [],
+            "attributes": _extract_class_attributes(node),
+            "docstring": ast.get_docstring(node) or "",
+            "lineno": node.lineno,
+            "end_lineno": getattr(node, 'end_lineno', node.lineno),
+            "created_at": datetime.utcnow().isoformat()
+        }
+        self.metadata["classes"].append(class_meta)
+        self.metadata["symbols"][class_name] = [NodeType.CLASS.value, class_meta["class_id"], None]
+
+        self._scope.append(node.name)
+        self._complexity.append(0)
+        self._callers.append(([NodeType.CLASS.value, class_meta["class_id"], None], class_name, None, None))
+        for item in node.body:
+            if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                self._visit_function(item, class_meta, class_name)
+            else:
+                self.visit(item)
+        self._callers.pop()
+        self._complexity.pop()
+        self._scope.pop()
+
+    def visit_FunctionDef(self, node: ast.FunctionDef) -> None:
+        self._visit_function(node)
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def _visit_function(
+        self,
+        node: ast.AST,
+        class_meta: Optional[Dict[str, Any]] = None,
+        class_name: Optional[str] = None
+    ) -> None:
+        # Decorators, defaults and annotations are evaluated in the enclosing scope
+        self._visit_all(node.decorator_list)
+        self.visit(node.args)
+        if node.returns:
+            self.visit(node.returns)
+
+        qualified_name = self._qualified_name(node.name)
+        is_static = any(d.id == 'staticmethod' for d in node.decorator_list if isinstance(d, ast.Name))
+        if class_meta is not None:
+            node_id = stable_id(self.file_id, "method", qualified_name, node.lineno)
+            caller = [NodeType.CLASS.value, class_meta["class_id"], node.name]
+            positional = node.args.posonlyargs + node.args.args
+            self_name = positional[0].arg if positional and not is_static else None
+        else:
+            node_id = stable_id(self.file_id, "function", qualified_name, node.lineno)
+            caller = [NodeType.FUNCTION.value, node_id, None]
+            # Nested functions still see the enclosing method's self
+            _, _, self_name, class_name = self._callers[-1]
+        self.metadata["symbols"][qualified_name] = caller
+
+        self._scope.append(node.name)
+        self._complexity.append(1)
+        self._callers.append((caller, qualified_name, self_name, class_name))
+        self._visit_all(node.body)
+        self._callers.pop()
+        complexity = self._complexity.pop()
+        self._scope.pop()
+
+        end_lineno = getattr(node, 'end_lineno', node.lineno)
+        function_meta = {
+            "name": node.name,
+            "return_type": _infer_return_type(node),
+            "arguments": _extract_arguments(node),
+            "decorators": _extract_decorators(node),
+            "is_static": is_static,
+            "is_async": isinstance(node, ast.AsyncFunctionDef),
+            "docstring": ast.get_docstring(node) or "",
+            "lineno": node.lineno,
+            "end_lineno": end_lineno,
+            "line_count": end_lineno - node.lineno + 1,
+            "complexity": complexity
+        }
+        if class_meta is not None:
+            function_meta["method_id"] = node_id
+            class_meta["methods"].append(function_meta)
+        else:
+            function_meta.update({
+                "function_id": node_id,
+                "file_id": self.file_id,
+                "project_id": _project_id,
+                "created_at": datetime.utcnow().isoformat()
+            })
+            self.metadata["functions"].append(function_meta)
+
+    # Decision points for cyclomatic complexity
+    def _visit_branch(self, node: ast.AST) -> None:
+        self._branch()
+        self.generic_visit(node)
+
+    visit_If = visit_For = visit_AsyncFor = visit_While = visit_IfExp = _visit_branch
+    visit_ExceptHandler = visit_Assert = visit_match_case = _visit_branch
+
+    def visit_BoolOp(self, node: ast.BoolOp) -> None:
+        self._branch(len(node.values) - 1)
+        self.generic_visit(node)
+
+    def visit_comprehension(self, node: ast.comprehension) -> None:
+        self._branch(1 + len(node.ifs))
+        self.generic_visit(node)
+
+
+def _dotted_name(node: ast.AST) -> Optional[str]:
+    """Get "a.b.c" for a name or attribute chain, or None for other expressions."""
+    parts = []
+    while isinstance(node, ast.Attribute):
+        parts.append(node.attr)
+        node = node.value
+    if not isinstance(node, ast.Name):
+        return None
+    parts.append(node.id)
+    return ".".join(reversed(parts))
+
+
+def _infer_return_type(node: ast.FunctionDef) -> str:
+    """Infer function return type from annotations or docstring."""
+    if node.returns:
+        return _get_annotation_name(node.returns)
+    return "Any"  # Default return type
+
+
+def _extract_arguments(node: ast.FunctionDef) -> List[Dict[str, str]]:
+    """Extract function arguments with types."""
+    args = []
+    for arg in node.args.args:
+        arg_type = "Any"
+        if arg.annotation:
+            arg_type = _get_annotation_name(arg.annotation)
+        args.append({"name": arg.arg, "type": arg_type})
+    return args
+
+
+def _extract_decorators(node: ast.FunctionDef) -> List[str]:
+    """Extract function decorators."""
+    decorators = []
+    for decorator in node.decorator_list:
+        if isinstance(decorator, ast.Name):
+            decorators.append(f"@{decorator.id}")
+        elif isinstance(decorator, ast.Call):
+            if isinstance(decorator.func, ast.Name):
+                decorators.append(f"@{decorator.func.id}")
+    return decorators
+
+
+def _infer_class_type(node: ast.ClassDef) -> str:
+    """Infer class type (regular, abstract, singleton, etc.)."""
+    # Check for singleton pattern
+    if any(base.id == 'metaclass' for base in node.bases if isinstance(base, ast.Name)):
+        return "singleton"
+    # Check for abstract class
+    if any(d.id == 'abstractmethod' for d in node.decorator_list if isinstance(d, ast.Name)):
+        return "abstract"
+    return "regular"
+
+
+def _extract_class_attributes(node: ast.ClassDef) -> List[Dict[str, str]]:
+    """Extract class attributes with types."""
+    attributes = []
+    for item in node.body:
+        if isinstance(item, ast.AnnAssign) and isinstance(item.target, ast.Name):
+            attr_type = "Any"
+            if item.annotation:
+                attr_type = _get_annotation_name(item.annotation)
+            attributes.append({
+                "name": item.target.id,
+                "type": attr_type,
+                "visibility": "public"  # Default visibility
+            })
+    return attributes
+
+
+def _get_annotation_name(node: ast.AST) -> str:
+    """Get the string representation of a type annotation."""
+    if isinstance(node, ast.Name):
+        return node.id
+    elif isinstance(node, ast.Constant):
+        return str(node.value)
+    elif isinstance(node, ast.Subscript) and isinstance(node.value, ast.Name):
+        # Handle generic types like List[str], Dict[str, int]
+        return f"{node.value.id}[...]"
+    return "Any"
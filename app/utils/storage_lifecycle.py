@@ -0,0 +1,330 @@
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from app.config.dependencies import dependency_initializer
+from app.config.settings import get_settings
+from app.utils.blob_store import get_blob_store
+from app.utils.file_manifest import manifest_path
+from app.utils.zip_fs import close_project_archive, project_archive_path
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Shared counters and the metrics of the last run in Redis
+_REDIS_STATS_KEY = "storage_lifecycle:stats"
+_REDIS_LAST_RUN_KEY = "storage_lifecycle:last_run"
+
+# Names of the directories UploadAgent creates
+_PROJECT_PREFIX = "project_"
+_MIGRATED_PREFIX = "migrated_"
+_UPLOAD_PREFIX = "upload_"
+
+# Suffixes of the files kept next to a project directory
+_PROJECT_SUFFIXES = (".zip", ".manifest", ".manifest.tmp")
+_PARTIAL_MARKER = ".partial-"
+
+# Counters of this process, reported next to the shared ones
+_stats: Dict[str, int] = {}
+_stats_lock = threading.Lock()
+
+
+def _count(name: str, amount: int = 1) -> None:
+    with _stats_lock:
+        _stats[name] = _stats.get(name, 0) + amount
+    redis_client = dependency_initializer.get_service("redis")
+    if redis_client is not None:
+        try:
+            redis_client.hincrby(_REDIS_STATS_KEY, name, amount)
+        except Exception:
+            pass
+
+
+def _tree_size(path: str) -> int:
+    """
+    Bytes that removing a directory frees, without following symlinks.
+
+    A file linked to a blob shared with other trees frees nothing; the
+    store's shared blobs are counted once, on their own.
+    """
+    total = 0
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        total += _tree_size(entry.path)
+                    else:
+                        stat = entry.stat(follow_symlinks=False)
+                        # One link for the tree, one for the blob store
+                        if stat.st_nlink <= 2:
+                            total += stat.st_size
+                except OSError:
+                    continue
+    except OSError:
+        pass
+    return total
+
+
+def _remove(path: str) -> None:
+    if os.path.isdir(path) and not os.path.islink(path):
+        shutil.rmtree(path, ignore_errors=True)
+    elif os.path.lexists(path):
+        os.unlink(path)
+
+
+def record_access(root: str) -> None:
+    """
+    Mark a project directory or migrated output as just used.
+
+    The lifecycle manager evicts the least recently used projects first;
+    stages call this when they start working on one.
+
+    Args:
+        root: Project directory or migrated output directory
+    """
+    for path in (manifest_path(root), root, project_archive_path(root)):
+        if os.path.exists(path):
+            try:
+                os.utime(path)
+            except OSError as e:
+                logger.warning(f"Could not record access to {path}: {str(e)}")
+            return
+
+
+class StorageLifecycleManager:
+    """
+    Keeps TEMP_DIR and STORAGE_DIR within STORAGE_QUOTA_MB.
+
+    Project directories are grouped with the archive and manifest kept next
+    to them, and each group's last access is the newest mtime among them,
+    bumped by record_access. Abandoned uploads, partial extractions and
+    blobs no tree links to any more are always removed. Past the quota,
+    projects idle for at least STORAGE_MIN_IDLE_SECONDS are evicted least
+    recently used first, in three tiers:
+    1. the extracted trees of projects that still have their archive, whose
+       files read_project_file keeps serving from the archive;
+    2. whole projects, archive and manifest included;
+    3. migrated outputs.
+    """
+
+    def __init__(
+        self,
+        temp_dir: Optional[str] = None,
+        storage_dir: Optional[str] = None,
+        quota_bytes: Optional[int] = None,
+        min_idle_seconds: Optional[int] = None
+    ):
+        self.temp_dir = temp_dir or settings.TEMP_DIR
+        self.storage_dir = storage_dir or settings.STORAGE_DIR
+        self.quota_bytes = settings.STORAGE_QUOTA_MB * 1024 * 1024 if quota_bytes is None else quota_bytes
+        self.min_idle_seconds = settings.STORAGE_MIN_IDLE_SECONDS if min_idle_seconds is None else min_idle_seconds
+
+    def scan(self) -> Dict[str, Any]:
+        """
+        Find the tracked projects, migrated outputs and orphans.
+
+        Returns:
+            Dictionary with "projects" (by project directory: tree, archive
+            and manifest sizes and last access), "outputs" (path, size and
+            last access) and "orphans" (paths)
+        """
+        projects: Dict[str, Dict[str, Any]] = {}
+        outputs: List[Dict[str, Any]] = []
+        orphans: List[str] = []
+        now = time.time()
+
+        if os.path.isdir(self.temp_dir):
+            with os.scandir(self.temp_dir) as entries:
+                for entry in entries:
+                    try:
+                        mtime = entry.stat(follow_symlinks=False).st_mtime
+                    except OSError:
+                        continue
+                    idle = now - mtime
+                    if entry.name.startswith(_UPLOAD_PREFIX):
+                        # Uploads still waiting for their chunks or their task are
+                        # younger than an upload session
+                        if idle > settings.UPLOAD_SESSION_TTL_SECONDS:
+                            orphans.append(entry.path)
+                        continue
+                    if not entry.name.startswith(_PROJECT_PREFIX):
+                        continue
+                    if _PARTIAL_MARKER in entry.name:
+                        if idle > self.min_idle_seconds:
+                            orphans.append(entry.path)
+                        continue
+
+                    root, kind = entry.path, "tree"
+                    for suffix in _PROJECT_SUFFIXES:
+                        if entry.name.endswith(suffix):
+                            root, kind = entry.path[:-len(suffix)], suffix.strip(".").replace(".", "_")
+                            break
+                    project = projects.setdefault(root, {
+                        "root": root, "tree_bytes": 0, "archive_bytes": 0, "manifest_bytes": 0,
+                        "has_tree": False, "has_archive": False, "last_access": 0.0
+                    })
+                    if kind == "tree":
+                        project["has_tree"] = entry.is_dir(follow_symlinks=False)
+                        project["tree_bytes"] = _tree_size(entry.path)
+                    elif kind == "zip":
+                        project["has_archive"] = True
+                        project["archive_bytes"] = entry.stat(follow_symlinks=False).st_size
+                    else:
+                        project["manifest_bytes"] += entry.stat(follow_symlinks=False).st_size
+                    project["last_access"] = max(project["last_access"], mtime)
+
+        if os.path.isdir(self.storage_dir):
+            with os.scandir(self.storage_dir) as entries:
+                for entry in entries:
+                    if entry.name.startswith(_MIGRATED_PREFIX) and entry.is_dir(follow_symlinks=False):
+                        outputs.append({
+                            "path": entry.path,
+                            "bytes": _tree_size(entry.path),
+                            "last_access": entry.stat(follow_symlinks=False).st_mtime
+                        })
+
+        return {"projects": projects, "outputs": outputs, "orphans": orphans}
+
+    def enforce(self) -> Dict[str, Any]:
+        """
+        Remove orphans, then evict cold projects until usage fits the quota.
+
+        Returns:
+            Metrics of the run
+        """
+        started = time.perf_counter()
+        now = time.time()
+        store = get_blob_store()
+        collected = store.gc(self.min_idle_seconds) if store else {}
+        scanned = self.scan()
+        projects = sorted(scanned["projects"].values(), key=lambda project: project["last_access"])
+        outputs = sorted(scanned["outputs"], key=lambda output: output["last_access"])
+
+        total_bytes = sum(
+            project["tree_bytes"] + project["archive_bytes"] + project["manifest_bytes"] for project in projects
+        ) + sum(output["bytes"] for output in outputs) + collected.get("shared_blob_bytes", 0)
+        metrics = {
+            "tracked_projects": len(projects),
+            "tracked_outputs": len(outputs),
+            "shared_blob_bytes": collected.get("shared_blob_bytes", 0),
+            "quota_bytes": self.quota_bytes,
+            "bytes_before": total_bytes + collected.get("blob_bytes_freed", 0),
+            "orphans_removed": 0,
+            "blobs_removed": collected.get("blobs_removed", 0),
+            "trees_evicted": 0,
+            "projects_evicted": 0,
+            "outputs_evicted": 0,
+            "bytes_freed": collected.get("blob_bytes_freed", 0)
+        }
+
+        for path in scanned["orphans"]:
+            _remove(path)
+            metrics["orphans_removed"] += 1
+
+        def over_quota() -> bool:
+            return bool(self.quota_bytes) and total_bytes > self.quota_bytes
+
+        cold_projects = [project for project in projects if now - project["last_access"] >= self.min_idle_seconds]
+
+        # Tier 1: extracted trees whose files are still served from their archive
+        for project in cold_projects:
+            if not over_quota():
+                break
+            if project["has_tree"] and project["has_archive"] and project["tree_bytes"]:
+                _remove(project["root"])
+                total_bytes -= project["tree_bytes"]
+                metrics["bytes_freed"] += project["tree_bytes"]
+                metrics["trees_evicted"] += 1
+                project["has_tree"] = False
+                project["tree_bytes"] = 0
+
+        # Tier 2: whole projects; their graph metadata stays in Neo4j
+        for project in cold_projects:
+            if not over_quota():
+                break
+            project_bytes = project["tree_bytes"] + project["archive_bytes"] + project["manifest_bytes"]
+            close_project_archive(project["root"])
+            for path in (project["root"], project_archive_path(project["root"]), manifest_path(project["root"])):
+                _remove(path)
+            total_bytes -= project_bytes
+            metrics["bytes_freed"] += project_bytes
+            metrics["projects_evicted"] += 1
+            logger.warning(f"Evicted project files {project['root']} to stay within the storage quota")
+
+        # Tier 3: migrated outputs
+        for output in outputs:
+            if not over_quota():
+                break
+            if now - output["last_access"] < self.min_idle_seconds or not output["bytes"]:
+                continue
+            _remove(output["path"])
+            total_bytes -= output["bytes"]
+            metrics["bytes_freed"] += output["bytes"]
+            metrics["outputs_evicted"] += 1
+            logger.warning(f"Evicted migrated output {output['path']} to stay within the storage quota")
+
+        # Blobs only the evicted trees linked are garbage now
+        if store and (metrics["trees_evicted"] or metrics["projects_evicted"]):
+            metrics["blobs_removed"] += store.gc(self.min_idle_seconds)["blobs_removed"]
+
+        metrics["bytes_after"] = total_bytes
+        metrics["over_quota"] = over_quota()
+        metrics["duration_seconds"] = round(time.perf_counter() - started, 3)
+        metrics["finished_at"] = time.time()
+        return metrics
+
+
+def run_storage_lifecycle() -> Dict[str, Any]:
+    """
+    Run the lifecycle manager once and publish its metrics.
+
+    Returns:
+        Metrics of the run
+    """
+    metrics = StorageLifecycleManager().enforce()
+    for name in ("orphans_removed", "blobs_removed", "trees_evicted", "projects_evicted", "outputs_evicted", "bytes_freed"):
+        if metrics[name]:
+            _count(name, metrics[name])
+    _count("runs")
+
+    redis_client = dependency_initializer.get_service("redis")
+    if redis_client is not None:
+        try:
+            redis_client.set(_REDIS_LAST_RUN_KEY, json.dumps(metrics))
+        except Exception as e:
+            logger.warning(f"Could not publish storage lifecycle metrics: {str(e)}")
+
+    logger.info(
+        f"Storage lifecycle: {metrics['bytes_after']} of {metrics['quota_bytes']} bytes used, "
+        f"{metrics['bytes_freed']} bytes freed ({metrics['trees_evicted']} trees, "
+        f"{metrics['projects_evicted']} projects, {metrics['outputs_evicted']} outputs, "
+        f"{metrics['orphans_removed']} orphans)"
+    )
+    return metrics
+
+
+def storage_metrics() -> Dict[str, Any]:
+    """
+    Return the counters of this process and, with Redis available, the
+    shared counters and the metrics of the last run on any worker.
+    """
+    with _stats_lock:
+        metrics: Dict[str, Any] = {"process": dict(_stats)}
+    redis_client = dependency_initializer.get_service("redis")
+    if redis_client is not None:
+        try:
+            shared = redis_client.hgetall(_REDIS_STATS_KEY)
+            metrics["shared"] = {
+                (name.decode() if isinstance(name, bytes) else name): int(count)
+                for name, count in shared.items()
+            }
+            last_run = redis_client.get(_REDIS_LAST_RUN_KEY)
+            metrics["last_run"] = json.loads(last_run) if last_run else None
+        except Exception as e:
+            metrics["error"] = str(e)
+    return metrics
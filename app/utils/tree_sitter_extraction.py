@@ -0,0 +1,764 @@
+import logging
+import os
+import posixpath
+import threading
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Mapping, Optional, Set, Tuple
+
+from app.config.settings import get_settings
+from app.utils import python_extraction
+from app.utils.hashing import stable_id
+from app.utils.module_index import EXTERNAL, RESOLVED, UNRESOLVED
+from app.utils.zip_fs import read_project_file
+
+# Tree-sitter is optional; without it every non-Python file goes to the LLM
+try:
+    from tree_sitter import Language, Parser
+    TREE_SITTER_AVAILABLE = True
+except ImportError:
+    TREE_SITTER_AVAILABLE = False
+
+# Prebuilt grammars, used when no grammar library has been compiled
+try:
+    import tree_sitter_languages
+except ImportError:
+    tree_sitter_languages = None
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# (file path, file id, relative path, "python" or tree-sitter grammar name) of one file to analyze
+SourceJob = Tuple[str, str, str, str]
+
+# Grammar for each file type detected by StructureAnalysisAgent; react
+# files are split by extension in grammar_for
+GRAMMARS = {
+    "javascript": "javascript",
+    "typescript": "typescript",
+    "java": "java",
+    "csharp": "c_sharp",
+    "go": "go",
+    "c": "c",
+    "cpp": "cpp",
+    # Headers are parsed as C++, which accepts nearly all C declarations
+    "c_header": "cpp",
+    "cpp_header": "cpp",
+}
+
+# Extensions tried for extensionless JavaScript/TypeScript import specifiers
+_SCRIPT_EXTENSIONS = (".ts", ".tsx", ".js", ".jsx", ".mjs", ".cjs")
+
+# Node types per grammar. Declarations are only looked for at module,
+# namespace and class level; function bodies are not walked.
+_FUNCTION_TYPES = {
+    "javascript": {"function_declaration", "generator_function_declaration", "method_definition"},
+    "java": {"method_declaration", "constructor_declaration"},
+    "c_sharp": {"method_declaration", "constructor_declaration", "local_function_statement"},
+    "go": {"function_declaration", "method_declaration"},
+    "c": {"function_definition"},
+}
+_FUNCTION_TYPES["typescript"] = _FUNCTION_TYPES["javascript"] | {"function_signature", "method_signature", "abstract_method_signature"}
+_FUNCTION_TYPES["tsx"] = _FUNCTION_TYPES["typescript"]
+_FUNCTION_TYPES["cpp"] = _FUNCTION_TYPES["c"]
+
+_CLASS_TYPES = {
+    "javascript": {"class_declaration": "regular", "class": "regular"},
+    "java": {
+        "class_declaration": "regular",
+        "interface_declaration": "interface",
+        "record_declaration": "record",
+        "annotation_type_declaration": "annotation",
+    },
+    "c_sharp": {
+        "class_declaration": "regular",
+        "interface_declaration": "interface",
+        "struct_declaration": "struct",
+        "record_declaration": "record",
+        "record_struct_declaration": "record",
+    },
+    "go": {},
+    "c": {"struct_specifier": "struct", "union_specifier": "union"},
+}
+_CLASS_TYPES["typescript"] = {
+    **_CLASS_TYPES["javascript"],
+    "abstract_class_declaration": "abstract",
+    "interface_declaration": "interface",
+}
+_CLASS_TYPES["tsx"] = _CLASS_TYPES["typescript"]
+_CLASS_TYPES["cpp"] = {**_CLASS_TYPES["c"], "class_specifier": "regular"}
+
+_ENUM_TYPES = {"enum_declaration", "enum_specifier"}
+
+# Nodes whose children are declarations at the same level
+_CONTAINER_TYPES = {
+    "export_statement", "ambient_declaration", "module", "internal_module", "statement_block",
+    "namespace_declaration", "file_scoped_namespace_declaration", "declaration_list",
+    "namespace_definition", "linkage_specification", "template_declaration",
+    "preproc_if", "preproc_ifdef", "preproc_else", "preproc_elif",
+    "type_declaration",
+}
+
+# Namespace-like containers whose name qualifies the declarations inside
+_NAMESPACE_TYPES = {
+    "namespace_declaration", "file_scoped_namespace_declaration", "namespace_definition",
+    "module", "internal_module",
+}
+
+# Keywords reported as modifiers when they appear as tokens of a declaration
+_MODIFIER_TOKENS = {"static", "async", "abstract", "final", "sealed", "virtual", "override", "export"}
+
+# Nodes that hold a declaration's decorators, annotations or attributes
+_DECORATOR_TYPES = {"decorator", "marker_annotation", "annotation", "attribute_list"}
+
+_languages: Dict[str, Optional["Language"]] = {}
+_languages_lock = threading.Lock()
+# Parsers are not thread-safe; each thread keeps one per grammar
+_thread_state = threading.local()
+
+# Per-process state set once by init_worker
+_project_id: str = ""
+
+
+def grammar_for(file_type: str, file_path: str) -> Optional[str]:
+    """
+    Get the tree-sitter grammar for a file.
+
+    Args:
+        file_type: File type from structure analysis
+        file_path: Path of the file, used to tell .jsx from .tsx
+
+    Returns:
+        Grammar name, or None if the file type has no extractor
+    """
+    if file_type == "react":
+        return "tsx" if file_path.lower().endswith(".tsx") else "javascript"
+    return GRAMMARS.get(file_type)
+
+
+def load_language(grammar: str) -> Optional["Language"]:
+    """
+    Load a grammar, once per process.
+
+    The compiled library at TREE_SITTER_LIBRARY (by default
+    STORAGE_DIR/build/languages.so) is tried first, then the grammars bundled
+    with tree-sitter-languages.
+
+    Args:
+        grammar: Grammar name, e.g. "typescript"
+
+    Returns:
+        The language, or None if it cannot be loaded
+    """
+    with _languages_lock:
+        if grammar not in _languages:
+            _languages[grammar] = _load_language(grammar)
+        return _languages[grammar]
+
+
+def _load_language(grammar: str) -> Optional["Language"]:
+    if not TREE_SITTER_AVAILABLE:
+        return None
+
+    library_path = settings.TREE_SITTER_LIBRARY or os.path.join(settings.STORAGE_DIR, "build", "languages.so")
+    if os.path.exists(library_path):
+        try:
+            return Language(library_path, grammar)
+        except Exception as e:
+            logger.warning(f"Tree-sitter grammar {grammar} not in {library_path}: {str(e)}")
+    if tree_sitter_languages is not None:
+        try:
+            return tree_sitter_languages.get_language(grammar)
+        except Exception as e:
+            logger.warning(f"Bundled tree-sitter grammar {grammar} unavailable: {str(e)}")
+    logger.warning(f"No tree-sitter grammar for {grammar}, its files are analyzed with the LLM")
+    return None
+
+
+def get_parser(grammar: str) -> Optional["Parser"]:
+    """
+    Get this thread's parser for a grammar.
+
+    Args:
+        grammar: Grammar name
+
+    Returns:
+        Parser, or None if the grammar cannot be loaded
+    """
+    parsers = getattr(_thread_state, "parsers", None)
+    if parsers is None:
+        parsers = _thread_state.parsers = {}
+    if grammar not in parsers:
+        language = load_language(grammar)
+        parser = None
+        if language is not None:
+            parser = Parser()
+            parser.set_language(language)
+        parsers[grammar] = parser
+    return parsers[grammar]
+
+
+def init_worker(project_id: str) -> None:
+    """
+    Set the project context for extraction in this process.
+
+    Args:
+        project_id: Project the analyzed files belong to
+    """
+    global _project_id
+    _project_id = project_id
+    python_extraction.init_worker(project_id)
+
+
+def extract_source_chunk(jobs: List[SourceJob]) -> List[python_extraction.PythonResult]:
+    """
+    Analyze a chunk of source files. Runs in a worker process.
+
+    Python files are analyzed with the ast module, the others with their
+    tree-sitter grammar.
+
+    Args:
+        jobs: Files to analyze
+
+    Returns:
+        One result per job; errors are returned rather than raised so one
+        bad file does not fail the chunk
+    """
+    results = []
+    for file_path, file_id, relative_path, language in jobs:
+        try:
+            if language == "python":
+                metadata = python_extraction.extract_python_metadata(file_path, file_id, relative_path)
+            else:
+                metadata = extract_source_metadata(file_path, file_id, relative_path, language)
+            results.append((file_id, metadata, None))
+        except Exception as e:
+            results.append((file_id, None, f"Error analyzing {language} file {file_path}: {str(e)}"))
+    return results
+
+
+def analyze_source_files(
+    jobs: List[SourceJob],
+    project_id: str,
+    workers: int,
+    chunk_size: int
+) -> AsyncIterator[python_extraction.PythonResult]:
+    """
+    Analyze source files in a pool of worker processes.
+
+    Same scheduling as python_extraction.analyze_python_files, for jobs of
+    any supported language.
+
+    Args:
+        jobs: Files to analyze
+        project_id: Project the files belong to
+        workers: Number of worker processes
+        chunk_size: Files per submitted chunk
+
+    Yields:
+        One result per job
+    """
+    return python_extraction.run_extraction_pool(
+        jobs, project_id, workers, chunk_size, extract_source_chunk, init_worker
+    )
+
+
+def extract_source_metadata(file_path: str, file_id: str, relative_path: str, grammar: str) -> Dict[str, Any]:
+    """
+    Extract functions, classes, enums and imports from a source file with tree-sitter.
+
+    Imports are returned as written. JavaScript/TypeScript specifiers
+    starting with ./ or ../ and quoted C/C++ includes are marked relative;
+    resolve_source_import maps them to project files.
+
+    Args:
+        file_path: Path to the source file
+        file_id: ID of the File node
+        relative_path: Relative path from project root
+        grammar: Tree-sitter grammar name
+
+    Returns:
+        Extracted metadata, in the same shape as for Python files
+    """
+    parser = get_parser(grammar)
+    if parser is None:
+        raise ValueError(f"tree-sitter grammar {grammar} is not available")
+
+    source = read_project_file(file_path)
+
+    extractor = _SourceExtractor(grammar, file_id)
+    extractor.visit_declarations(parser.parse(source).root_node, [], None)
+    return extractor.finish()
+
+
+def resolve_source_import(
+    importer_path: str,
+    import_meta: Dict[str, Any],
+    paths: Mapping[str, Any]
+) -> Tuple[List[str], str]:
+    """
+    Resolve one non-Python import to a project file.
+
+    Only relative imports can be resolved from paths alone: JavaScript and
+    TypeScript specifiers are tried as written, with each script extension
+    and as a directory index; C/C++ includes next to the including file,
+    then from the project root. Package, namespace and system imports are
+    external.
+
+    Args:
+        importer_path: Relative path of the importing file
+        import_meta: Import entry with module and relative flag
+        paths: Relative paths of the project's files
+
+    Returns:
+        (paths of the imported project files, RESOLVED, UNRESOLVED or EXTERNAL)
+    """
+    if not import_meta.get("relative"):
+        return [], EXTERNAL
+
+    importer_path = importer_path.replace("\\", "/")
+    module = import_meta.get("module") or ""
+    directory = posixpath.dirname(importer_path)
+    base = posixpath.normpath(posixpath.join(directory, module))
+    if module.startswith("."):
+        candidates = [base]
+        candidates.extend(base + extension for extension in _SCRIPT_EXTENSIONS)
+        candidates.extend(f"{base}/index{extension}" for extension in _SCRIPT_EXTENSIONS)
+    else:
+        candidates = [base, posixpath.normpath(module)]
+
+    for candidate in candidates:
+        if candidate != importer_path and candidate in paths:
+            return [candidate], RESOLVED
+    return [], UNRESOLVED
+
+
+def _text(node: Any) -> str:
+    return node.text.decode("utf-8", errors="replace") if node is not None else ""
+
+
+def _field_text(node: Any, *fields: str) -> str:
+    """Text of the first of the given fields the node has."""
+    for field in fields:
+        child = node.child_by_field_name(field)
+        if child is not None:
+            return _text(child)
+    return ""
+
+
+def _declarator_name(node: Any) -> str:
+    """Follow C/C++ declarators (pointers, references, functions) down to the declared name."""
+    while node is not None:
+        if node.type in ("identifier", "field_identifier", "type_identifier", "qualified_identifier",
+                         "destructor_name", "operator_name", "namespace_identifier"):
+            return _text(node)
+        declarator = node.child_by_field_name("declarator")
+        if declarator is None:
+            # reference_declarator has no declarator field
+            declarator = next((child for child in node.named_children if child.type != "type_qualifier"), None)
+        node = declarator
+    return ""
+
+
+def _has_function_declarator(node: Any) -> bool:
+    while node is not None:
+        if node.type == "function_declarator":
+            return True
+        node = node.child_by_field_name("declarator")
+    return False
+
+
+class _SourceExtractor:
+    """
+    Collects metadata from a tree-sitter syntax tree in a single walk over
+    its declarations.
+
+    Methods are reported only in their class's methods list, like the Python
+    extractor. Go methods and C++ member functions defined outside their
+    class are attached to the class when it is declared in the same file,
+    and reported as functions named "Type.method" otherwise. A C++
+    definition takes over the position of its in-class declaration.
+    """
+
+    def __init__(self, grammar: str, file_id: str):
+        self.grammar = grammar
+        self.file_id = file_id
+        self.function_types = _FUNCTION_TYPES[grammar]
+        self.class_types = _CLASS_TYPES[grammar]
+        self.metadata: Dict[str, Any] = {
+            "file_id": file_id,
+            "functions": [],
+            "classes": [],
+            "enums": [],
+            "extensions": [],
+            "imports": [],
+            "references": []
+        }
+        self._classes_by_name: Dict[str, Dict[str, Any]] = {}
+        # (owner type name, function node, scope) of methods declared outside their type
+        self._detached_methods: List[Tuple[str, Any, List[str]]] = []
+        self._import_keys: Set[Tuple[str, Tuple[str, ...]]] = set()
+
+    def finish(self) -> Dict[str, Any]:
+        """Attach methods declared outside their type once every type is known."""
+        for owner, node, scope in self._detached_methods:
+            class_meta = self._classes_by_name.get(owner)
+            name = self._function_name(node).split("::")[-1]
+            if class_meta is None:
+                self._add_function(node, scope, None, f"{owner}.{name}")
+                continue
+            argument_count = len(self._arguments(node))
+            declared = next((
+                method for method in class_meta["methods"]
+                if method["name"] == name and len(method["arguments"]) == argument_count
+            ), None)
+            if declared is None:
+                self._add_function(node, scope, class_meta, name)
+            else:
+                declared["lineno"] = node.start_point[0] + 1
+                declared["end_lineno"] = node.end_point[0] + 1
+                declared["line_count"] = declared["end_lineno"] - declared["lineno"] + 1
+        for class_meta in self.metadata["classes"]:
+            del class_meta["qualified_name"]
+        return self.metadata
+
+    def visit_declarations(self, node: Any, scope: List[str], class_meta: Optional[Dict[str, Any]]) -> None:
+        """Record the declarations among the children of node."""
+        for child in node.named_children:
+            node_type = child.type
+            if node_type in self.function_types:
+                self._visit_function(child, scope, class_meta)
+            elif node_type in self.class_types:
+                self._visit_class(child, scope)
+            elif node_type in _ENUM_TYPES:
+                self._visit_enum(child, scope)
+            elif node_type in ("import_statement", "import_declaration", "using_directive", "preproc_include"):
+                self._visit_import(child)
+            elif node_type in ("lexical_declaration", "variable_declaration"):
+                self._visit_variable_functions(child, scope, class_meta)
+            elif node_type in ("field_declaration", "declaration"):
+                self._visit_c_declaration(child, scope, class_meta)
+            elif node_type == "type_definition":
+                self._visit_type_definition(child, scope)
+            elif node_type == "type_spec":
+                self._visit_go_type(child, scope)
+            elif node_type in _CONTAINER_TYPES:
+                if node_type == "export_statement" and child.child_by_field_name("source") is not None:
+                    self._visit_import(child)
+                    continue
+                inner_scope = scope
+                if node_type in _NAMESPACE_TYPES:
+                    name = _field_text(child, "name")
+                    inner_scope = scope + [name] if name else scope
+                body = child.child_by_field_name("body")
+                self.visit_declarations(body if body is not None else child, inner_scope, class_meta)
+                if node_type == "file_scoped_namespace_declaration":
+                    break
+
+    def _qualified_name(self, scope: List[str], name: str) -> str:
+        return ".".join(scope + [name])
+
+    def _function_name(self, node: Any) -> str:
+        if node.type == "function_definition":
+            return _declarator_name(node.child_by_field_name("declarator"))
+        return _field_text(node, "name")
+
+    def _visit_function(self, node: Any, scope: List[str], class_meta: Optional[Dict[str, Any]]) -> None:
+        name = self._function_name(node)
+        if not name:
+            return
+        if node.type == "method_declaration" and self.grammar == "go":
+            receiver = node.child_by_field_name("receiver")
+            owner = _text(receiver).strip("()").split()[-1].lstrip("*").split("[")[0] if receiver else ""
+            self._detached_methods.append((owner, node, scope))
+            return
+        if class_meta is None and "::" in name:
+            self._detached_methods.append((name.rsplit("::", 1)[0].split("::")[-1].split("<")[0], node, scope))
+            return
+        self._add_function(node, scope, class_meta, name)
+
+    def _add_function(
+        self,
+        node: Any,
+        scope: List[str],
+        class_meta: Optional[Dict[str, Any]],
+        name: str,
+        body_node: Optional[Any] = None
+    ) -> None:
+        definition = body_node if body_node is not None else node
+        modifiers = self._modifiers(node)
+        lineno = node.start_point[0] + 1
+        end_lineno = node.end_point[0] + 1
+        function_meta = {
+            "name": name,
+            "return_type": self._return_type(node, definition),
+            "arguments": self._arguments(definition),
+            "decorators": self._decorators(node),
+            "is_static": "static" in modifiers,
+            "is_async": "async" in modifiers or "async" in self._modifiers(definition),
+            "docstring": "",
+            "lineno": lineno,
+            "end_lineno": end_lineno,
+            "line_count": end_lineno - lineno + 1
+        }
+        if class_meta is not None:
+            qualified_name = f"{class_meta['qualified_name']}.{name}"
+            function_meta["method_id"] = stable_id(self.file_id, "method", qualified_name, lineno)
+            class_meta["methods"].append(function_meta)
+        else:
+            function_meta.update({
+                "function_id": stable_id(self.file_id, "function", self._qualified_name(scope, name), lineno),
+                "file_id": self.file_id,
+                "project_id": _project_id,
+                "created_at": datetime.utcnow().isoformat()
+            })
+            self.metadata["functions"].append(function_meta)
+
+    def _visit_variable_functions(self, node: Any, scope: List[str], class_meta: Optional[Dict[str, Any]]) -> None:
+        # const handler = async () => {} and const f = function () {}
+        for declarator in node.named_children:
+            if declarator.type != "variable_declarator":
+                continue
+            value = declarator.child_by_field_name("value")
+            if value is not None and value.type in ("arrow_function", "function", "function_expression", "generator_function"):
+                self._add_function(declarator, scope, class_meta, _field_text(declarator, "name"), value)
+
+    def _visit_c_declaration(self, node: Any, scope: List[str], class_meta: Optional[Dict[str, Any]]) -> None:
+        # Inside a class body, a declaration with a function declarator is a
+        # method declared without its definition
+        if class_meta is not None and _has_function_declarator(node.child_by_field_name("declarator")):
+            name = _declarator_name(node.child_by_field_name("declarator"))
+            if name:
+                self._add_function(node, scope, class_meta, name, node.child_by_field_name("declarator"))
+            return
+        # struct/enum declared as part of a variable or field declaration
+        declared_type = node.child_by_field_name("type")
+        if declared_type is not None and declared_type.child_by_field_name("body") is not None:
+            if declared_type.type in self.class_types:
+                self._visit_class(declared_type, scope)
+            elif declared_type.type in _ENUM_TYPES:
+                self._visit_enum(declared_type, scope)
+
+    def _visit_type_definition(self, node: Any, scope: List[str]) -> None:
+        # typedef struct { ... } name_t; names an anonymous struct or enum
+        declared_type = node.child_by_field_name("type")
+        if declared_type is None or declared_type.child_by_field_name("body") is None:
+            return
+        name = _declarator_name(node.child_by_field_name("declarator"))
+        if declared_type.type in self.class_types:
+            self._visit_class(declared_type, scope, name)
+        elif declared_type.type in _ENUM_TYPES:
+            self._visit_enum(declared_type, scope, name)
+
+    def _visit_go_type(self, node: Any, scope: List[str]) -> None:
+        declared_type = node.child_by_field_name("type")
+        if declared_type is not None and declared_type.type in ("struct_type", "interface_type"):
+            class_type = "struct" if declared_type.type == "struct_type" else "interface"
+            self._add_class(node, scope, _field_text(node, "name"), class_type, [], [])
+
+    def _visit_class(self, node: Any, scope: List[str], name: Optional[str] = None) -> None:
+        body = node.child_by_field_name("body")
+        if node.type in ("struct_specifier", "union_specifier", "class_specifier") and body is None:
+            # Forward declaration or use of the type, not its definition
+            return
+        name = name or _field_text(node, "name") or "default"
+        superclasses, interfaces = self._bases(node)
+        class_meta = self._add_class(node, scope, name, self.class_types[node.type], superclasses, interfaces)
+        if body is not None:
+            self.visit_declarations(body, scope + [name], class_meta)
+
+    def _add_class(
+        self,
+        node: Any,
+        scope: List[str],
+        name: str,
+        class_type: str,
+        superclasses: List[str],
+        interfaces: List[str]
+    ) -> Dict[str, Any]:
+        modifiers = self._modifiers(node)
+        qualified_name = self._qualified_name(scope, name)
+        lineno = node.start_point[0] + 1
+        if "abstract" in modifiers and class_type == "regular":
+            class_type = "abstract"
+        class_meta = {
+            "class_id": stable_id(self.file_id, "class", qualified_name, lineno),
+            "file_id": self.file_id,
+            "project_id": _project_id,
+            "name": name,
+            "type": class_type,
+            "is_static": "static" in modifiers,
+            "is_final": "final" in modifiers or "sealed" in modifiers,
+            "superclasses": superclasses,
+            "interfaces": interfaces,
+            "methods": [],
+            "attributes": [],
+            "docstring": "",
+            "lineno": lineno,
+            "end_lineno": node.end_point[0] + 1,
+            "created_at": datetime.utcnow().isoformat()
+        }
+        self.metadata["classes"].append(class_meta)
+        self._classes_by_name.setdefault(name, class_meta)
+        # Only needed while extracting, for method ids
+        class_meta["qualified_name"] = qualified_name
+        return class_meta
+
+    def _visit_enum(self, node: Any, scope: List[str], name: Optional[str] = None) -> None:
+        body = node.child_by_field_name("body")
+        if body is None:
+            return
+        name = name or _field_text(node, "name")
+        if not name:
+            return
+        values = []
+        for member in body.named_children:
+            if member.type in ("enum_constant", "enum_member_declaration", "enumerator", "enum_assignment"):
+                values.append(_field_text(member, "name"))
+            elif member.type == "property_identifier":
+                values.append(_text(member))
+        qualified_name = self._qualified_name(scope, name)
+        lineno = node.start_point[0] + 1
+        self.metadata["enums"].append({
+            "enum_id": stable_id(self.file_id, "enum", qualified_name, lineno),
+            "file_id": self.file_id,
+            "project_id": _project_id,
+            "name": name,
+            "values": [value for value in values if value],
+            "docstring": "",
+            "lineno": lineno,
+            "end_lineno": node.end_point[0] + 1,
+            "created_at": datetime.utcnow().isoformat()
+        })
+
+    def _visit_import(self, node: Any) -> None:
+        names: List[str] = []
+        relative = False
+        if node.type in ("import_statement", "export_statement"):
+            module = _text(node.child_by_field_name("source")).strip("'\"`")
+            relative = module.startswith(".")
+            for clause in node.named_children:
+                if clause.type in ("import_clause", "export_clause"):
+                    for item in clause.named_children:
+                        if item.type == "identifier":
+                            names.append("default")
+                        elif item.type == "namespace_import":
+                            names.append("*")
+                        elif item.type == "export_specifier":
+                            names.append(_field_text(item, "name"))
+                        elif item.type == "named_imports":
+                            names.extend(_field_text(spec, "name") for spec in item.named_children)
+        elif node.type == "import_declaration" and self.grammar == "go":
+            specs = [spec for child in node.named_children for spec in (
+                child.named_children if child.type == "import_spec_list" else [child]
+            )]
+            for spec in specs:
+                self._add_import(_field_text(spec, "path").strip('"`'), [], spec, False)
+            return
+        elif node.type == "import_declaration":
+            # Java: import [static] a.b.C; or import a.b.*;
+            module = next((_text(child) for child in node.named_children if child.type != "asterisk"), "")
+            if any(child.type == "asterisk" for child in node.named_children):
+                names.append("*")
+        elif node.type == "using_directive":
+            module = _field_text(node, "name")
+            if not module:
+                module = next((_text(child) for child in reversed(node.named_children)), "")
+        else:
+            path = node.child_by_field_name("path")
+            relative = path is not None and path.type == "string_literal"
+            module = _text(path).strip('<>"')
+        self._add_import(module, [name for name in names if name], node, relative)
+
+    def _add_import(self, module: str, names: List[str], node: Any, relative: bool) -> None:
+        key = (module, tuple(names))
+        if not module or key in self._import_keys:
+            return
+        self._import_keys.add(key)
+        import_meta = {
+            "module": module,
+            "names": names,
+            "level": 0,
+            "lineno": node.start_point[0] + 1
+        }
+        if relative:
+            import_meta["relative"] = True
+        self.metadata["imports"].append(import_meta)
+
+    def _bases(self, node: Any) -> Tuple[List[str], List[str]]:
+        """(superclasses, interfaces) of a class declaration."""
+        superclasses: List[str] = []
+        interfaces: List[str] = []
+        for child in node.named_children:
+            if child.type == "class_heritage":
+                for clause in child.named_children:
+                    if clause.type in ("extends_clause", "implements_clause"):
+                        target = interfaces if clause.type == "implements_clause" else superclasses
+                        target.extend(_text(base) for base in clause.named_children if base.type != "type_arguments")
+                    else:
+                        # JavaScript: the heritage is the extended expression itself
+                        superclasses.append(_text(clause))
+            elif child.type == "superclass":
+                superclasses.extend(_text(base) for base in child.named_children)
+            elif child.type in ("super_interfaces", "extends_interfaces"):
+                for type_list in child.named_children:
+                    interfaces.extend(_text(base) for base in type_list.named_children)
+            elif child.type in ("base_list", "base_class_clause"):
+                # C# cannot tell base classes from interfaces syntactically
+                superclasses.extend(
+                    _text(base) for base in child.named_children if base.type != "access_specifier"
+                )
+        return superclasses, interfaces
+
+    def _modifiers(self, node: Any) -> Set[str]:
+        modifiers = set()
+        for child in node.children:
+            if child.type == "modifiers":
+                modifiers.update(_text(child).split())
+            elif child.type in ("modifier", "accessibility_modifier", "storage_class_specifier", "virtual"):
+                modifiers.add(_text(child))
+            elif child.type in _MODIFIER_TOKENS:
+                modifiers.add(child.type)
+        return modifiers
+
+    def _decorators(self, node: Any) -> List[str]:
+        decorators = []
+        for child in node.children:
+            if child.type == "modifiers":
+                decorators.extend(_text(item) for item in child.named_children if item.type in _DECORATOR_TYPES)
+            elif child.type in _DECORATOR_TYPES:
+                decorators.append(_text(child))
+        return decorators
+
+    def _return_type(self, node: Any, definition: Any) -> str:
+        return_type = _field_text(definition, "return_type", "result") or _field_text(node, "type", "returns")
+        return return_type.lstrip(":").strip() or "Any"
+
+    def _arguments(self, definition: Any) -> List[Dict[str, str]]:
+        parameters = definition.child_by_field_name("parameters")
+        if parameters is None:
+            # C/C++: the parameters belong to the function declarator
+            declarator = definition.child_by_field_name("declarator")
+            while declarator is not None and declarator.type != "function_declarator":
+                declarator = declarator.child_by_field_name("declarator")
+            parameters = declarator.child_by_field_name("parameters") if declarator is not None else None
+        if parameters is None:
+            # Arrow function with a single unparenthesized parameter
+            parameter = definition.child_by_field_name("parameter")
+            return [{"name": _text(parameter), "type": "Any"}] if parameter is not None else []
+
+        args = []
+        for parameter in parameters.named_children:
+            if parameter.type in ("comment", "type_parameter_list"):
+                continue
+            if parameter.type in ("identifier", "shorthand_property_identifier_pattern"):
+                name = _text(parameter)
+            else:
+                name = _field_text(parameter, "name", "pattern", "left") or _declarator_name(
+                    parameter.child_by_field_name("declarator")
+                )
+            arg_type = _field_text(parameter, "type").lstrip(":").strip()
+            if not name and arg_type == "void":
+                # C: f(void) takes no arguments
+                continue
+            args.append({"name": name or _text(parameter), "type": arg_type or "Any"})
+        return args
@@ -0,0 +1,261 @@
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+
+from app.config.settings import get_settings
+from app.utils.hashing import file_content_hash
+from app.utils.uploads import UploadTooLargeError
+
+settings = get_settings()
+
+# Prefix for upload session state in Redis
+_REDIS_PREFIX = "upload_session:"
+
+# Advance the offset only if it is still the one the chunk was written at,
+# so a retried or concurrent chunk can never move it twice
+_ADVANCE_SCRIPT = """
+if redis.call('HGET', KEYS[1], 'offset') ~= ARGV[1] then
+    return 0
+end
+redis.call('HSET', KEYS[1], 'offset', ARGV[2])
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+return 1
+"""
+
+
+# Running SHA-256 of each archive, by session: (offset hashed up to, digest).
+# hashlib state cannot be stored in Redis, so it lives in the process that
+# received the chunks; a session whose chunks went elsewhere is hashed from
+# disk when it is finalized.
+_MAX_RUNNING_DIGESTS = 256
+_running_digests: "OrderedDict[str, Tuple[int, Any]]" = OrderedDict()
+_running_digests_lock = threading.Lock()
+
+
+class UploadSessionNotFound(Exception):
+    """Raised when a session expires or is removed while a chunk waits on it."""
+
+
+class UploadSessionConflict(Exception):
+    """Raised when a chunk is not sent at the session's current offset."""
+
+    def __init__(self, offset: int):
+        super().__init__(f"Chunk must start at offset {offset}")
+        self.offset = offset
+
+
+def _key(session_id: str) -> str:
+    return f"{_REDIS_PREFIX}{session_id}"
+
+
+def _lock_key(session_id: str) -> str:
+    return f"{_REDIS_PREFIX}{session_id}:lock"
+
+
+def create_session(
+    redis_client: Any,
+    project_id: str,
+    project_data: Dict[str, Any],
+    total_size: int
+) -> Dict[str, Any]:
+    """
+    Start a resumable upload.
+
+    The archive file is created empty under TEMP_DIR; chunks are written
+    into it in place, so finalizing needs no copy.
+
+    Args:
+        redis_client: Redis client
+        project_id: Project the archive is uploaded to
+        project_data: Project settings to hand to process_upload
+        total_size: Size of the complete archive in bytes
+
+    Returns:
+        The new session
+    """
+    os.makedirs(settings.TEMP_DIR, exist_ok=True)
+    session_id = uuid.uuid4().hex
+    path = os.path.join(settings.TEMP_DIR, f"upload_{session_id}.zip")
+    open(path, "wb").close()
+
+    session = {
+        "session_id": session_id,
+        "project_id": project_id,
+        "project_data": json.dumps(project_data),
+        "path": path,
+        "offset": 0,
+        "total_size": total_size,
+        "created_at": datetime.utcnow().isoformat()
+    }
+    redis_client.hset(_key(session_id), mapping=session)
+    redis_client.expire(_key(session_id), settings.UPLOAD_SESSION_TTL_SECONDS)
+    return get_session(redis_client, session_id)
+
+
+def get_session(redis_client: Any, session_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Load a resumable upload session.
+
+    Args:
+        redis_client: Redis client
+        session_id: Session ID
+
+    Returns:
+        The session, or None if it does not exist or has expired
+    """
+    raw = redis_client.hgetall(_key(session_id))
+    if not raw:
+        return None
+    session = {
+        (key.decode() if isinstance(key, bytes) else key): (value.decode() if isinstance(value, bytes) else value)
+        for key, value in raw.items()
+    }
+    session["offset"] = int(session["offset"])
+    session["total_size"] = int(session["total_size"])
+    session["project_data"] = json.loads(session["project_data"])
+    session["expires_in"] = redis_client.ttl(_key(session_id))
+    return session
+
+
+def delete_session(redis_client: Any, session_id: str) -> bool:
+    """
+    Forget a resumable upload session; its archive file is left in place.
+
+    Args:
+        redis_client: Redis client
+        session_id: Session ID
+
+    Returns:
+        True if this call removed the session, False if it was already gone
+    """
+    removed = redis_client.delete(_key(session_id))
+    redis_client.delete(_lock_key(session_id))
+    with _running_digests_lock:
+        _running_digests.pop(session_id, None)
+    return bool(removed)
+
+
+async def archive_sha256(session: Dict[str, Any]) -> str:
+    """
+    Get the SHA-256 of a complete upload's archive.
+
+    The digest kept while the chunks were written is used when this process
+    received all of them; otherwise the archive is hashed from disk.
+
+    Args:
+        session: Session whose every byte has been received
+
+    Returns:
+        Hex digest of the archive
+    """
+    with _running_digests_lock:
+        running = _running_digests.get(session["session_id"])
+    if running is not None and running[0] == session["total_size"]:
+        return running[1].hexdigest()
+    return await asyncio.to_thread(file_content_hash, session["path"])
+
+
+async def write_chunk(
+    redis_client: Any,
+    session: Dict[str, Any],
+    offset: int,
+    chunks: AsyncIterator[bytes],
+    expected_sha256: Optional[str] = None
+) -> Tuple[int, str]:
+    """
+    Write one chunk of a resumable upload into the archive at its offset.
+
+    The chunk is streamed straight into the archive file. The session's
+    offset only advances once the whole chunk is written (and matches
+    expected_sha256, if given), so an interrupted chunk is simply sent
+    again from the same offset and overwrites the partial write.
+
+    Args:
+        redis_client: Redis client
+        session: Session the chunk belongs to
+        offset: Offset the client sends the chunk at
+        chunks: Body of the request
+        expected_sha256: SHA-256 of the chunk sent by the client (optional)
+
+    Returns:
+        Tuple of (new offset, hex digest of the chunk)
+
+    Raises:
+        UploadSessionConflict: If offset is not the session's current offset
+            or another chunk is being written
+        UploadSessionNotFound: If the session is gone once the lock is taken
+        ValueError: If the chunk does not match expected_sha256
+        UploadTooLargeError: If the chunk runs past the declared total size
+    """
+    session_id = session["session_id"]
+    if offset != session["offset"]:
+        raise UploadSessionConflict(session["offset"])
+
+    # One writer per session at a time; the lock outlives a stuck request
+    if not redis_client.set(_lock_key(session_id), 1, nx=True, ex=settings.UPLOAD_SESSION_LOCK_SECONDS):
+        raise UploadSessionConflict(session["offset"])
+
+    try:
+        # The caller's copy may predate a chunk committed by the previous
+        # lock holder; check the offset again before touching the file
+        session = get_session(redis_client, session_id)
+        if session is None:
+            raise UploadSessionNotFound(session_id)
+        if offset != session["offset"]:
+            raise UploadSessionConflict(session["offset"])
+
+        # Continue the archive's running digest if this process hashed every
+        # byte before the offset; a copy, so a failed chunk leaves it untouched
+        with _running_digests_lock:
+            running = _running_digests.get(session_id)
+        if running is not None and running[0] == offset:
+            archive_digest = running[1].copy()
+        else:
+            archive_digest = hashlib.sha256() if offset == 0 else None
+
+        digest = hashlib.sha256()
+        written = 0
+        f = await asyncio.to_thread(open, session["path"], "r+b")
+        try:
+            await asyncio.to_thread(f.seek, offset)
+            async for chunk in chunks:
+                if not chunk:
+                    continue
+                written += len(chunk)
+                if offset + written > session["total_size"]:
+                    raise UploadTooLargeError(session["total_size"])
+                digest.update(chunk)
+                if archive_digest is not None:
+                    archive_digest.update(chunk)
+                await asyncio.to_thread(f.write, chunk)
+        finally:
+            await asyncio.to_thread(f.close)
+
+        chunk_sha256 = digest.hexdigest()
+        if expected_sha256 and expected_sha256.lower() != chunk_sha256:
+            raise ValueError(f"Chunk checksum mismatch: expected {expected_sha256}, received {chunk_sha256}")
+
+        new_offset = offset + written
+        advanced = redis_client.eval(
+            _ADVANCE_SCRIPT, 1, _key(session_id), offset, new_offset, settings.UPLOAD_SESSION_TTL_SECONDS
+        )
+        if not advanced:
+            current = get_session(redis_client, session_id)
+            raise UploadSessionConflict(current["offset"] if current else offset)
+        with _running_digests_lock:
+            if archive_digest is not None:
+                _running_digests[session_id] = (new_offset, archive_digest)
+                _running_digests.move_to_end(session_id)
+                while len(_running_digests) > _MAX_RUNNING_DIGESTS:
+                    _running_digests.popitem(last=False)
+            else:
+                _running_digests.pop(session_id, None)
+        return new_offset, chunk_sha256
+    finally:
+        redis_client.delete(_lock_key(session_id))
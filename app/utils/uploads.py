@@ -0,0 +1,71 @@
+import asyncio
+import hashlib
+import os
+from typing import Tuple
+
+from fastapi import HTTPException, UploadFile
+
+from app.config.settings import get_settings
+
+settings = get_settings()
+
+
+class UploadTooLargeError(HTTPException):
+    """Raised as soon as an upload passes the size limit; answered with 413."""
+
+    def __init__(self, max_bytes: int):
+        super().__init__(
+            status_code=413,
+            detail=f"Upload too large. Maximum allowed size: {max_bytes // (1024 * 1024)}MB"
+        )
+        self.max_bytes = max_bytes
+
+
+def max_upload_bytes() -> int:
+    """
+    Get the upload size limit.
+
+    Returns:
+        Maximum archive size in bytes, 0 when uploads are not limited
+    """
+    return settings.MAX_UPLOAD_SIZE_MB * 1024 * 1024
+
+
+async def save_upload(upload: UploadFile, destination: str, max_bytes: int) -> Tuple[int, str]:
+    """
+    Stream an uploaded file to disk in fixed-size chunks.
+
+    The size limit is enforced and the SHA-256 computed in the same pass.
+    File writes run in a worker thread so the event loop is not blocked.
+    On any error the partial file is removed.
+
+    Args:
+        upload: Uploaded file
+        destination: Path to write the file to
+        max_bytes: Size limit in bytes (0 for no limit)
+
+    Returns:
+        Tuple of (size in bytes, hex digest of the contents)
+
+    Raises:
+        UploadTooLargeError: If the upload is larger than max_bytes
+    """
+    digest = hashlib.sha256()
+    size = 0
+    f = await asyncio.to_thread(open, destination, "wb")
+    try:
+        while True:
+            chunk = await upload.read(settings.UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            size += len(chunk)
+            if max_bytes and size > max_bytes:
+                raise UploadTooLargeError(max_bytes)
+            digest.update(chunk)
+            await asyncio.to_thread(f.write, chunk)
+    except BaseException:
+        await asyncio.to_thread(f.close)
+        os.unlink(destination)
+        raise
+    await asyncio.to_thread(f.close)
+    return size, digest.hexdigest()
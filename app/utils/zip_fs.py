@@ -0,0 +1,441 @@
+import logging
+import os
+import shutil
+import threading
+import time
+import zipfile
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional
+
+from app.config.settings import get_settings
+from app.utils.blob_store import get_blob_store
+from app.utils.hashing import copy_and_hash
+from app.utils.ignore_rules import IgnoreRules, archive_ignore_rules
+from app.utils.zip_guard import ExtractionGuard, GuardedMember
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# Kept next to the project directory, like its manifest, so readers can find it from a file path
+_ARCHIVE_SUFFIX = ".zip"
+
+# Archives kept open per process; evicted ones are closed
+_MAX_OPEN_ARCHIVES = 8
+
+
+def member_path(info: zipfile.ZipInfo) -> str:
+    """
+    Get the normalized relative path of an archive member.
+
+    Args:
+        info: Archive member
+
+    Returns:
+        Path with '/' separators and no leading, trailing or repeated slashes
+    """
+    return "/".join(part for part in info.filename.split("/") if part)
+
+
+def extract_members(
+    zip_ref: zipfile.ZipFile,
+    members: Iterable[zipfile.ZipInfo],
+    target_dir: str,
+    workers: Optional[int] = None,
+    guard: Optional[ExtractionGuard] = None,
+    content_hashes: Optional[Dict[str, str]] = None
+) -> Dict[str, str]:
+    """
+    Extract archive members on a thread pool, hashing each on its way to disk.
+
+    zlib and file writes release the GIL, so members decompress in
+    parallel. Every member is streamed in fixed-size blocks, so memory
+    stays bounded by the number of workers whatever the member sizes.
+    Members whose path escapes target_dir are not written.
+
+    With DEDUP_STORE, files are hard links into the shared blob store, and
+    a member whose hash is already known and stored is linked without
+    being decompressed, so extracting a revision costs about its delta.
+
+    The declared sizes are checked before anything is written, and every
+    block is counted by the guard, so a zip bomb stops the extraction at
+    the first block past a ceiling.
+
+    Args:
+        zip_ref: Open ZIP file; reads from one ZipFile are safe across threads
+        members: Members to extract
+        target_dir: Directory to extract to
+        workers: Extraction threads (defaults to EXTRACT_WORKERS)
+        guard: Size and ratio ceilings (defaults to a new guard for the archive)
+        content_hashes: Member path to the SHA-256 of its contents, where it
+            was already computed from this archive, e.g. by its manifest
+
+    Returns:
+        Dictionary mapping member path to the SHA-256 of its contents
+
+    Raises:
+        ZipBombError: If the members inflate past a ceiling
+    """
+    members = list(members)
+    guard = guard or ExtractionGuard.for_archive(zip_ref)
+    content_hashes = content_hashes or {}
+    store = get_blob_store()
+    guard.check_declared(members)
+
+    files = []
+    for info in members:
+        relative_path = member_path(info)
+        if not relative_path or ".." in relative_path.split("/"):
+            continue
+        target_path = os.path.join(target_dir, *relative_path.split("/"))
+        if info.is_dir():
+            os.makedirs(target_path, exist_ok=True)
+        else:
+            files.append((info, relative_path, target_path))
+
+    def extract(member) -> str:
+        info, relative_path, target_path = member
+        os.makedirs(os.path.dirname(target_path), exist_ok=True)
+        if store is None:
+            with guard.open(zip_ref, info) as source, open(target_path, "wb") as destination:
+                return copy_and_hash(source, destination)
+        content_hash = content_hashes.get(relative_path)
+        if content_hash and store.link(content_hash, target_path):
+            return content_hash
+        with guard.open(zip_ref, info) as source:
+            return store.add(source, target_path)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers or settings.EXTRACT_WORKERS)) as executor:
+        hashes = executor.map(extract, files)
+        return {relative_path: content_hash for (_, relative_path, _), content_hash in zip(files, hashes)}
+
+
+class ZipProjectFS:
+    """
+    Read-only view of a project served straight from its ZIP archive.
+
+    Files and folders are listed from the archive's central directory, so
+    nothing is decompressed to know what the project contains. Member
+    contents are decompressed only when read, and the most recently read
+    ones are kept in an LRU cache bounded by ARCHIVE_CACHE_MB. Hidden files
+    and directories are left out, as in an extracted project's manifest, and
+    so is everything the archive's ignore rules exclude.
+    """
+
+    def __init__(
+        self,
+        archive: str,
+        root: str,
+        cache_bytes: Optional[int] = None,
+        ignore_patterns: Optional[List[str]] = None
+    ):
+        """
+        Open an archive.
+
+        Args:
+            archive: Path to the ZIP file
+            root: Project directory the archive stands in for
+            cache_bytes: Size of the decompressed member cache (defaults to ARCHIVE_CACHE_MB)
+            ignore_patterns: Per-upload ignore patterns, applied after the
+                defaults and the archive's .gitignore files
+        """
+        self.archive = archive
+        self.root = root
+        self.cache_bytes = settings.ARCHIVE_CACHE_MB * 1024 * 1024 if cache_bytes is None else cache_bytes
+        self._zip = zipfile.ZipFile(archive, "r")
+        self.compressed_size = sum(info.compress_size for info in self._zip.infolist())
+        self._lock = threading.Lock()
+        self._cache: "OrderedDict[str, bytes]" = OrderedDict()
+        self._cached_bytes = 0
+
+        self.ignore: IgnoreRules = archive_ignore_rules(self._zip, ignore_patterns)
+        self.skipped_files = 0
+        self.skipped_bytes = 0
+
+        self._members: Dict[str, zipfile.ZipInfo] = {}
+        folders = set()
+        for info in self._zip.infolist():
+            relative_path = member_path(info)
+            parts = relative_path.split("/")
+            if not relative_path or any(part.startswith(".") for part in parts):
+                continue
+            if self.ignore.is_ignored(relative_path, info.is_dir()):
+                if not info.is_dir():
+                    self.skipped_files += 1
+                    self.skipped_bytes += info.file_size
+                continue
+            # Folders are implied by member paths; explicit entries are optional in a ZIP
+            for depth in range(1, len(parts)):
+                folders.add("/".join(parts[:depth]))
+            if info.is_dir():
+                folders.add(relative_path)
+            else:
+                self._members[relative_path] = info
+
+        # Same order as a sorted directory walk: parents first, siblings by name
+        self.folders: List[str] = sorted(folders, key=lambda path: path.split("/"))
+        self.paths: List[str] = sorted(self._members, key=lambda path: path.split("/"))
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def __contains__(self, relative_path: str) -> bool:
+        return relative_path in self._members
+
+    def members(self) -> List[zipfile.ZipInfo]:
+        """Get the archive members of the listed files."""
+        return [self._members[relative_path] for relative_path in self.paths]
+
+    def size(self, relative_path: str) -> int:
+        """Get the uncompressed size of a file."""
+        return self._members[relative_path].file_size
+
+    def mtime(self, relative_path: str) -> float:
+        """Get the modification time of a file as recorded in the archive."""
+        return time.mktime(self._members[relative_path].date_time + (0, 0, -1))
+
+    def guard(self) -> ExtractionGuard:
+        """
+        Create the size and ratio ceilings for one pass over the archive.
+
+        Returns:
+            A new guard
+        """
+        return ExtractionGuard(self.compressed_size)
+
+    def open(self, relative_path: str, guard: Optional[ExtractionGuard] = None) -> GuardedMember:
+        """
+        Open a file for streaming, bypassing the cache.
+
+        Args:
+            relative_path: Path relative to the project root
+            guard: Ceilings shared by a pass over many files (defaults to a
+                new guard for this file alone)
+
+        Returns:
+            Binary stream of the decompressed file
+
+        Raises:
+            ZipBombError: While reading, if the file inflates past a ceiling
+        """
+        return (guard or self.guard()).open(self._zip, self._members[relative_path])
+
+    def read(self, relative_path: str) -> bytes:
+        """
+        Read a file, decompressing it unless it is in the cache.
+
+        Args:
+            relative_path: Path relative to the project root
+
+        Returns:
+            File contents
+
+        Raises:
+            KeyError: If the archive has no such file
+            ZipBombError: If the file inflates past a ceiling
+        """
+        with self._lock:
+            content = self._cache.get(relative_path)
+            if content is not None:
+                self._cache.move_to_end(relative_path)
+                return content
+
+            with self.open(relative_path) as source:
+                content = source.read()
+            if len(content) <= self.cache_bytes:
+                self._cache[relative_path] = content
+                self._cached_bytes += len(content)
+                while self._cached_bytes > self.cache_bytes:
+                    _, evicted = self._cache.popitem(last=False)
+                    self._cached_bytes -= len(evicted)
+            return content
+
+    def extract(
+        self,
+        target_dir: Optional[str] = None,
+        paths: Optional[Iterable[str]] = None,
+        content_hashes: Optional[Dict[str, str]] = None
+    ) -> str:
+        """
+        Extract the archive, leaving out what its ignore rules exclude.
+
+        Members are written to a sibling directory that is renamed into
+        place at the end, so a directory at the target is always complete.
+
+        Args:
+            target_dir: Directory to extract to (defaults to the project directory)
+            paths: Relative paths of the files to extract (defaults to every
+                member that is not ignored, hidden files included)
+            content_hashes: Relative path to content hash of the files, from
+                the project's manifest; stored contents are not decompressed again
+
+        Returns:
+            The extracted directory
+
+        Raises:
+            ZipBombError: If the archive inflates past a ceiling
+        """
+        target_dir = target_dir or self.root
+        if paths is None:
+            members = [
+                info for info in self._zip.infolist()
+                if not self.ignore.is_ignored(member_path(info), info.is_dir())
+            ]
+        else:
+            members = [self._members[relative_path] for relative_path in paths]
+
+        partial_dir = f"{os.path.normpath(target_dir)}.partial-{os.getpid()}"
+        shutil.rmtree(partial_dir, ignore_errors=True)
+        try:
+            with self._lock:
+                extract_members(self._zip, members, partial_dir, guard=self.guard(), content_hashes=content_hashes)
+        except BaseException:
+            shutil.rmtree(partial_dir, ignore_errors=True)
+            raise
+        os.makedirs(partial_dir, exist_ok=True)
+        try:
+            os.rename(partial_dir, target_dir)
+        except OSError:
+            # Another process extracted the same archive first
+            if not os.path.isdir(target_dir):
+                raise
+            shutil.rmtree(partial_dir, ignore_errors=True)
+        return target_dir
+
+    def close(self) -> None:
+        """Close the archive and drop the cache."""
+        with self._lock:
+            self._cache.clear()
+            self._cached_bytes = 0
+            self._zip.close()
+
+
+# Open archives of this process, by project directory. Forked processes
+# start with an empty table instead of sharing the parent's file offsets.
+_open_archives: "OrderedDict[str, ZipProjectFS]" = OrderedDict()
+_open_archives_pid = os.getpid()
+_open_archives_lock = threading.Lock()
+
+
+def project_archive_path(root: str) -> str:
+    """
+    Get the path of the archive a project directory is served from.
+
+    Args:
+        root: Project directory
+
+    Returns:
+        Path of the archive
+    """
+    return os.path.normpath(root) + _ARCHIVE_SUFFIX
+
+
+def open_project_archive(root: str, ignore_patterns: Optional[List[str]] = None) -> Optional[ZipProjectFS]:
+    """
+    Get the archive view of a project directory, opening it on first use.
+
+    Args:
+        root: Project directory
+        ignore_patterns: Per-upload ignore patterns, used if the archive is
+            not open yet in this process
+
+    Returns:
+        The archive view, or None if the project has no archive
+    """
+    global _open_archives_pid
+    root = os.path.normpath(root)
+    with _open_archives_lock:
+        if _open_archives_pid != os.getpid():
+            _open_archives.clear()
+            _open_archives_pid = os.getpid()
+
+        fs = _open_archives.get(root)
+        if fs is not None:
+            _open_archives.move_to_end(root)
+            return fs
+
+        archive = project_archive_path(root)
+        if not os.path.isfile(archive):
+            return None
+        fs = ZipProjectFS(archive, root, ignore_patterns=ignore_patterns)
+        _open_archives[root] = fs
+        while len(_open_archives) > _MAX_OPEN_ARCHIVES:
+            _, evicted = _open_archives.popitem(last=False)
+            evicted.close()
+        return fs
+
+
+def close_project_archive(root: str) -> None:
+    """
+    Close the archive view of a project directory, if it is open.
+
+    Args:
+        root: Project directory
+    """
+    with _open_archives_lock:
+        fs = _open_archives.pop(os.path.normpath(root), None)
+    if fs is not None:
+        fs.close()
+
+
+def read_project_file(file_path: str) -> bytes:
+    """
+    Read a project file from disk, or from its project's archive if it was not extracted.
+
+    Args:
+        file_path: Path of the file inside its project directory
+
+    Returns:
+        File contents
+
+    Raises:
+        FileNotFoundError: If neither the disk nor an archive has the file
+    """
+    if os.path.isfile(file_path):
+        with open(file_path, "rb") as f:
+            return f.read()
+
+    # The project directory is the nearest ancestor with an archive next to it
+    directory = os.path.dirname(os.path.normpath(file_path))
+    while directory and directory != os.path.dirname(directory):
+        fs = open_project_archive(directory)
+        if fs is not None:
+            relative_path = os.path.relpath(file_path, directory).replace(os.sep, "/")
+            if relative_path in fs:
+                return fs.read(relative_path)
+            break
+        directory = os.path.dirname(directory)
+    raise FileNotFoundError(f"No such project file: {file_path}")
+
+
+def ensure_extracted(
+    root: str,
+    paths: Optional[Iterable[str]] = None,
+    content_hashes: Optional[Dict[str, str]] = None
+) -> str:
+    """
+    Make sure a project's files are on disk, extracting its archive if needed.
+
+    Stages that hand the project directory to external tools call this;
+    reading single files goes through read_project_file instead.
+
+    Args:
+        root: Project directory
+        paths: Relative paths of the files to extract, e.g. those of the
+            project's manifest (defaults to every member that is not ignored)
+        content_hashes: Relative path to content hash of the files, from the
+            project's manifest
+
+    Returns:
+        The project directory
+
+    Raises:
+        FileNotFoundError: If the directory does not exist and there is no archive
+    """
+    if os.path.isdir(root):
+        return root
+    fs = open_project_archive(root)
+    if fs is None:
+        raise FileNotFoundError(f"Project directory {root} does not exist and has no archive")
+    logger.info(f"Extracting {fs.archive} to {root}")
+    return fs.extract(root, paths, content_hashes)
@@ -0,0 +1,184 @@
+import threading
+import zipfile
+from typing import Iterable, Optional
+
+from app.config.settings import get_settings
+
+settings = get_settings()
+
+# Below this, a member or archive is never rejected for its ratio: small,
+# repetitive files compress far better than MAX_COMPRESSION_RATIO
+_RATIO_FLOOR_BYTES = 1024 * 1024
+
+# Largest block decompressed at a time, so a ceiling is hit within one block
+_READ_SIZE = 1024 * 1024
+
+
+class ZipBombError(Exception):
+    """Raised as soon as an archive inflates past a size or compression-ratio ceiling."""
+
+
+class ExtractionGuard:
+    """
+    Size and compression-ratio ceilings for one pass over an archive.
+
+    Sizes declared in the central directory are checked up front, which
+    rejects honest oversized archives before anything is decompressed.
+    Since those sizes can lie, every member is then read through the guard,
+    which counts the bytes it really inflates to, per member and across the
+    pass, and aborts at the first block past a ceiling. Once one member
+    fails, every other member of the pass stops at its next block, so
+    parallel extraction threads give up too.
+    """
+
+    def __init__(
+        self,
+        compressed_size: int,
+        max_total_bytes: Optional[int] = None,
+        max_member_bytes: Optional[int] = None,
+        max_ratio: Optional[int] = None
+    ):
+        """
+        Initialize the guard.
+
+        Args:
+            compressed_size: Compressed size of the whole archive, for the global ratio
+            max_total_bytes: Ceiling on the bytes inflated in the pass (defaults to MAX_UPLOAD_SIZE_MB)
+            max_member_bytes: Ceiling on the bytes one member inflates to (defaults to MAX_MEMBER_SIZE_MB)
+            max_ratio: Ceiling on inflated to compressed bytes, per member and
+                for the archive (defaults to MAX_COMPRESSION_RATIO)
+        """
+        self.compressed_size = compressed_size
+        self.max_total_bytes = settings.MAX_UPLOAD_SIZE_MB * 1024 * 1024 if max_total_bytes is None else max_total_bytes
+        self.max_member_bytes = settings.MAX_MEMBER_SIZE_MB * 1024 * 1024 if max_member_bytes is None else max_member_bytes
+        self.max_ratio = settings.MAX_COMPRESSION_RATIO if max_ratio is None else max_ratio
+        self.total_bytes = 0
+        self._lock = threading.Lock()
+        self._error: Optional[str] = None
+
+    @classmethod
+    def for_archive(cls, zip_ref: zipfile.ZipFile) -> "ExtractionGuard":
+        """
+        Create a guard for one pass over an open archive.
+
+        Args:
+            zip_ref: Open ZIP file
+
+        Returns:
+            Guard with the default ceilings
+        """
+        return cls(sum(info.compress_size for info in zip_ref.infolist()))
+
+    def check_declared(self, members: Iterable[zipfile.ZipInfo]) -> None:
+        """
+        Check the sizes the central directory declares, before reading anything.
+
+        Args:
+            members: Members that are going to be read
+
+        Raises:
+            ZipBombError: If a declared size or ratio is past a ceiling
+        """
+        total_bytes = 0
+        for info in members:
+            if info.is_dir():
+                continue
+            self._check_member(info, info.file_size)
+            total_bytes += info.file_size
+        self._check_total(total_bytes)
+
+    def open(self, zip_ref: zipfile.ZipFile, info: zipfile.ZipInfo) -> "GuardedMember":
+        """
+        Open a member for reading through the guard.
+
+        Args:
+            zip_ref: Open ZIP file
+            info: Member to read
+
+        Returns:
+            Stream of the member's decompressed contents
+        """
+        return GuardedMember(self, zip_ref.open(info), info)
+
+    def _fail(self, message: str) -> None:
+        with self._lock:
+            self._error = self._error or message
+        raise ZipBombError(message)
+
+    def _check_member(self, info: zipfile.ZipInfo, member_bytes: int) -> None:
+        if self.max_member_bytes and member_bytes > self.max_member_bytes:
+            self._fail(
+                f"{info.filename} inflates past the limit of "
+                f"{self.max_member_bytes // (1024 * 1024)}MB per file"
+            )
+        if (
+            self.max_ratio
+            and member_bytes > _RATIO_FLOOR_BYTES
+            and member_bytes > self.max_ratio * max(info.compress_size, 1)
+        ):
+            self._fail(f"{info.filename} inflates more than {self.max_ratio} times its compressed size")
+
+    def _check_total(self, total_bytes: int) -> None:
+        if self.max_total_bytes and total_bytes > self.max_total_bytes:
+            self._fail(f"ZIP file too large. Maximum allowed size: {self.max_total_bytes // (1024 * 1024)}MB uncompressed")
+        if (
+            self.max_ratio
+            and total_bytes > _RATIO_FLOOR_BYTES
+            and total_bytes > self.max_ratio * max(self.compressed_size, 1)
+        ):
+            self._fail(f"ZIP file inflates more than {self.max_ratio} times its compressed size")
+
+    def _count(self, info: zipfile.ZipInfo, member_bytes: int, block_bytes: int) -> None:
+        with self._lock:
+            if self._error:
+                raise ZipBombError(self._error)
+            self.total_bytes += block_bytes
+            total_bytes = self.total_bytes
+        self._check_member(info, member_bytes)
+        self._check_total(total_bytes)
+
+
+class GuardedMember:
+    """Stream of one archive member that counts every decompressed block against its guard."""
+
+    def __init__(self, guard: ExtractionGuard, source: zipfile.ZipExtFile, info: zipfile.ZipInfo):
+        self._guard = guard
+        self._source = source
+        self._info = info
+        self._member_bytes = 0
+
+    def read(self, size: int = -1) -> bytes:
+        """
+        Read decompressed bytes, at most one block at a time from the archive.
+
+        Args:
+            size: Bytes to read, or -1 for the rest of the member
+
+        Returns:
+            Decompressed bytes
+
+        Raises:
+            ZipBombError: If the bytes read so far pass a ceiling
+        """
+        if size is not None and size >= 0:
+            return self._read_block(min(size, _READ_SIZE))
+        blocks = []
+        for block in iter(lambda: self._read_block(_READ_SIZE), b""):
+            blocks.append(block)
+        return b"".join(blocks)
+
+    def _read_block(self, size: int) -> bytes:
+        block = self._source.read(size)
+        if block:
+            self._member_bytes += len(block)
+            self._guard._count(self._info, self._member_bytes, len(block))
+        return block
+
+    def close(self) -> None:
+        self._source.close()
+
+    def __enter__(self) -> "GuardedMember":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,101 @@
+"""
+Benchmark: extracting revisions in full vs. over the deduplicated blob store.
+
+Generates a base archive and revisions of it that change a fraction of
+the files, and extracts every revision into its own tree two ways: in full,
+as before, and over the content-addressed blob store, linking the files
+whose hashes the manifest already knows. Prints the time to extract the
+revisions and the bytes they added to disk. Needs no database.
+
+Usage:
+    PYTHONPATH=. python benchmarks/dedup_store_benchmark.py [--files 5000] [--revisions 5] [--changed 0.05]
+"""
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+import zipfile
+
+parent = tempfile.mkdtemp(prefix="dedup_store_benchmark_")
+os.environ["STORAGE_DIR"] = os.path.join(parent, "storage")
+
+from app.config.settings import get_settings  # noqa: E402
+from app.utils.file_manifest import build_archive_manifest  # noqa: E402
+from app.utils.zip_fs import ZipProjectFS  # noqa: E402
+
+
+def _make_archive(path: str, file_count: int, changed: float, revision: int) -> None:
+    """Write file_count Python files, a fraction of them changed for this revision."""
+    changed_files = set(random.Random(revision).sample(range(file_count), int(file_count * changed))) if revision else set()
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        for i in range(file_count):
+            rng = random.Random(i)
+            body = "".join(f"value_{n} = {rng.random()}\n" for n in range(100))
+            if i in changed_files:
+                body += f"revision = {revision}\n"
+            archive.writestr(f"pkg_{i // 200}/module_{i}.py", body)
+
+
+def _disk_usage(root: str) -> int:
+    """Bytes on disk under root, each hard-linked file counted once."""
+    seen = set()
+    total = 0
+    for directory, _, filenames in os.walk(root):
+        for filename in filenames:
+            stat = os.lstat(os.path.join(directory, filename))
+            if (stat.st_dev, stat.st_ino) not in seen:
+                seen.add((stat.st_dev, stat.st_ino))
+                total += stat.st_size
+    return total
+
+
+def _extract_revisions(work_dir: str, archives: list, dedup: bool) -> tuple:
+    """Index and extract every archive; return the seconds and bytes added by all but the first."""
+    get_settings().DEDUP_STORE = dedup
+    elapsed = 0.0
+    base_usage = 0
+    for revision, archive_path in enumerate(archives):
+        root = os.path.join(work_dir, f"project_{revision}")
+        fs = ZipProjectFS(archive_path, root)
+        manifest = build_archive_manifest(root, fs)
+        started = time.perf_counter()
+        fs.extract(root, manifest.paths, dict(zip(manifest.paths, manifest.hashes)))
+        if revision:
+            elapsed += time.perf_counter() - started
+        else:
+            base_usage = _disk_usage(parent)
+        fs.close()
+    return elapsed, _disk_usage(parent) - base_usage
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=5000)
+    parser.add_argument("--revisions", type=int, default=5, help="Revisions after the base archive")
+    parser.add_argument("--changed", type=float, default=0.05, help="Fraction of files each revision changes")
+    args = parser.parse_args()
+
+    try:
+        archives = []
+        for revision in range(args.revisions + 1):
+            archive_path = os.path.join(parent, f"revision_{revision}.zip")
+            _make_archive(archive_path, args.files, args.changed, revision)
+            archives.append(archive_path)
+
+        full, full_bytes = _extract_revisions(os.path.join(parent, "full"), archives, dedup=False)
+        shutil.rmtree(os.path.join(parent, "full"))
+        dedup, dedup_bytes = _extract_revisions(os.path.join(parent, "dedup"), archives, dedup=True)
+        print(f"{args.files} files, {args.revisions} revisions changing {args.changed:.0%} of them")
+        print(f"full extraction:  {full:7.2f}s, {full_bytes / 1024 / 1024:7.1f} MB added")
+        print(
+            f"over blob store:  {dedup:7.2f}s, {dedup_bytes / 1024 / 1024:7.1f} MB added "
+            f"({full / dedup:.1f}x faster, {full_bytes / max(dedup_bytes, 1):.1f}x less disk)"
+        )
+    finally:
+        shutil.rmtree(parent, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Benchmark: LLM file description throughput through LLMScheduler.
+
+Starts a local mock of the OpenAI chat completions endpoint that answers
+after an injected latency and fails a share of requests with 429 or 503,
+then sends the same number of file-description requests through
+LLMScheduler at each concurrency level. Prints wall time, requests/sec and
+retry counts for each level; concurrency 1 is the old sequential behaviour.
+
+No OpenAI account is needed; everything runs against the mock.
+
+Usage:
+    PYTHONPATH=. python benchmarks/llm_scheduler_benchmark.py [--files 200] [--latency 0.5] [--error-rate 0.05] [--concurrency 1 8 32]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Tuple
+
+from openai import AsyncOpenAI
+
+from app.utils.llm_scheduler import LLMScheduler, estimate_tokens
+
+
+def _make_handler(latency: float, error_rate: float):
+    """Build a request handler answering chat completions after `latency` seconds."""
+    class MockOpenAIHandler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            self.rfile.read(length)
+            time.sleep(latency * random.uniform(0.5, 1.5))
+
+            if random.random() < error_rate:
+                status = random.choice([429, 503])
+                body = {"error": {"message": "injected failure", "type": "mock", "code": str(status)}}
+                self.send_response(status)
+                if status == 429:
+                    self.send_header("Retry-After", "0.1")
+            else:
+                content = json.dumps({
+                    "description": "Mock description.",
+                    "components": [{"name": "main", "type": "function", "purpose": "Entry point"}],
+                    "dependencies": [],
+                    "migration_notes": ""
+                })
+                body = {
+                    "id": "chatcmpl-mock",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": "mock",
+                    "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}],
+                    "usage": {"prompt_tokens": 600, "completion_tokens": 80, "total_tokens": 680}
+                }
+                self.send_response(200)
+
+            payload = json.dumps(body).encode("utf-8")
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+    return MockOpenAIHandler
+
+
+def _start_mock_server(latency: float, error_rate: float) -> Tuple[ThreadingHTTPServer, str]:
+    """Start the mock server on a free port and return it with its base URL."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _make_handler(latency, error_rate))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+
+async def _run(base_url: str, file_count: int, concurrency: int) -> None:
+    """Describe file_count synthetic files at the given concurrency and print the result."""
+    client = AsyncOpenAI(api_key="mock", base_url=base_url, max_retries=0)
+    scheduler = LLMScheduler(
+        max_concurrency=concurrency,
+        requests_per_minute=0,
+        tokens_per_minute=0,
+        retry_base_delay=0.1,
+        retry_max_delay=2.0
+    )
+    prompt = "def main():\n    return 0\n" * 100
+
+    async def describe(index: int) -> None:
+        await scheduler.run(
+            lambda: client.chat.completions.create(
+                model="mock",
+                messages=[{"role": "user", "content": f"File: file_{index}.py\n{prompt}"}],
+                response_format={"type": "json_object"}
+            ),
+            estimated_tokens=estimate_tokens(prompt, max_output_tokens=1000)
+        )
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(describe(i) for i in range(file_count)), return_exceptions=True)
+    elapsed = time.perf_counter() - started
+    failed = sum(1 for result in results if isinstance(result, Exception))
+
+    print(
+        f"concurrency={concurrency:<4} {elapsed:8.2f}s {file_count / elapsed:8.1f} files/sec  "
+        f"requests={scheduler.stats['requests']} retries={scheduler.stats['retries']} failed={failed}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.5, help="Mean mock response latency in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.05, help="Share of requests failed with 429/503")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    args = parser.parse_args()
+    # Retries are expected here; keep their warnings out of the results
+    logging.basicConfig(level=logging.ERROR)
+
+    server, base_url = _start_mock_server(args.latency, args.error_rate)
+    try:
+        for concurrency in args.concurrency:
+            asyncio.run(_run(base_url, args.files, concurrency))
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Load test: concurrent status polling while a heavy graph request is in flight.
+
+Runs against a live API server (``uvicorn app.main:app``) and reports latency
+percentiles for ``GET /projects/{project_id}/status``. Run it once against a
+build that uses the sync Neo4j manager in the routers and once against the
+async manager to compare p99 under load.
+
+Usage:
+    python benchmarks/load_test_status_polling.py --project-id <id> \
+        [--base-url http://localhost:8000] [--pollers 50] [--duration 30]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Dict, List
+
+import httpx
+
+
+def _percentile(samples: List[float], percentile: float) -> float:
+    """Return the given percentile (0-100) of the samples."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(percentile / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def _poll_status(
+    client: httpx.AsyncClient,
+    project_id: str,
+    deadline: float,
+    latencies: List[float],
+    errors: Dict[str, int]
+) -> None:
+    """Poll the status endpoint until the deadline, recording latencies."""
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            response = await client.get(f"/projects/{project_id}/status")
+            if response.status_code != 200:
+                errors[str(response.status_code)] = errors.get(str(response.status_code), 0) + 1
+        except httpx.HTTPError as e:
+            errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+        latencies.append(time.perf_counter() - started)
+
+
+async def _heavy_graph(
+    client: httpx.AsyncClient,
+    project_id: str,
+    deadline: float,
+    latencies: List[float]
+) -> None:
+    """Issue full project graph requests back to back until the deadline."""
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            await client.get(f"/projects/{project_id}/graph", timeout=None)
+        except httpx.HTTPError:
+            pass
+        latencies.append(time.perf_counter() - started)
+
+
+async def run(base_url: str, project_id: str, pollers: int, duration: float) -> None:
+    """Run the load test and print a latency summary."""
+    status_latencies: List[float] = []
+    graph_latencies: List[float] = []
+    errors: Dict[str, int] = {}
+
+    limits = httpx.Limits(max_connections=pollers + 1, max_keepalive_connections=pollers + 1)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60.0) as client:
+        deadline = time.perf_counter() + duration
+        tasks = [
+            _poll_status(client, project_id, deadline, status_latencies, errors)
+            for _ in range(pollers)
+        ]
+        tasks.append(_heavy_graph(client, project_id, deadline, graph_latencies))
+        await asyncio.gather(*tasks)
+
+    print(f"status requests: {len(status_latencies)} ({len(status_latencies) / duration:.1f} req/s)")
+    for percentile in (50, 95, 99):
+        print(f"  p{percentile}: {_percentile(status_latencies, percentile) * 1000:.1f} ms")
+    if status_latencies:
+        print(f"  max: {max(status_latencies) * 1000:.1f} ms, mean: {statistics.mean(status_latencies) * 1000:.1f} ms")
+    print(f"graph requests: {len(graph_latencies)}")
+    if graph_latencies:
+        print(f"  mean: {statistics.mean(graph_latencies) * 1000:.1f} ms")
+    if errors:
+        print(f"errors: {errors}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--project-id", required=True)
+    parser.add_argument("--pollers", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=30.0)
+    args = parser.parse_args()
+    asyncio.run(run(args.base_url, args.project_id, args.pollers, args.duration))
@@ -0,0 +1,122 @@
+"""
+Benchmark: ingest and lookup time with and without the bootstrap schema.
+
+Creates a synthetic project with ``--files`` File nodes (default 50k) linked
+to a Project node, then times random ``find_node`` lookups by ``file_id``.
+The run is repeated twice: once after dropping the constraints and indexes
+created by ``Neo4jManager.ensure_schema`` and once after re-creating them.
+
+WARNING: this drops and re-creates the application schema on the target
+database. Point it at a disposable Neo4j instance.
+
+Usage:
+    python benchmarks/neo4j_schema_benchmark.py [--files 50000] [--lookups 2000]
+"""
+import argparse
+import random
+import time
+import uuid
+from typing import Dict, List
+
+from app.config.settings import get_settings  # noqa: F401  (resolves import order)
+from app.databases.neo4j_manager import Neo4jManager
+from app.utils.constants import NodeType, RelationshipType
+
+
+def _drop_schema(db: Neo4jManager, summary: Dict[str, List[str]]) -> None:
+    """Drop the constraints and indexes reported by ensure_schema."""
+    for name in summary["constraints"]:
+        db.run_query(f"DROP CONSTRAINT {name} IF EXISTS")
+    for name in summary["indexes"]:
+        db.run_query(f"DROP INDEX {name} IF EXISTS")
+
+
+def _ingest(db: Neo4jManager, project_id: str, file_count: int, batch_size: int) -> List[str]:
+    """Create a project with file_count File nodes; return the file ids."""
+    db.create_node(NodeType.PROJECT.value, {"project_id": project_id, "status": "benchmark"})
+    file_ids = [str(uuid.uuid4()) for _ in range(file_count)]
+    for i in range(0, file_count, batch_size):
+        batch = [
+            {
+                "file_id": file_id,
+                "project_id": project_id,
+                "relative_path": f"src/module_{i + offset}.py",
+                "file_type": "python",
+            }
+            for offset, file_id in enumerate(file_ids[i:i + batch_size])
+        ]
+        db.create_nodes_batch(NodeType.FILE.value, batch)
+        db.create_relationships_batch([
+            {
+                "from_label": NodeType.PROJECT.value,
+                "from_property": "project_id",
+                "from_value": project_id,
+                "to_label": NodeType.FILE.value,
+                "to_property": "file_id",
+                "to_value": props["file_id"],
+                "relationship_type": RelationshipType.CONTAINS_FILE,
+                "properties": {},
+            }
+            for props in batch
+        ])
+    return file_ids
+
+
+def _cleanup(db: Neo4jManager, project_id: str) -> None:
+    """Delete every node belonging to the benchmark project."""
+    db.run_query(
+        """
+        MATCH (n {project_id: $project_id})
+        CALL { WITH n DETACH DELETE n } IN TRANSACTIONS OF 10000 ROWS
+        """,
+        {"project_id": project_id},
+    )
+
+
+def _run_once(db: Neo4jManager, file_count: int, lookups: int, batch_size: int) -> Dict[str, float]:
+    """Time one ingest + lookup cycle."""
+    project_id = f"benchmark_{uuid.uuid4()}"
+    try:
+        started = time.perf_counter()
+        file_ids = _ingest(db, project_id, file_count, batch_size)
+        ingest_seconds = time.perf_counter() - started
+
+        sample = random.sample(file_ids, min(lookups, len(file_ids)))
+        started = time.perf_counter()
+        for file_id in sample:
+            db.find_node(NodeType.FILE.value, "file_id", file_id)
+        lookup_seconds = time.perf_counter() - started
+
+        return {
+            "ingest_seconds": ingest_seconds,
+            "lookup_ms": lookup_seconds / len(sample) * 1000,
+        }
+    finally:
+        _cleanup(db, project_id)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=50000)
+    parser.add_argument("--lookups", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=100)
+    args = parser.parse_args()
+
+    db = Neo4jManager()
+    summary = db.ensure_schema()
+
+    _drop_schema(db, summary)
+    without_schema = _run_once(db, args.files, args.lookups, args.batch_size)
+
+    db.ensure_schema()
+    db.run_query("CALL db.awaitIndexes(300)")
+    with_schema = _run_once(db, args.files, args.lookups, args.batch_size)
+
+    print(f"{'':<16}{'ingest (s)':>12}{'lookup (ms)':>14}")
+    print(f"{'without schema':<16}{without_schema['ingest_seconds']:>12.2f}{without_schema['lookup_ms']:>14.3f}")
+    print(f"{'with schema':<16}{with_schema['ingest_seconds']:>12.2f}{with_schema['lookup_ms']:>14.3f}")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
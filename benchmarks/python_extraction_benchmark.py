@@ -0,0 +1,122 @@
+"""
+Benchmark: Python AST extraction throughput by worker process count.
+
+Generates a synthetic tree of Python modules (classes, methods, functions
+and cross-module imports) and runs the extraction used by
+ContentAnalysisAgent over it once per worker count, printing files/sec and
+the speed-up over a single process. Needs no database.
+
+Usage:
+    PYTHONPATH=. python benchmarks/python_extraction_benchmark.py [--files 20000] [--workers 1 2 4 8] [--chunk-size 64]
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import tempfile
+import time
+from typing import List
+
+from app.utils.python_extraction import PythonJob, analyze_python_files
+
+_MODULE_TEMPLATE = '''"""Synthetic module {index}."""
+import os
+from enum import Enum
+from typing import Dict, List, Optional
+
+from pkg_{dep_package}.mod_{dep_module} import Model{dep_module}
+
+
+class Status{index}(Enum):
+    ACTIVE: str = "active"
+    INACTIVE: str = "inactive"
+
+
+class Model{index}:
+    """Model {index}."""
+
+    name: str
+    values: List[int]
+
+    def __init__(self, name: str, values: Optional[List[int]] = None):
+        self.name = name
+        self.values = values or []
+
+    @staticmethod
+    def build(data: Dict[str, int]) -> "Model{index}":
+        return Model{index}(str(data), list(data.values()))
+
+    async def load(self, path: str) -> List[int]:
+        with open(os.path.join(path, self.name)) as f:
+            return [int(line) for line in f]
+
+    def total(self) -> int:
+        return sum(value * 2 for value in self.values if value > 0)
+
+
+def helper_{index}(items: List[int]) -> Dict[str, int]:
+    dependency = Model{dep_module}("dep")
+    result = {{}}
+    for position, item in enumerate(items):
+        if item % 2:
+            result[str(position)] = item
+        else:
+            result[str(position)] = dependency.total()
+    return result
+'''
+
+
+def _make_tree(root: str, file_count: int, modules_per_package: int) -> List[PythonJob]:
+    """Write file_count modules and return their extraction jobs."""
+    jobs = []
+    for i in range(file_count):
+        package, module = divmod(i, modules_per_package)
+        relative_path = f"pkg_{package}/mod_{module}.py"
+        path = os.path.join(root, relative_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        dep_package, dep_module = divmod((i * 7 + 3) % file_count, modules_per_package)
+        with open(path, "w") as f:
+            f.write(_MODULE_TEMPLATE.format(index=i, dep_package=dep_package, dep_module=dep_module))
+        jobs.append((path, f"file_{i}", relative_path))
+    return jobs
+
+
+async def _run(jobs: List[PythonJob], workers: int, chunk_size: int) -> float:
+    """Extract every job once and return the elapsed seconds."""
+    started = time.perf_counter()
+    count = 0
+    async for _, metadata, error in analyze_python_files(jobs, "benchmark", workers, chunk_size):
+        if error:
+            raise RuntimeError(error)
+        count += 1
+    assert count == len(jobs)
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=20000)
+    parser.add_argument("--modules-per-package", type=int, default=100)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, os.cpu_count() or 1])
+    parser.add_argument("--chunk-size", type=int, default=64)
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="python_extraction_benchmark_")
+    try:
+        jobs = _make_tree(root, args.files, args.modules_per_package)
+        print(f"{len(jobs)} modules, {os.cpu_count()} CPUs")
+
+        baseline = None
+        for workers in sorted(set(args.workers)):
+            elapsed = asyncio.run(_run(jobs, workers, args.chunk_size))
+            baseline = baseline or elapsed
+            print(
+                f"workers={workers:<3} {elapsed:8.2f}s {len(jobs) / elapsed:9.1f} files/sec  "
+                f"speed-up {baseline / elapsed:4.2f}x"
+            )
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
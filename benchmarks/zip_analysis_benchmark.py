@@ -0,0 +1,91 @@
+"""
+Benchmark: extracting an upload vs. analyzing it straight from the ZIP.
+
+Generates a synthetic project archive and times what the upload needs
+before analysis can start, plus one read of every file, two ways: the
+previous pipeline, which extracted every member, scanned the tree into the
+manifest and read the files back from disk, and the archive view, which
+indexes the central directory, hashes members without writing them and
+reads them on demand. Prints both timings and the bytes written to disk.
+Needs no database.
+
+Usage:
+    PYTHONPATH=. python benchmarks/zip_analysis_benchmark.py [--files 20000] [--size 4096]
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+import zipfile
+
+from app.utils.file_manifest import build_archive_manifest, build_manifest
+from app.utils.hashing import copy_and_hash
+from app.utils.zip_fs import ZipProjectFS, read_project_file
+
+
+def _make_archive(path: str, file_count: int, size: int) -> None:
+    """Write an archive of file_count Python files of size bytes spread over nested folders."""
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        for i in range(file_count):
+            body = "".join(f"def function_{i}_{n}():\n    return {n}\n\n" for n in range(size // 32))
+            archive.writestr(f"pkg_{i // 400}/mod_{(i // 20) % 20}/file_{i}.py", body[:size])
+
+
+def _directory_size(root: str) -> int:
+    return sum(
+        os.path.getsize(os.path.join(directory, filename))
+        for directory, _, filenames in os.walk(root)
+        for filename in filenames
+    )
+
+
+def _extracted(archive_path: str, root: str) -> float:
+    """Extract, scan and read back like the previous upload did; return the elapsed seconds."""
+    started = time.perf_counter()
+    content_hashes = {}
+    with zipfile.ZipFile(archive_path) as archive:
+        for info in archive.infolist():
+            target_path = os.path.join(root, info.filename)
+            os.makedirs(os.path.dirname(target_path), exist_ok=True)
+            with archive.open(info) as source, open(target_path, "wb") as destination:
+                content_hashes[info.filename] = copy_and_hash(source, destination)
+    manifest = build_manifest(root, content_hashes)
+    for file in manifest.files():
+        read_project_file(file["path"])
+    return time.perf_counter() - started
+
+
+def _from_archive(archive_path: str, root: str) -> float:
+    """Index the archive and read every member through the archive view; return the elapsed seconds."""
+    started = time.perf_counter()
+    fs = ZipProjectFS(archive_path, root)
+    manifest = build_archive_manifest(root, fs)
+    for relative_path in manifest.paths:
+        fs.read(relative_path)
+    fs.close()
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=20000)
+    parser.add_argument("--size", type=int, default=4096, help="Bytes per file")
+    args = parser.parse_args()
+
+    parent = tempfile.mkdtemp(prefix="zip_analysis_benchmark_")
+    archive_path = os.path.join(parent, "upload.zip")
+    try:
+        _make_archive(archive_path, args.files, args.size)
+        extracted_root = os.path.join(parent, "extracted")
+        extracted = _extracted(archive_path, extracted_root)
+        from_archive = _from_archive(archive_path, os.path.join(parent, "archive"))
+        print(f"{args.files} files of {args.size} bytes, archive {os.path.getsize(archive_path) / 1024 / 1024:.1f} MB")
+        print(f"extract + scan + read: {extracted:7.2f}s, {_directory_size(extracted_root) / 1024 / 1024:.1f} MB written")
+        print(f"index + read from ZIP: {from_archive:7.2f}s, 0.0 MB written ({extracted / from_archive:.1f}x)")
+    finally:
+        shutil.rmtree(parent, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()